@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Micro-benchmark of the per-call overhead of running a command: through a shell (shell_run) or directly (exec_run).
+
+usage: python benchmarks/bench_exec_overhead.py [--calls N] [-- program args...]
+
+By default the command is "uv --version" (the cheapest uv call), or "true" if uv is not in PATH.
+"""
+
+from __future__ import annotations
+
+__author__ = "Gaëtan Montury"
+__copyright__ = "Copyright (c) 2024-2025 Gaëtan Montury"
+__license__ = """GNU GENERAL PUBLIC LICENSE refer to file LICENSE in repo"""
+__version__ = "0.8.1"  # to bump
+__maintainer__ = "Gaëtan Montury"
+__email__ = "#"
+__status__ = "Development"
+
+
+import argparse
+import shlex
+import statistics
+import time
+from typing import Callable, Dict, List
+
+from uvpipx.internal_libs.misc import command_exists, exec_run, shell_run
+
+
+def bench(run: Callable[[], object], calls: int) -> List[float]:
+    run()  # warm up (page cache, PATH lookup)
+    timings = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200, help="number of calls per runner")
+    parser.add_argument("argv", nargs="*", help="the command to run (default uv --version)")
+    args = parser.parse_args()
+
+    argv = args.argv or (["uv", "--version"] if command_exists("uv") else ["true"])
+    command = shlex.join(argv)
+
+    runners: Dict[str, Callable[[], object]] = {
+        "shell_run (sh -c)": lambda: shell_run(command),
+        "exec_run (argv)": lambda: exec_run(argv),
+    }
+
+    print(f"command: {command}  calls: {args.calls}\n")
+    medians = {}
+    for name, run in runners.items():
+        timings = bench(run, args.calls)
+        medians[name] = statistics.median(timings)
+        print(
+            f"{name:20} median {medians[name] * 1000:7.3f} ms"
+            f"  mean {statistics.mean(timings) * 1000:7.3f} ms"
+            f"  min {min(timings) * 1000:7.3f} ms",
+        )
+
+    shell_median, exec_median = medians.values()
+    overhead = shell_median - exec_median
+    print(
+        f"\nshell overhead per call: {overhead * 1000:.3f} ms ({shell_median / exec_median:.2f}x)"
+        f", {overhead * 1000:.1f} s per 1000 calls",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""Benchmark of uvpipx commands on synthetic uvpipx homes with many venvs (10, 100 and 1000 by default).
+
+usage: python benchmarks/bench_scale.py [--sizes 10,100,1000] [--repeat N] [--output FILE] [--baseline FILE]
+
+Each fake venv has a valid uvpipx.json, dist-info directories (the main package and a few dependencies),
+a console script and its exposed link. A stand-in uv (always successful) is put first in PATH,
+so the benchmark runs offline and only measures uvpipx itself.
+
+Timed: the commands list, info, expose-all and uninstall-all (each one a new uvpipx process),
+and in-process the model load path: read of every uvpipx.json (alone, then with the installed versions)
+and StateIndex.refresh() cold and warm.
+
+The results are written as JSON (--output), and compared to a previous result file (--baseline):
+the command fails when a median is slower than the baseline by more than --max-ratio.
+"""
+
+from __future__ import annotations
+
+__author__ = "Gaëtan Montury"
+__copyright__ = "Copyright (c) 2024-2025 Gaëtan Montury"
+__license__ = """GNU GENERAL PUBLIC LICENSE refer to file LICENSE in repo"""
+__version__ = "0.8.1"  # to bump
+__maintainer__ = "Gaëtan Montury"
+__email__ = "#"
+__status__ = "Development"
+
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess  # nosec: B404  # noqa: S404
+import sys
+import sysconfig
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from uvpipx.uvpipx_metadata import installed_versions
+from uvpipx.uvpipx_state import StateIndex, read_venv_model
+from uvpipx.UvPipxModels import (
+    UvPipxExposedModel,
+    UvPipxExposeInstallSets,
+    UvPipxModel,
+    UvPipxPackageModel,
+    UvPipxVenvExposeAppModel,
+    UvPipxVenvModel,
+)
+from uvpipx.version import __version__ as uvpipx_version
+
+NB_DEPENDENCIES = 5
+
+FAKE_UV = """#!{python}
+import sys
+
+if sys.argv[1:2] == ["--version"]:
+    print("uv 0.0.0 (uvpipx benchmark stand-in)")
+"""
+
+
+class SyntheticHome:
+    """A uvpipx home (venvs, bin dir, state db) in a temporary directory, with a stand-in uv."""
+
+    def __init__(self, root: Path, nb_venvs: int) -> None:
+        self.root = root
+        self.nb_venvs = nb_venvs
+        self.home = root / "home"
+        self.venvs = root / "venvs"
+        self.bin_dir = root / "bin"
+        self.fake_uv_dir = root / "fake_uv"
+        self.state_db = self.home / "uvpipx_state.sqlite"
+
+    def env(self) -> Dict[str, str]:
+        return {
+            **os.environ,
+            "PATH": f"{self.fake_uv_dir}{os.pathsep}{os.environ.get('PATH', '')}",
+            "UVPIPX_HOME": str(self.home),
+            "UVPIPX_LOCAL_VENVS": str(self.venvs),
+            "UVPIPX_BIN_DIR": str(self.bin_dir),
+            "UVPIPX_STATE_DB": str(self.state_db),
+        }
+
+    def venv_names(self) -> List[str]:
+        return [f"tool{nb:04d}" for nb in range(self.nb_venvs)]
+
+    def create(self) -> None:
+        self.clean()
+        for directory in [self.home, self.venvs, self.bin_dir, self.fake_uv_dir]:
+            directory.mkdir(parents=True)
+
+        fake_uv = self.fake_uv_dir / "uv"
+        fake_uv.write_text(FAKE_UV.format(python=sys.executable))
+        fake_uv.chmod(0o755)
+
+        for name in self.venv_names():
+            self.create_venv(name)
+
+    def clean(self) -> None:
+        # the trash reaper of uninstall-all can still be deleting, so errors are ignored
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def create_venv(self, name: str) -> None:
+        venv_path = self.venvs / name
+        dot_venv = venv_path / ".venv"
+        bin_dir = dot_venv / "bin"
+        site_packages = dot_venv / "lib" / f"python{sysconfig.get_python_version()}" / "site-packages"
+        bin_dir.mkdir(parents=True)
+        site_packages.mkdir(parents=True)
+
+        (dot_venv / "pyvenv.cfg").write_text(f"home = {Path(sys.executable).parent}\n")
+        (bin_dir / "python").symlink_to(sys.executable)
+
+        write_dist_info(site_packages, name, "1.0.0", {name: f"{name}.__main__:main"})
+        for nb in range(NB_DEPENDENCIES):
+            write_dist_info(site_packages, f"{name}-dep{nb}", "2.1.0", {})
+
+        app_bin = bin_dir / name
+        app_bin.write_text(f"#!{sys.executable}\nprint('{name}')\n")
+        app_bin.chmod(0o755)
+        exposed_app_path = self.bin_dir / name
+        exposed_app_path.symlink_to(app_bin)
+
+        (venv_path / "pip_metadata.json").write_text(
+            json.dumps({"console_scripts": {name: {name: f"{name}.__main__:main"}}}, indent=4),
+        )
+        (venv_path / "requirements.txt").write_text(
+            f"{name}==1.0.0\n" + "".join(f"{name}-dep{nb}==2.1.0\n" for nb in range(NB_DEPENDENCIES)),
+        )
+
+        UvPipxModel(
+            venv=UvPipxVenvModel(str(venv_path)),
+            main_package=UvPipxPackageModel(name, name),
+            injected_packages={},
+            exposed=UvPipxExposedModel(
+                str(bin_dir),
+                [UvPipxExposeInstallSets([name], ["__main__"])],
+                {name: UvPipxVenvExposeAppModel(name, str(exposed_app_path), [name])},
+            ),
+        ).save_json("uvpipx.json")
+
+
+def write_dist_info(site_packages: Path, name: str, version: str, console_scripts: Dict[str, str]) -> None:
+    dist_info = site_packages / f"{name.replace('-', '_')}-{version}.dist-info"
+    dist_info.mkdir()
+    (dist_info / "METADATA").write_text(f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n\nA fake package\n")
+    (dist_info / "INSTALLER").write_text("uv\n")
+    (dist_info / "RECORD").write_text("")
+    if console_scripts:
+        (dist_info / "entry_points.txt").write_text(
+            "[console_scripts]\n" + "".join(f"{k} = {v}\n" for k, v in console_scripts.items()),
+        )
+
+
+def time_it(run: Callable[[], None], repeat: int, setup: Callable[[], None]) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        setup()
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def uvpipx_cmd(home: SyntheticHome, *args: str) -> Callable[[], None]:
+    def run() -> None:
+        subprocess.run(  # nosec: B603  # noqa: S603
+            [sys.executable, "-m", "uvpipx", *args],
+            env=home.env(),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            check=True,
+        )
+
+    return run
+
+
+def bench_size(root: Path, nb_venvs: int, repeat: int) -> Dict[str, List[float]]:
+    home = SyntheticHome(root / f"home_{nb_venvs}", nb_venvs)
+    home.create()
+
+    def drop_state_db() -> None:
+        home.state_db.unlink(missing_ok=True)
+
+    def no_setup() -> None:
+        pass
+
+    def read_all_models() -> None:
+        for name in home.venv_names():
+            read_venv_model(home.venvs / name, name)
+
+    def read_all_states() -> None:
+        # what the state index keeps of each venv: its model and its installed versions
+        for name in home.venv_names():
+            read_venv_model(home.venvs / name, name)
+            installed_versions(home.venvs / name)
+
+    timings = {
+        "model load (read every uvpipx.json)": time_it(read_all_models, repeat, no_setup),
+        "model load (uvpipx.json and versions)": time_it(read_all_states, repeat, no_setup),
+        "model load (state index cold)": time_it(
+            lambda: StateIndex(home.state_db, home.venvs).refresh(),
+            repeat,
+            drop_state_db,
+        ),
+        "model load (state index warm)": time_it(
+            lambda: StateIndex(home.state_db, home.venvs).refresh(),
+            repeat,
+            no_setup,
+        ),
+        "list (cold)": time_it(uvpipx_cmd(home, "list"), repeat, drop_state_db),
+        "list": time_it(uvpipx_cmd(home, "list"), repeat, no_setup),
+        "info": time_it(uvpipx_cmd(home, "info", home.venv_names()[-1]), repeat, no_setup),
+        "expose-all": time_it(uvpipx_cmd(home, "expose-all", "__main__"), repeat, no_setup),
+        "uninstall-all": time_it(uvpipx_cmd(home, "uninstall-all"), repeat, home.create),
+    }
+    home.clean()
+
+    return timings
+
+
+def summarize(timings: List[float]) -> Dict[str, Any]:
+    return {
+        "median": statistics.median(timings),
+        "min": min(timings),
+        "max": max(timings),
+        "runs": timings,
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], max_ratio: float) -> List[str]:
+    regressions = []
+    print(f"\n{'benchmark':50} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for key, current in results["results"].items():
+        base = baseline["results"].get(key)
+        if base is None:
+            continue
+        ratio = current["median"] / base["median"] if base["median"] else float("inf")
+        flag = " 🔴" if ratio > max_ratio else ""
+        print(f"{key:50} {base['median'] * 1000:8.1f}ms {current['median'] * 1000:8.1f}ms {ratio:6.2f}x{flag}")
+        if ratio > max_ratio:
+            regressions.append(key)
+
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10,100,1000", help="comma separated numbers of venvs")
+    parser.add_argument("--repeat", type=int, default=3, help="number of runs of each benchmark")
+    parser.add_argument("--output", type=Path, help="write the results to this JSON file")
+    parser.add_argument("--baseline", type=Path, help="a previous JSON result file to compare with")
+    parser.add_argument("--max-ratio", type=float, default=1.25, help="allowed slowdown against the baseline")
+    args = parser.parse_args()
+
+    if sys.platform.startswith("win"):
+        parser.error("the synthetic homes use the unix venv layout and symlinks")
+
+    results: Dict[str, Any] = {
+        "meta": {
+            "uvpipx_version": uvpipx_version,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "repeat": args.repeat,
+        },
+        "results": {},
+    }
+
+    with tempfile.TemporaryDirectory(prefix="uvpipx_bench_") as tmp:
+        for nb_venvs in [int(size) for size in args.sizes.split(",")]:
+            print(f"\n📦 {nb_venvs} venvs")
+            for name, timings in bench_size(Path(tmp), nb_venvs, args.repeat).items():
+                summary = summarize(timings)
+                results["results"][f"{name} @ {nb_venvs}"] = summary
+                print(f"  {name:40} median {summary['median'] * 1000:9.1f} ms  min {summary['min'] * 1000:9.1f} ms")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=4))
+        print(f"\n💾 results written to {args.output}")
+
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.max_ratio)
+        if regressions:
+            print(f"\n🔴 {len(regressions)} regression(s) above {args.max_ratio}x the baseline")
+            sys.exit(1)
+        print("\n🟢 no regression against the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from uvpipx.UvPipxModels import (
+    UvPipxExposedModel,
+    UvPipxModel,
+    UvPipxPackageModel,
+    UvPipxVenvExposeAppModel,
+    UvPipxVenvModel,
+    to_dict,
+)
+
+
+def _make_venv(venvs_dir: Path, name: str, version: str) -> Path:
+    venv_path = venvs_dir / name
+    dist_info = venv_path / f".venv/lib/python3.12/site-packages/{name}-{version}.dist-info"
+    dist_info.mkdir(parents=True)
+    (dist_info / "METADATA").write_text(f"Name: {name}\nVersion: {version}\n\n")
+    model = UvPipxModel(
+        venv=UvPipxVenvModel(str(venv_path)),
+        main_package=UvPipxPackageModel(name, name),
+        injected_packages={},
+        exposed=UvPipxExposedModel(
+            str(venv_path / ".venv/bin"),
+            apps={name: UvPipxVenvExposeAppModel(name, f"/bin/dir/{name}", [name])},
+        ),
+    )
+    (venv_path / "uvpipx.json").write_text(json.dumps(to_dict(model)))
+    return venv_path
+
+
+def _make_exposed_venv(venvs_dir: Path, bin_dir: Path, name: str) -> Path:
+    venv_path = venvs_dir / name
+    venv_bin = venv_path / ".venv/bin"
+    venv_bin.mkdir(parents=True)
+    (venv_path / ".venv/lib/python3.12/site-packages").mkdir(parents=True)
+    for app in [name, "python"]:
+        (venv_bin / app).write_text("#!/bin/sh\n")
+    (bin_dir / name).symlink_to(venv_bin / name)
+    model = UvPipxModel(
+        venv=UvPipxVenvModel(str(venv_path)),
+        main_package=UvPipxPackageModel(name, name),
+        injected_packages={},
+        exposed=UvPipxExposedModel(
+            str(venv_bin),
+            apps={name: UvPipxVenvExposeAppModel(name, str(bin_dir / name), [name])},
+        ),
+    )
+    (venv_path / "uvpipx.json").write_text(json.dumps(to_dict(model)))
+    return venv_path
+
+
+@pytest.fixture
+def make_venv() -> Callable[[Path, str, str], Path]:
+    """a factory of uvpipx venvs (uvpipx.json and the dist-info of the package) in venvs_dir, without any uv call"""
+    return _make_venv
+
+
+@pytest.fixture
+def make_exposed_venv() -> Callable[[Path, Path, str], Path]:
+    """a factory of uvpipx venvs with their program exposed in bin_dir (a symlink), without any uv call"""
+    return _make_exposed_venv
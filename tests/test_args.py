@@ -1,3 +1,5 @@
+import pytest
+
 from uvpipx.internal_libs.args import Arg, ArgParser, ArgParserMode
 
 
@@ -78,3 +80,37 @@ def test_auto_extra() -> None:
     assert argp.extra_args == ["some", "stuff"]
 
     pass
+
+
+def test_positional_array(capsys: pytest.CaptureFixture[str]) -> None:
+    """a last positional in array mode takes all the remaining values"""
+    argp = ArgParser(
+        [
+            Arg("pkg", mode="array", help="the packages"),
+            Arg("--jobs"),
+        ],
+    )
+    argp.parse(["ruff", "jc", "--jobs", "4", "httpie"])
+    assert argp.args["pkg"].value == ["ruff", "jc", "httpie"]
+    assert argp.args["--jobs"].value == "4"
+
+    argp.print_help()
+    assert "  pkg ...            | the packages" in capsys.readouterr().out
+
+
+def test_inject_options_after_packages() -> None:
+    """the options of inject are parsed even after the packages to inject"""
+    from uvpipx.uvpipx_args import inject_parser
+
+    argp = inject_parser()
+    argp.parse(["cowsay", "art", "cowpy", "--format", "ndjson", "--trace", "inject.json"])
+    assert argp.args["python_pkg"].value == "cowsay"
+    assert argp.args["inject_python_pkg"].value == ["art", "cowpy"]
+    assert argp.args["--format"].value == "ndjson"
+    assert argp.args["--trace"].value == "inject.json"
+    assert argp.extra_args == []
+
+    argp = inject_parser()
+    argp.parse(["cowsay", "art", "--format", "ndjson", "--", "--pre"])
+    assert argp.args["inject_python_pkg"].value == ["art"]
+    assert argp.extra_args == ["--pre"]
@@ -0,0 +1,85 @@
+import os
+import signal
+import sys
+
+import pytest
+
+from uvpipx.internal_libs.misc import StreamRunner, exec_run, human_duration, parse_duration, stream_run
+
+
+def test_exec_run() -> None:
+    """argv is passed as is, without any shell quoting"""
+    rc, stdout, stderr = exec_run([sys.executable, "-c", "import sys; print(sys.argv[1:])", "foo>=1,<2", "a b"])
+    assert rc == 0
+    assert stdout == "['foo>=1,<2', 'a b']\n"
+
+    rc, stdout, stderr = exec_run([sys.executable, "-c", "import sys; sys.exit(3)"], raise_on_error=False)
+    assert rc == 3
+
+    with pytest.raises(RuntimeError, match="return code 3"):
+        exec_run([sys.executable, "-c", "import sys; sys.exit(3)"])
+
+
+def test_exec_run_not_found() -> None:
+    rc, stdout, stderr = exec_run(["uvpipx-not-a-program"], raise_on_error=False)
+    assert rc == 127
+
+    with pytest.raises(RuntimeError, match="failed to start"):
+        exec_run(["uvpipx-not-a-program"])
+
+
+def test_stream_run() -> None:
+    """lines are sent as they arrive, from both streams, and only a tail is kept"""
+    code = (
+        "import sys, time\nfor i in range(100):\n    print(i, flush=True)\nprint('err', file=sys.stderr)\nsys.exit(2)"
+    )
+    received = []
+
+    runner = stream_run(
+        [sys.executable, "-c", code],
+        on_line=lambda stream_name, line: received.append((stream_name, line)),
+        raise_on_error=False,
+    )
+
+    assert runner.returncode == 2
+    assert [line for stream_name, line in received if stream_name == "stdout"] == [str(i) for i in range(100)]
+    assert ("stderr", "err") in received
+    assert len(runner.tail) == runner.tail_size
+    with pytest.raises(RuntimeError, match="return code 2"):
+        runner.check()
+
+
+def test_stream_runner_lines() -> None:
+    runner = StreamRunner([sys.executable, "-c", "print('a')\nprint('b')"])
+    assert list(runner.lines()) == [("stdout", "a"), ("stdout", "b")]
+    assert runner.returncode == 0
+
+
+@pytest.mark.skipif(not hasattr(os, "wait4"), reason="no os.wait4 on windows")
+def test_stream_run_usage() -> None:
+    """the resources used by the command are measured, without changing its returncode"""
+    runner = stream_run([sys.executable, "-c", "x = bytearray(64 * 1024 * 1024)\nx[::4096] = b'a' * len(x[::4096])"])
+    assert runner.returncode == 0
+    assert runner.usage is not None
+    assert runner.usage.max_rss_kib > 64 * 1024
+    assert runner.usage.user_s + runner.usage.sys_s > 0
+    assert "max rss" in runner.usage.show()
+
+    runner = stream_run(
+        [sys.executable, "-c", "import os, signal\nos.kill(os.getpid(), signal.SIGTERM)"],
+        raise_on_error=False,
+    )
+    assert runner.returncode == -signal.SIGTERM
+
+
+def test_parse_duration() -> None:
+    assert parse_duration("90") == 90
+    assert parse_duration("30m") == 1800
+    assert parse_duration("1.5h") == 5400
+    assert parse_duration("7d") == 7 * 86400
+    for duration in ["", "h", "-1d", "nan", "soon"]:
+        with pytest.raises(ValueError, match="Invalid duration"):
+            parse_duration(duration)
+
+    assert human_duration(42) == "42s"
+    assert human_duration(5400) == "1.5h"
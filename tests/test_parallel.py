@@ -0,0 +1,55 @@
+import threading
+import time
+
+import pytest
+
+from uvpipx.internal_libs.Logger import get_logger
+from uvpipx.internal_libs.parallel import JobResult, default_jobs, run_jobs
+
+
+def test_run_jobs_parallel() -> None:
+    """jobs run concurrently, logs are buffered per job and failures are isolated"""
+    barrier = threading.Barrier(3, timeout=5)
+
+    def job(name: str) -> str:
+        get_logger("test_parallel").log_info(f"start {name}")
+        barrier.wait()  # deadlock (timeout) if the jobs are not concurrent
+        if name == "bad":
+            msg = "boom"
+            raise RuntimeError(msg)
+        get_logger("test_parallel").log_info(f"end {name}")
+        return name.upper()
+
+    done = []
+    results = run_jobs(
+        {name: (lambda n=name: job(n)) for name in ["a", "bad", "c"]},
+        max_workers=3,
+        on_done=done.append,
+    )
+
+    assert [r.name for r in results] == ["a", "bad", "c"]
+    assert sorted(r.name for r in done) == ["a", "bad", "c"]
+    assert results[0].ok
+    assert results[0].value == "A"
+    assert [e.message for e in results[0].logs] == ["start a", "end a"]
+    assert not results[1].ok
+    assert str(results[1].error) == "boom"
+    assert [e.message for e in results[1].logs] == ["start bad"]
+    assert results[2].interval_seconds >= 0
+
+
+def test_run_jobs_serial(capsys: pytest.CaptureFixture[str]) -> None:
+    """with one worker, jobs run in order and log directly"""
+    order = []
+
+    def job(name: str) -> None:
+        order.append(name)
+        get_logger("test_parallel").log_info(f"run {name}")
+        time.sleep(0.01)
+
+    results = run_jobs({name: (lambda n=name: job(n)) for name in ["x", "y"]}, max_workers=1)
+
+    assert order == ["x", "y"]
+    assert all(isinstance(r, JobResult) and r.ok and r.logs == [] for r in results)
+    assert capsys.readouterr().out == "run x\nrun y\n"
+    assert default_jobs() >= 1
@@ -0,0 +1,57 @@
+import random
+
+from uvpipx.internal_libs.pep440 import Version, diff_versions, is_prerelease, parse_version, version_key
+
+
+def test_version_order() -> None:
+    ordered = [
+        "0.9",
+        "1.0.dev0",
+        "1.0a1",
+        "1.0a1.post1",
+        "1.0b2",
+        "1.0rc1",
+        "1.0",
+        "1.0+local",
+        "1.0+local.5",
+        "1.0.post1",
+        "1.9",
+        "1.10",
+        "1!0.1",
+    ]
+    shuffled = ordered[:]
+    random.shuffle(shuffled)
+    assert sorted(shuffled, key=version_key) == ordered
+    assert sorted(["not a version", "1.0"], key=version_key) == ["not a version", "1.0"]
+
+
+def test_version_parse() -> None:
+    assert str(Version.parse("v1.0-ALPHA.2-r3.DEV_4+Ubuntu-1")) == "1.0a2.post3.dev4+ubuntu.1"
+    assert Version.parse("1.0") == Version.parse("1.0.0")
+    assert len({Version.parse("1.0"), Version.parse("1.0.0")}) == 1
+    assert Version.parse("1.0-1").post == 1
+    assert parse_version("1.0.0.x") is None
+    assert is_prerelease("2.0b1")
+    assert is_prerelease("2.0.dev1")
+    assert not is_prerelease("2.0.post1")
+
+
+def test_diff_versions() -> None:
+    old = {"jc": "1.24.0", "art": "6.2", "six": "1.16.0", "legacy": "abc", "same": "1.0"}
+    new = {"jc": "1.25.2", "art": "6.1", "pygments": "2.18.0", "legacy": "abd", "same": "1.0.0"}
+
+    diff = diff_versions(old, new)
+    assert diff.to_dict() == {
+        "added": {"pygments": "2.18.0"},
+        "removed": {"six": "1.16.0"},
+        "upgraded": {"jc": {"from": "1.24.0", "to": "1.25.2"}},
+        "downgraded": {"art": {"from": "6.2", "to": "6.1"}},
+        "changed": {"legacy": {"from": "abc", "to": "abd"}},
+    }
+    assert diff.lines()[0] == "⬆️  jc 1.24.0 -> 1.25.2"
+    assert not diff_versions(old, old)
+
+    # one pass over each dict, thousands of packages at once
+    many_old = {f"pkg-{i}": f"1.{i}" for i in range(5000)}
+    many_new = {f"pkg-{i}": f"1.{i + 1}" for i in range(5000)}
+    assert len(diff_versions(many_old, many_new).upgraded) == 5000
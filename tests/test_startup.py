@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import subprocess  # nosec: B404 # noqa: S404
+import sys
+from typing import List, Set
+
+import pytest
+
+from uvpipx import cmd_launcher
+from uvpipx.uvpipx_args import commands
+
+# modules of the other commands (and their heavy dependencies), never needed to run venv or info
+NOT_FOR_VENV_INFO = {
+    "uvpipx.uvpipx_all",
+    "uvpipx.uvpipx_expose",
+    "uvpipx.uvpipx_inject",
+    "uvpipx.uvpipx_install",
+    "uvpipx.uvpipx_outdated",
+    "uvpipx.uvpipx_upgrade",
+    "uvpipx.uvpipx_trash",
+    "uvpipx.internal_libs.parallel",
+    "concurrent.futures",
+}
+
+
+def imported_modules(args: List[str]) -> Set[str]:
+    result = subprocess.run(  # nosec: B603  # noqa: S603
+        [sys.executable, "-X", "importtime", "-m", "uvpipx", *args],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    return {line.rsplit("|", 1)[1].strip() for line in result.stderr.splitlines() if line.startswith("import time:")}
+
+
+def test_commands_registry() -> None:
+    for name, command in commands.items():
+        assert callable(getattr(cmd_launcher, command.launcher)), name
+        assert command.arg_parser().help == command.help
+
+
+@pytest.mark.parametrize("args", [["venv", "--help"], ["info", "--help"]])
+def test_help_imports_no_command_module(args: List[str]) -> None:
+    modules = imported_modules(args)
+
+    assert "uvpipx.cmd_launcher" in modules
+    assert not {m for m in modules if m.startswith("uvpipx.uvpipx_")} - {"uvpipx.uvpipx_args"}
+
+
+@pytest.mark.parametrize("args", [["venv", "not_installed_package"], ["info", "not_installed_package"]])
+def test_command_imports_only_its_modules(args: List[str]) -> None:
+    modules = imported_modules(args)
+
+    assert "uvpipx.uvpipx_venv_load" in modules
+    assert not modules & NOT_FOR_VENV_INFO
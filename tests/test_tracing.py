@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import json
+import os
+import pstats
+import subprocess  # nosec: B404 # noqa: S404
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from uvpipx.internal_libs.parallel import run_jobs
+from uvpipx.internal_libs.tracing import Tracer, get_tracer, profile_kinds, profiling, set_tracer, span
+
+
+def test_spans_nested_by_thread() -> None:
+    tracer = Tracer("uvpipx test")
+    set_tracer(tracer)
+    try:
+
+        @span("phase b")
+        def phase_b() -> None:
+            pass
+
+        def job(name: str) -> None:
+            with span(f"venv {name}", cat="venv", venv=name):
+                phase_b()
+
+        with span("phase a"):
+            pass
+        run_jobs({"x": lambda: job("x"), "y": lambda: job("y")}, max_workers=2)
+        with pytest.raises(RuntimeError), span("failing"):
+            raise RuntimeError("boom")  # noqa: EM101, TRY003
+        tracer.finish()
+    finally:
+        set_tracer(None)
+
+    trace = tracer.chrome_trace()
+    spans = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+    by_name = {e["name"]: e for e in spans}
+    assert spans[0]["name"] == "uvpipx test"
+    assert {"phase a", "venv x", "venv y", "phase b", "failing"} <= set(by_name)
+    assert by_name["venv x"]["args"] == {"venv": "x"}
+    assert by_name["failing"]["args"] == {"error": "boom"}
+
+    # each span is inside its parent, in the same thread
+    root = by_name["uvpipx test"]
+    for e in spans:
+        assert root["ts"] <= e["ts"]
+        assert e["ts"] + e["dur"] <= root["ts"] + root["dur"]
+    venv_x = by_name["venv x"]
+    phase_b_x = next(e for e in spans if e["name"] == "phase b" and e["tid"] == venv_x["tid"])
+    assert venv_x["ts"] <= phase_b_x["ts"] <= phase_b_x["ts"] + phase_b_x["dur"] <= venv_x["ts"] + venv_x["dur"]
+
+    thread_names = {e["tid"] for e in trace["traceEvents"] if e["ph"] == "M"}
+    assert thread_names == {e["tid"] for e in spans}
+
+
+def test_span_without_tracer() -> None:
+    assert get_tracer() is None
+    with span("nothing recorded"):
+        pass
+
+
+def test_profiling(tmp_path: Path) -> None:
+    assert profile_kinds("") == []
+    assert profile_kinds("cpu, memory") == ["cpu", "memory"]
+    with pytest.raises(ValueError, match="gpu"):
+        profile_kinds("cpu,gpu")
+
+    def job_in_thread() -> List[int]:
+        return sorted(range(10000), key=lambda n: -n)
+
+    with profiling(["cpu", "memory"], tmp_path / "profiles" / "list") as written:
+        run_jobs({"job1": job_in_thread, "job2": job_in_thread}, max_workers=2)
+
+    assert [path.name for path in written] == ["list.prof", "list.memory.txt"]
+    assert all(path.is_file() for path in written)
+    assert written[1].read_text().startswith("peak ")
+    # the jobs run in the worker threads are in the cpu profile
+    assert any(func[2] == "job_in_thread" for func in pstats.Stats(str(written[0])).stats)  # type: ignore[attr-defined]
+
+
+def test_trace_arg(tmp_path: Path) -> None:
+    env = {
+        **os.environ,
+        "UVPIPX_LOCAL_VENVS": str(tmp_path / "venvs"),
+        "UVPIPX_BIN_DIR": str(tmp_path / "bin"),
+    }
+    result = subprocess.run(  # nosec: B603, B607  # noqa: S603
+        ["uvpipx", "list", "--trace", str(tmp_path / "trace.json")],  # noqa: S607
+        capture_output=True,
+        text=True,
+        env=env,
+        check=False,
+    )
+    assert result.returncode == 0, result.stderr
+
+    trace = json.loads((tmp_path / "trace.json").read_text())
+    root = next(e for e in trace["traceEvents"] if e["ph"] == "X")
+    assert (root["name"], root["cat"], root["args"]) == ("uvpipx list", "command", {"status": "ok"})
@@ -343,3 +343,49 @@ class TestBasicInsAllUninstall:
 
         assert not venv_jc_path.exists()
         assert not (Path(runenv["UVPIPX_BIN_DIR"]) / "jc").exists()
+
+
+class TestBasicInstallMany:
+    def test_install_many(self, env_setup: tuple[str, dict, str]) -> None:
+        uvpipx_local_venvs, uvenvs, uvpipx_bin_dir = env_setup
+        runenv = {**os.environ, **uvenvs}
+
+        result = subprocess.run(  # nosec: B603, B607  # noqa: S603, S607
+            ["uvpipx", "install", "jc", "art", "--jobs", "2"],  # noqa: S603, S607
+            capture_output=True,
+            text=True,
+            env=runenv,
+            check=False,
+        )
+
+        assert result.returncode == 0
+        assert "2 🟢 succeeded, 0 🔴 failed" in result.stdout
+        assert (Path(runenv["UVPIPX_BIN_DIR"]) / "jc").exists()
+        assert (Path(runenv["UVPIPX_BIN_DIR"]) / "art").exists()
+
+        result = subprocess.run(  # nosec: B603, B607  # noqa: S603, S607
+            ["uvpipx", "install", "this-package-does-not-exist-uvpipx", "jc", "--jobs", "2"],  # noqa: S603, S607
+            capture_output=True,
+            text=True,
+            env=runenv,
+            check=False,
+        )
+
+        assert result.returncode == 1
+        assert "1 🟢 succeeded, 1 🔴 failed" in result.stdout
+
+    def test_install_many_same_venv(self, env_setup: tuple[str, dict, str]) -> None:
+        uvpipx_local_venvs, uvenvs, uvpipx_bin_dir = env_setup
+        runenv = {**os.environ, **uvenvs}
+
+        result = subprocess.run(  # nosec: B603, B607  # noqa: S603, S607
+            ["uvpipx", "install", "jc", "art", "jc==1.25.2", "--jobs", "2"],  # noqa: S603, S607
+            capture_output=True,
+            text=True,
+            env=runenv,
+            check=False,
+        )
+
+        assert result.returncode == 1
+        assert "Packages installed in the same venv: jc and jc==1.25.2 in jc" in result.stderr
+        assert "succeeded" not in result.stdout  # no install started
@@ -0,0 +1,88 @@
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from uvpipx import uvpipx_dedup
+from uvpipx.uvpipx_dedup import Deduplicator
+from uvpipx.uvpipx_state import StateIndex
+
+SITE_PACKAGES = ".venv/lib/python3.12/site-packages"
+
+
+def write_module(venv_path: Path, rel_path: str, content: str) -> Path:
+    path = venv_path / SITE_PACKAGES / rel_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+    return path
+
+
+def test_dedup(tmp_path: Path, make_venv: Callable[[Path, str, str], Path]) -> None:
+    """identical files of the venvs are hardlinked, a dry run only reports and an incremental pass skips the venvs"""
+    venvs_dir = tmp_path / "venvs"
+    jc = make_venv(venvs_dir, "jc", "1.25.2")
+    art = make_venv(venvs_dir, "art", "6.2")
+    common = "x = 1\n" * 100
+    jc_file = write_module(jc, "six/__init__.py", common)
+    art_file = write_module(art, "six/__init__.py", common)
+    write_module(jc, "jc/other.py", "y = 2\n" * 100)
+    write_module(art, "art/other.py", "z = 3\n" * 100)  # same size, other content
+
+    index = StateIndex(tmp_path / "state.sqlite", venvs_dir)
+
+    report = Deduplicator(dry_run=True, state_index=index).run()
+    assert (report.nb_venvs, report.nb_scanned_venvs, report.nb_linked) == (2, 2, 1)
+    assert report.reclaimed_bytes == len(common)
+    assert jc_file.stat().st_ino != art_file.stat().st_ino
+
+    report = Deduplicator(state_index=index).run()
+    assert (report.nb_linked, report.reclaimed_bytes) == (1, len(common))
+    assert jc_file.stat().st_ino == art_file.stat().st_ino
+    assert jc_file.stat().st_nlink == 2
+    assert art_file.read_text() == common
+
+    # nothing changed: no venv is scanned again
+    report = Deduplicator(incremental=True, state_index=index).run()
+    assert (report.nb_scanned_venvs, report.nb_hashed, report.nb_linked) == (0, 0, 0)
+
+    # a new venv: only it is scanned and hashed, its file is linked to the existing inode
+    tool = make_venv(venvs_dir, "tool", "1.0")
+    tool_file = write_module(tool, "six/__init__.py", common)
+    report = Deduplicator(incremental=True, state_index=index).run()
+    assert (report.nb_venvs, report.nb_scanned_venvs, report.nb_hashed, report.nb_linked) == (3, 1, 1, 1)
+    assert tool_file.stat().st_ino == jc_file.stat().st_ino
+
+
+def test_dedup_save_by_batch(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    make_venv: Callable[[Path, str, str], Path],
+) -> None:
+    """the index is not locked while hashing, and a save interrupted before the venvs only rescans them"""
+    venvs_dir = tmp_path / "venvs"
+    db_path = tmp_path / "state.sqlite"
+    jc = make_venv(venvs_dir, "jc", "1.25.2")
+    art = make_venv(venvs_dir, "art", "6.2")
+    common = "x = 1\n" * 100
+    write_module(jc, "six/__init__.py", common)
+    write_module(art, "six/__init__.py", common)
+
+    def file_digest(path: str) -> str:
+        with closing(sqlite3.connect(str(db_path), timeout=0)) as con:
+            con.execute("BEGIN IMMEDIATE")  # another process writing the index
+            con.rollback()
+        return digest(path)
+
+    digest = uvpipx_dedup.file_digest
+    monkeypatch.setattr(uvpipx_dedup, "file_digest", file_digest)
+    monkeypatch.setattr(uvpipx_dedup, "SAVE_BATCH_SIZE", 1)
+    index = StateIndex(db_path, venvs_dir)
+    report = Deduplicator(state_index=index).run()
+    assert (report.nb_hashed, report.nb_linked) == (2, 1)
+
+    with index.connect() as con:
+        con.execute("DELETE FROM dedup_venv WHERE venv_path = ?", (str(jc),))
+    report = Deduplicator(incremental=True, state_index=index).run()
+    assert (report.nb_scanned_venvs, report.nb_hashed, report.nb_linked) == (1, 0, 0)
@@ -0,0 +1,60 @@
+import os
+import time
+from pathlib import Path
+from typing import Callable
+
+from uvpipx.uvpipx_doctor import (
+    DANGLING_LINK,
+    DELETED_VENV_LINK,
+    MISSING_LINK,
+    NEW_VENV,
+    ORPHAN_VENV,
+    ORPHAN_VENV_MIN_AGE,
+    UNTRACKED_LINK,
+    Doctor,
+)
+from uvpipx.uvpipx_state import StateIndex
+
+
+def test_doctor(tmp_path: Path, make_exposed_venv: Callable[[Path, Path, str], Path]) -> None:
+    """the stale links and orphan venvs are found in one scan, and fixed in bulk"""
+    venvs_dir = tmp_path / "venvs"
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    jc = make_exposed_venv(venvs_dir, bin_dir, "jc")
+    make_exposed_venv(venvs_dir, bin_dir, "art")
+
+    (bin_dir / "jc-python").symlink_to(jc / ".venv/bin/python")  # an injected app left behind
+    (bin_dir / "removed").symlink_to(jc / ".venv/bin/removed")
+    (bin_dir / "gone").symlink_to(venvs_dir / "gone/.venv/bin/gone")
+    (bin_dir / "not-uvpipx").symlink_to("/usr/bin/env")
+    (bin_dir / "art").unlink()
+    (venvs_dir / "orphan/.venv").mkdir(parents=True)
+    for path in [venvs_dir / "orphan/.venv", venvs_dir / "orphan"]:
+        os.utime(path, (time.time() - 2 * ORPHAN_VENV_MIN_AGE,) * 2)
+    (venvs_dir / "installing/.venv").mkdir(parents=True)  # uvpipx.json is written at the end of the install
+
+    index = StateIndex(tmp_path / "state.sqlite", venvs_dir)
+    report = Doctor(bin_dir=bin_dir, state_index=index).run()
+    assert report.nb_bin_entries == 5
+    assert sorted((issue.kind, issue.path.name) for issue in report.issues) == sorted(
+        [
+            (UNTRACKED_LINK, "jc-python"),
+            (DANGLING_LINK, "removed"),
+            (DELETED_VENV_LINK, "gone"),
+            (ORPHAN_VENV, "orphan"),
+            (NEW_VENV, "installing"),
+            (MISSING_LINK, "art"),
+        ],
+    )
+    assert not any(issue.fixed for issue in report.issues)
+
+    report = Doctor(fix=True, bin_dir=bin_dir, state_index=index).run()
+    assert [issue.path.name for issue in report.issues if not issue.fixed] == ["installing"]
+    assert sorted(p.name for p in bin_dir.iterdir()) == ["art", "jc", "not-uvpipx"]
+    assert (bin_dir / "art").resolve() == venvs_dir / "art/.venv/bin/art"
+    assert not (venvs_dir / "orphan").exists()
+    assert (venvs_dir / "installing/.venv").is_dir()  # a venv being installed is never trashed
+
+    report = Doctor(bin_dir=bin_dir, state_index=index).run()
+    assert [(issue.kind, issue.path.name) for issue in report.issues] == [(NEW_VENV, "installing")]
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import io
+import json
+import os
+import subprocess  # nosec: B404 # noqa: S404
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+from uvpipx.internal_libs.Logger import EventSink, Logger, LogMode, OutputFormat, get_event_sink, set_event_sink
+
+
+def test_event_sink_ndjson() -> None:
+    stream = io.StringIO()
+    logger = Logger(log_mode=LogMode.BUFFER)
+    set_event_sink(EventSink(OutputFormat.NDJSON, stream))
+    try:
+        with logger.operation_events("install", package="jc") as result:
+            logger.log_event("app.exposed", app="jc", path=Path("/bin/jc"))
+            result["venv"] = "jc"
+        with pytest.raises(RuntimeError), logger.operation_events("upgrade", venv="jc"):
+            raise RuntimeError("boom")  # noqa: EM101, TRY003
+    finally:
+        set_event_sink(None)
+
+    events = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [e["event"] for e in events] == [
+        "install.started",
+        "app.exposed",
+        "install.finished",
+        "upgrade.started",
+        "upgrade.finished",
+    ]
+    assert events[1]["path"] == "/bin/jc"
+    assert (events[2]["package"], events[2]["venv"], events[2]["status"]) == ("jc", "jc", "ok")
+    assert events[2]["duration_s"] >= 0
+    assert (events[4]["status"], events[4]["error"]) == ("failed", "boom")
+
+
+def test_event_sink_json() -> None:
+    stream = io.StringIO()
+    sink = EventSink(OutputFormat.JSON, stream)
+    sink.close()
+    assert json.loads(stream.getvalue()) == []
+
+    stream = io.StringIO()
+    sink = EventSink(OutputFormat.JSON, stream)
+    sink.emit("venv.listed", {"venv": "jc"})
+    sink.emit("venv.listed", {"venv": "art"})
+    sink.close()
+    assert [e["venv"] for e in json.loads(stream.getvalue())] == ["jc", "art"]
+
+    assert get_event_sink() is None  # the sinks are only set by the commands
+
+
+def run_uvpipx(args: List[str], env: Dict[str, str]) -> subprocess.CompletedProcess:
+    return subprocess.run(  # nosec: B603, B607  # noqa: S603
+        ["uvpipx", *args],  # noqa: S607
+        capture_output=True,
+        text=True,
+        env=env,
+        check=False,
+    )
+
+
+def test_commands_ndjson(tmp_path: Path) -> None:
+    """with --format ndjson stdout only has the events, the logs are on stderr"""
+    env = {
+        **os.environ,
+        "UVPIPX_LOCAL_VENVS": str(tmp_path / "venvs"),
+        "UVPIPX_BIN_DIR": str(tmp_path / "bin"),
+    }
+
+    result = run_uvpipx(["install", "jc", "--format", "ndjson"], env)
+    assert result.returncode == 0, result.stderr
+    events: List[Dict[str, Any]] = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [e["event"] for e in events] == [
+        "install.started",
+        "uv.finished",
+        "uv.finished",
+        "app.exposed",
+        "install.finished",
+        "command.finished",
+    ]
+    assert [(e["command"], e["venv"], e["returncode"]) for e in events[1:3]] == [
+        ("uv venv", "jc", 0),
+        ("uv pip install", "jc", 0),
+    ]
+    assert events[2]["usage"]["max_rss_kib"] > 0
+    assert events[3]["app"] == "jc"
+    assert (events[4]["venv"], events[4]["status"]) == ("jc", "ok")
+    assert "install" in events[4]["uv"]["phases"]
+    assert events[4]["uv"]["usage"]["user_s"] >= events[2]["usage"]["user_s"]
+    assert (events[5]["command"], events[5]["status"]) == ("install", "ok")
+    assert "uvpipx venv jc with jc ready" in result.stderr
+
+    result = run_uvpipx(["list", "--format", "json"], env)
+    assert result.returncode == 0, result.stderr
+    listed, finished = json.loads(result.stdout)
+    assert (listed["event"], listed["main_package"], listed["valid"]) == ("venv.listed", "jc", True)
+    assert listed["version"]
+    assert list(listed["exposed_apps"]) == ["jc"]
+    assert finished["event"] == "command.finished"
+
+    result = run_uvpipx(["uninstall", "jc", "--format", "ndjson"], env)
+    assert result.returncode == 0, result.stderr
+    events = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [e["event"] for e in events] == [
+        "uninstall.started",
+        "app.unexposed",
+        "uninstall.finished",
+        "command.finished",
+    ]
+
+    result = run_uvpipx(["list", "--format", "xml"], env)
+    assert result.returncode != 0
+    assert "--format must be one of text, json, ndjson" in result.stderr
@@ -4,10 +4,17 @@ import os
 import subprocess  # nosec: B404  # noqa: S404
 import tempfile
 from pathlib import Path
-from typing import Any, Dict, Generator, Tuple
+from typing import Any, Callable, Dict, Generator, Tuple
 
 import pytest
 
+from uvpipx import config, uvpipx_core
+from uvpipx.uvpipx_core import PathLink, UvPipxVenv
+from uvpipx.uvpipx_expose import ExposeApps
+from uvpipx.uvpipx_state import StateIndex
+from uvpipx.uvpipx_venv_factory import expose_app_model
+from uvpipx.UvPipxModels import UvPipxExposeInstallSets
+
 
 @pytest.fixture(scope="class")
 def env_setup() -> Generator[Tuple[str, Dict, str], Any, None]:
@@ -106,3 +113,152 @@ class TestExposeAll:
 
         assert result.returncode == 0
         assert "program bandit-config-generator" in result.stdout
+
+
+def test_copy_mode_stamp(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """a copied app is validated with its stamp (stat only), the contents are compared only when a file changed"""
+    app = tmp_path / "venv" / "tool"
+    app.parent.mkdir()
+    app.write_text("#!/usr/bin/env python\nprint('tool')\n")
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+
+    path_link = PathLink(app, bin_dir / "tool", copy=True)
+    path_link.link()
+    assert not (bin_dir / "tool").is_symlink()
+    assert path_link.stamp is not None
+    assert path_link.stamp.mtime_ns == app.stat().st_mtime_ns
+
+    md5_calls = []
+    file_md5 = uvpipx_core.file_md5
+    monkeypatch.setattr(uvpipx_core, "file_md5", lambda path: md5_calls.append(path) or file_md5(path))
+
+    reloaded = PathLink(app, bin_dir / "tool", stamp=path_link.stamp, copy=True)
+    assert reloaded.is_valid()
+    assert md5_calls == []
+
+    # same contents, another mtime: valid by contents, the stamp is dropped to be made again
+    os.utime(app, ns=(0, 0))
+    assert reloaded.is_valid()
+    assert len(md5_calls) == 2
+    assert reloaded.stamp is None
+
+    (bin_dir / "tool").write_text("#!/bin/sh\necho other\n")
+    assert not PathLink(app, bin_dir / "tool", stamp=path_link.stamp, copy=True).is_valid()
+
+
+def test_expose_mode(monkeypatch: pytest.MonkeyPatch) -> None:
+    """a bad UVPIPX_EXPOSE_MODE fails the commands exposing programs, not the import of uvpipx"""
+    monkeypatch.setattr(config, "uvpipx_expose_mode", "hardlink")
+
+    with pytest.raises(RuntimeError, match="UVPIPX_EXPOSE_MODE must be symlink or copy, got hardlink"):
+        uvpipx_core.expose_copy_mode()
+
+
+def test_find_conflicts(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    make_exposed_venv: Callable[[Path, Path, str], Path],
+) -> None:
+    """all the conflicts are found before linking, with the venv owning each exposed path"""
+    venvs_dir, bin_dir = tmp_path / "venvs", tmp_path / "bin"
+    bin_dir.mkdir()
+    monkeypatch.setattr(config, "uvpipx_venvs", venvs_dir)
+    monkeypatch.setattr(config, "uvpipx_local_bin", bin_dir)
+    monkeypatch.setattr(config, "uvpipx_state_db", tmp_path / "state.sqlite")
+    make_exposed_venv(venvs_dir, bin_dir, "jc")
+    tool = make_exposed_venv(venvs_dir, bin_dir, "tool")
+    (bin_dir / "python").write_text("not uvpipx")
+
+    tool_bin = tool / ".venv/bin"
+    conflicts = ExposeApps(UvPipxVenv(tool)).find_conflicts(
+        [tool_bin / "tool", tool_bin / "python", tool_bin / "jc"],
+        {"jc": "jc"},
+    )
+    assert conflicts == {
+        "python": f"{bin_dir / 'python'} already exist",
+        "jc": f"{bin_dir / 'jc'} already exposed by venv jc",
+    }
+
+
+def test_planned_apps(tmp_path: Path) -> None:
+    """the apps known before the install, so their conflicts are reported before uv runs"""
+    venv = UvPipxVenv(tmp_path / "venvs" / "tool")
+    venv_bin = tmp_path / "venvs/tool/.venv/bin"
+    expo_app = ExposeApps(venv)
+
+    assert expo_app.planned_apps(["__main__"], "tool") == ([venv_bin / "tool"], {})
+    assert expo_app.planned_apps(["tool", "tool-extra:extra"], "tool") == (
+        [venv_bin / "tool", venv_bin / "tool-extra"],
+        {"tool-extra": "extra"},
+    )
+    assert expo_app.planned_apps(["__all__"], "tool") == ([], {})
+
+
+def test_reexpose(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    make_exposed_venv: Callable[[Path, Path, str], Path],
+) -> None:
+    """only the apps added are linked, and the apps removed (even gone from the venv) are unlinked"""
+    venvs_dir, bin_dir = tmp_path / "venvs", tmp_path / "bin"
+    bin_dir.mkdir()
+    monkeypatch.setattr(config, "uvpipx_venvs", venvs_dir)
+    monkeypatch.setattr(config, "uvpipx_local_bin", bin_dir)
+    monkeypatch.setattr(config, "uvpipx_state_db", tmp_path / "state.sqlite")
+    tool = make_exposed_venv(venvs_dir, bin_dir, "tool")
+    tool_bin = tool / ".venv/bin"
+    (tool_bin / "tool-extra").write_text("#!/bin/sh\n")
+    for app in tool_bin.iterdir():
+        app.chmod(0o755)
+    tool_link_mtime = (bin_dir / "tool").lstat().st_mtime_ns
+
+    state = StateIndex().load(tool, "tool")
+    install_sets = [UvPipxExposeInstallSets(["tool"], ["__all__"])]
+    apps = ExposeApps(UvPipxVenv(tool), prev_exposed=state.model.exposed).reexpose("tool", install_sets)
+    assert sorted(apps) == ["tool", "tool-extra"]
+    assert (bin_dir / "tool-extra").resolve() == tool_bin / "tool-extra"
+    assert (bin_dir / "tool").lstat().st_mtime_ns == tool_link_mtime  # not linked again
+
+    (tool_bin / "tool").unlink()
+    state.model.exposed.apps = apps
+    apps = ExposeApps(UvPipxVenv(tool), prev_exposed=state.model.exposed).reexpose("tool", install_sets)
+    assert sorted(apps) == ["tool-extra"]
+    assert not (bin_dir / "tool").is_symlink()
+
+
+def test_reexpose_upgraded_copy(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    make_exposed_venv: Callable[[Path, Path, str], Path],
+) -> None:
+    """a copied app kept is copied again when the app of the venv changed (upgrade), not when it is unchanged"""
+    venvs_dir, bin_dir = tmp_path / "venvs", tmp_path / "bin"
+    bin_dir.mkdir()
+    monkeypatch.setattr(config, "uvpipx_venvs", venvs_dir)
+    monkeypatch.setattr(config, "uvpipx_local_bin", bin_dir)
+    monkeypatch.setattr(config, "uvpipx_state_db", tmp_path / "state.sqlite")
+    monkeypatch.setattr(config, "uvpipx_expose_mode", "copy")
+    tool = make_exposed_venv(venvs_dir, bin_dir, "tool")
+    tool_bin = tool / ".venv/bin"
+    (tool_bin / "tool").chmod(0o755)
+    (bin_dir / "tool").unlink()
+    path_link = PathLink(tool_bin / "tool", bin_dir / "tool")
+    path_link.link()
+
+    state = StateIndex().load(tool, "tool")
+    state.model.exposed.apps = {"tool": expose_app_model("tool", path_link, ["tool"])}
+    install_sets = [UvPipxExposeInstallSets(["tool"], ["__all__"])]
+    copy_mtime = (bin_dir / "tool").stat().st_mtime_ns
+
+    apps = ExposeApps(UvPipxVenv(tool), prev_exposed=state.model.exposed).reexpose("tool", install_sets)
+    assert apps["tool"] == state.model.exposed.apps["tool"]
+    assert (bin_dir / "tool").stat().st_mtime_ns == copy_mtime  # not copied again
+
+    (tool_bin / "tool").write_text("#!/bin/sh\necho upgraded\n")
+    os.utime(tool_bin / "tool", ns=(copy_mtime + 10**9, copy_mtime + 10**9))
+    apps = ExposeApps(UvPipxVenv(tool), prev_exposed=state.model.exposed).reexpose("tool", install_sets)
+    assert not (bin_dir / "tool").is_symlink()
+    assert (bin_dir / "tool").read_text() == "#!/bin/sh\necho upgraded\n"
+    assert apps["tool"].mtime_ns == copy_mtime + 10**9
+    assert apps["tool"].md5 == uvpipx_core.file_md5(tool_bin / "tool")
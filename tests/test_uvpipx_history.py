@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import datetime
+from pathlib import Path
+
+import pytest
+
+from uvpipx import config
+from uvpipx.internal_libs.Logger import Logger, LogMode
+from uvpipx.uvpipx_history import HistoryStats, percentile, read_history, record_operation, uv_version
+from uvpipx.uvpipx_uv import uv_operation
+
+
+def test_percentile() -> None:
+    assert percentile([3.0], 95) == 3.0
+    assert percentile([4.0, 1.0, 3.0, 2.0], 50) == 2.5
+    assert percentile([float(n) for n in range(1, 101)], 95) == pytest.approx(95.05)
+
+
+def test_record_and_read(tmp_path: Path) -> None:
+    history = tmp_path / "home" / "history.jsonl"
+    record_operation("install", {"package": "jc"}, {"status": "ok", "venv": "jc", "duration_s": 1.5}, history)
+    with history.open("a") as outfile:
+        outfile.write('{"operation": "upgrade", "ven')  # an interrupted write
+    record_operation("upgrade", {"venv": "jc"}, {"status": "ok", "duration_s": 2, "path": tmp_path}, history)
+
+    records = list(read_history(history))
+    assert [r["operation"] for r in records] == ["install", "upgrade"]
+    assert (records[0]["package"], records[0]["venv"], records[0]["duration_s"]) == ("jc", "jc", 1.5)
+    assert records[1]["path"] == str(tmp_path)
+    assert records[0]["uvpipx_version"]
+    assert "uv_version" in records[0]
+    assert list(read_history(tmp_path / "none.jsonl")) == []
+
+
+def test_record_without_uv(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """uv not found: the operation is recorded without uv version, and its own error is not hidden"""
+    monkeypatch.setenv("PATH", str(tmp_path / "empty"))
+    monkeypatch.setattr(config, "uvpipx_history", tmp_path / "history.jsonl")
+    uv_version.cache_clear()
+    msg = "the real error"
+    try:
+        with (
+            pytest.raises(KeyError, match="the real error"),
+            uv_operation(
+                Logger(log_mode=LogMode.BUFFER),
+                "uninstall",
+                venv="jc",
+            ),
+        ):
+            raise KeyError(msg)
+    finally:
+        uv_version.cache_clear()
+
+    records = list(read_history())
+    assert [(r["operation"], r["status"], r["uv_version"]) for r in records] == [("uninstall", "failed", "")]
+
+
+def test_history_stats() -> None:
+    now = datetime.datetime.now().astimezone()
+    records = [
+        {"operation": "upgrade", "venv": "ruff", "status": "ok", "duration_s": d, "ts": now.isoformat()}
+        for d in (1.0, 1.2, 0.8, 11.0)
+    ]
+    records += [
+        {"operation": "upgrade", "venv": "jc", "status": "skipped", "duration_s": 0.001, "ts": now.isoformat()},
+        {"operation": "install", "package": "nope", "status": "failed", "duration_s": 0.5, "ts": now.isoformat()},
+        {"operation": "install", "venv": "old", "status": "ok", "duration_s": 9, "ts": "2020-01-01T00:00:00+00:00"},
+    ]
+
+    stats = HistoryStats.of(iter(records))
+    assert stats.nb_records == 7
+    upgrade = stats.by_operation["upgrade"]
+    assert (upgrade.nb_runs, upgrade.nb_skipped, upgrade.p50) == (5, 1, 1.1)
+    assert stats.by_venv[("nope", "install")].nb_failed == 1
+    assert [key for key, _ in stats.slowest(2)] == [("old", "install"), ("ruff", "upgrade")]
+    assert stats.by_venv[("ruff", "upgrade")].trend() == pytest.approx(11.0)
+    assert [key for key, _ in stats.regressions()] == [("ruff", "upgrade")]
+
+    stats = HistoryStats.of(iter(records), venv_names=["jc", "old"], since=now - datetime.timedelta(days=1))
+    assert (stats.nb_records, list(stats.by_venv)) == (1, [("jc", "upgrade")])
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from uvpipx import config
+from uvpipx.uvpipx_install import bin_links_by_venv, unlink_stale_links
+
+
+def test_unlink_stale_links(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """the bin directory is scanned once, then the links of each venv are removed from the map"""
+    venvs_dir = tmp_path / "venvs"
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    monkeypatch.setattr(config, "uvpipx_venvs", venvs_dir)
+    monkeypatch.setattr(config, "uvpipx_local_bin", bin_dir)
+    for venv_name, app in [("jc", "jc"), ("jc", "jc-injected"), ("art", "art")]:
+        (bin_dir / app).symlink_to(venvs_dir / venv_name / ".venv" / "bin" / app)
+    (bin_dir / "other").symlink_to(tmp_path / "other")
+    (bin_dir / "file").write_text("")
+
+    bin_links = bin_links_by_venv()
+
+    assert sorted(bin_links) == [venvs_dir / "art", venvs_dir / "jc"]
+    assert sorted(link.name for link in bin_links[venvs_dir / "jc"]) == ["jc", "jc-injected"]
+
+    (bin_dir / "jc").unlink()  # an app of the model, removed before
+    assert unlink_stale_links(venvs_dir / "jc", bin_links) == [bin_dir / "jc-injected"]
+    assert unlink_stale_links(venvs_dir / "art") == [bin_dir / "art"]  # scanned now
+    assert sorted(path.name for path in bin_dir.iterdir()) == ["file", "other"]
@@ -0,0 +1,77 @@
+import json
+from pathlib import Path
+
+from uvpipx.uvpipx_core import UvPipxVenv
+from uvpipx.uvpipx_metadata import installed_dists, installed_versions, normalize_name, site_packages_dirs
+
+
+def make_dist_info(site_packages: Path, dir_name: str, name: str, version: str) -> Path:
+    dist_info = site_packages / f"{dir_name}.dist-info"
+    dist_info.mkdir(parents=True)
+    (dist_info / "METADATA").write_text(
+        f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n\nName: not a header\n",
+    )
+    return dist_info
+
+
+def test_installed_dists(tmp_path: Path) -> None:
+    """dist-info are read like uv pip freeze shows them"""
+    site_packages = tmp_path / ".venv/lib/python3.12/site-packages"
+    make_dist_info(site_packages, "Pygments-2.18.0", "Pygments", "2.18.0")
+    make_dist_info(site_packages, "ruamel.yaml-0.18.6", "ruamel.yaml", "0.18.6")
+    git_dist = make_dist_info(site_packages, "art-6.2", "art", "6.2")
+    (git_dist / "direct_url.json").write_text(
+        json.dumps({"url": "https://github.com/sepandhaghighi/art", "vcs_info": {"vcs": "git", "commit_id": "abc"}}),
+    )
+    (site_packages / "broken.dist-info").mkdir()
+
+    assert site_packages_dirs(tmp_path) == [site_packages]
+    assert [d.name for d in installed_dists(tmp_path)] == ["art", "pygments", "ruamel-yaml"]
+    assert installed_versions(tmp_path) == {"art": "6.2", "pygments": "2.18.0", "ruamel-yaml": "0.18.6"}
+
+    venv = UvPipxVenv(tmp_path)
+    assert (
+        venv.freeze() == "art @ git+https://github.com/sepandhaghighi/art@abc\npygments==2.18.0\nruamel-yaml==0.18.6\n"
+    )
+    assert venv.installed_versions()["ruamel-yaml"] == "0.18.6"
+
+
+def test_unknown_layout(tmp_path: Path) -> None:
+    assert site_packages_dirs(tmp_path) == []
+    assert installed_dists(tmp_path) is None
+    assert normalize_name("Ruamel_Yaml.clib") == "ruamel-yaml-clib"
+
+
+def test_update_metadata_in_process(tmp_path: Path) -> None:
+    """console_scripts are collected without running the python of the venv"""
+    site_packages = tmp_path / ".venv/lib/python3.12/site-packages"
+    dist_info = make_dist_info(site_packages, "jc-1.25.2", "jc", "1.25.2")
+    (dist_info / "entry_points.txt").write_text("[console_scripts]\njc = jc.cli:main\n")
+
+    venv = UvPipxVenv(tmp_path)  # no python in this venv, a subprocess would fail
+    venv.update_metadata(force=True)
+
+    metadata = json.loads((tmp_path / "pip_metadata.json").read_text())
+    assert metadata == {"console_scripts": {"jc": {"jc": "jc.cli:main"}}}
+
+
+def test_update_metadata_fingerprint(tmp_path: Path) -> None:
+    """pip_metadata.json is generated again only when the entry points change"""
+    site_packages = tmp_path / ".venv/lib/python3.12/site-packages"
+    dist_info = make_dist_info(site_packages, "jc-1.25.2", "jc", "1.25.2")
+    (dist_info / "entry_points.txt").write_text("[console_scripts]\njc = jc.cli:main\n")
+
+    venv = UvPipxVenv(tmp_path)
+    assert venv.update_metadata()
+    assert not venv.update_metadata()
+
+    # an upgrade: another dist-info directory
+    dist_info.rename(site_packages / "jc-1.25.3.dist-info")
+    assert venv.update_metadata()
+    assert not venv.update_metadata()
+
+    art = make_dist_info(site_packages, "art-6.2", "art", "6.2")
+    (art / "entry_points.txt").write_text("[console_scripts]\nart = art:main\n")
+    assert venv.update_metadata()
+    metadata = json.loads((tmp_path / "pip_metadata.json").read_text())
+    assert metadata["console_scripts"]["art"] == {"art": "art:main"}
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, Generator, List
+
+import pytest
+
+from uvpipx import config
+from uvpipx.internal_libs.http_utils import ConnectionPool, HttpCache, HttpClient, HttpError, HttpResponse
+from uvpipx.uvpipx_outdated import Outdated, latest_version, project_page, project_versions
+from uvpipx.uvpipx_state import StateIndex
+
+PROJECTS = {
+    "jc": ["jc-1.24.0-py3-none-any.whl", "jc-1.25.2.tar.gz", "jc-1.25.3rc1-py3-none-any.whl"],
+    "art": ["art-6.2-py3-none-any.whl"],
+}
+
+
+class IndexHandler(BaseHTTPRequestHandler):
+    """A stand-in PEP 691 index, counting the requests and the not modified answers"""
+
+    protocol_version = "HTTP/1.1"  # keep-alive
+    requests: List[str] = []  # noqa: RUF012
+    not_modified: List[str] = []  # noqa: RUF012
+
+    def do_GET(self) -> None:  # noqa: N802
+        self.requests.append(self.path)
+        name = self.path.strip("/").split("/")[-1]
+        if self.path == f"/simple/{name}":
+            self.send_response(301)
+            self.send_header("Location", f"/simple/{name}/")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if name not in PROJECTS:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        etag = f'"{name}-{len(PROJECTS[name])}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.not_modified.append(name)
+            self.send_response(304)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        files = [{"filename": f, "url": f"/files/{f}", "hashes": {}} for f in PROJECTS[name]]
+        files.append({"filename": f"{name}-99.0.tar.gz", "url": "/yanked", "hashes": {}, "yanked": "broken"})
+        body = json.dumps({"meta": {"api-version": "1.0"}, "name": name, "files": files}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/vnd.pypi.simple.v1+json")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: Any) -> None:  # noqa: ANN401
+        pass
+
+
+@pytest.fixture
+def index_url() -> Generator[str, Any, None]:
+    IndexHandler.requests = []
+    IndexHandler.not_modified = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), IndexHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/simple"
+    server.shutdown()
+    server.server_close()
+
+
+def test_versions() -> None:
+    assert latest_version(["1.0", "2.0b1"]) == "1.0"
+    assert latest_version(["1.0", "2.0b1"], allow_prerelease=True) == "2.0b1"
+    assert latest_version(["2.0b1"]) == "2.0b1"
+
+    project: Dict[str, Any] = {
+        "files": [{"filename": "a-1.0-py3-none-any.whl"}, {"filename": "a-2.0.zip", "yanked": True}],
+    }
+    assert project_versions(project) == ["1.0"]
+
+    # an index with only the html api of PEP 503
+    html = b"""<html><body>
+    <a href="../a-1.0.tar.gz#sha256=00">a-1.0.tar.gz</a>
+    <a href="../a-2.0.tar.gz#sha256=00" data-yanked="">a-2.0.tar.gz</a>
+    </body></html>"""
+    assert project_versions(project_page(HttpResponse("url", 200, {"content-type": "text/html"}, html))) == ["1.0"]
+
+
+def test_http_client_cache(tmp_path: Path, index_url: str) -> None:
+    """a cached response is revalidated with its etag, redirects are followed, connections are reused"""
+    pool = ConnectionPool(max_size=2)
+    with HttpClient(pool, HttpCache(tmp_path / "cache")) as client:
+        response = client.get(f"{index_url}/jc", headers={"Accept": "application/vnd.pypi.simple.v1+json"})
+        assert not response.from_cache
+        assert response.url.endswith("/simple/jc/")
+        assert response.json()["name"] == "jc"
+
+        response = client.get(f"{index_url}/jc", headers={"Accept": "application/vnd.pypi.simple.v1+json"})
+        assert response.from_cache
+        assert response.json()["name"] == "jc"
+        assert IndexHandler.not_modified == ["jc"]
+        assert sum(len(idle) for idle in pool._idle.values()) == 1
+
+        with pytest.raises(HttpError, match="404"):
+            client.get(f"{index_url}/not-a-project/")
+    assert pool._idle == {}
+
+
+def test_outdated(tmp_path: Path, index_url: str, make_venv: Callable[[Path, str, str], Path]) -> None:
+    """each package is queried once, concurrently, and compared to the installed version"""
+    venvs_dir = tmp_path / "venvs"
+    make_venv(venvs_dir, "jc", "1.24.0")
+    make_venv(venvs_dir, "art", "6.2")
+    make_venv(venvs_dir, "missing", "1.0")
+    state_index = StateIndex(tmp_path / "state.sqlite", venvs_dir)
+    client = HttpClient(ConnectionPool(), HttpCache(tmp_path / "cache"))
+
+    with Outdated(index_url=index_url, jobs=4, state_index=state_index, client=client) as checker:
+        report = checker.run()
+    assert client.pool._idle != {}  # a client given is not closed
+    client.close()
+    packages = {package.package_name: package for package in report.packages}
+    assert (packages["jc"].installed, packages["jc"].latest, packages["jc"].outdated) == ("1.24.0", "1.25.2", True)
+    assert (packages["art"].latest, packages["art"].outdated) == ("6.2", False)
+    assert "404" in (packages["missing"].error or "")
+    assert report.nb_from_cache == 0
+
+    with client:
+        report = Outdated(index_url=index_url, state_index=state_index, client=client).run(["jc"])
+    assert [(package.package_name, package.latest) for package in report.packages] == [("jc", "1.25.2")]
+    assert report.nb_from_cache == 1
+
+
+def test_outdated_closes_its_client(tmp_path: Path, index_url: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    """the connections of the client made by Outdated are closed with it"""
+    monkeypatch.setattr(config, "uvpipx_cache", tmp_path / "cache")
+    state_index = StateIndex(tmp_path / "state.sqlite", tmp_path / "venvs")
+
+    with Outdated(index_url=index_url, state_index=state_index) as checker:
+        checker.fetch_versions("jc")
+        assert checker.client_.pool._idle != {}
+    assert checker.client_.pool._idle == {}
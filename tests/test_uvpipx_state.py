@@ -0,0 +1,105 @@
+import os
+import shutil
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from uvpipx import uvpipx_state
+from uvpipx.uvpipx_state import ExposedApp, StateIndex, read_venv_model, save_venv_model
+from uvpipx.UvPipxModels import UvPipxVenvExposeAppModel
+
+
+def test_state_index(tmp_path: Path, make_venv: Callable[[Path, str, str], Path]) -> None:
+    """the index answer from the database and follow the changes of the venvs"""
+    venvs_dir = tmp_path / "venvs"
+    make_venv(venvs_dir, "jc", "1.25.2")
+    art_path = make_venv(venvs_dir, "art", "6.2")
+    (venvs_dir / "orphan").mkdir()
+    (venvs_dir / ".DS_Store").write_text("")
+
+    index = StateIndex(tmp_path / "state.sqlite", venvs_dir)
+    states = index.refresh()
+    assert [s.name for s in states] == ["art", "jc", "orphan"]
+    assert states[0].versions == {"art": "6.2"}
+    assert states[2].model is None
+    assert "orphan not exist" in states[2].error
+    assert index.venv_names() == ["art", "jc"]
+
+    # a rewrite of the same size within one mtime tick is seen: the content of uvpipx.json is hashed
+    json_path = art_path / "uvpipx.json"
+    st = json_path.stat()
+    model_json = json_path.read_text()
+    json_path.write_text(model_json.replace('"package_name": "art"', '"package_name": "trA"'))
+    os.utime(json_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert json_path.stat().st_size == st.st_size
+    assert index.load(art_path, "art").model.main_package.package_name == "trA"
+
+    # a change of uvpipx.json or of the site-packages is seen
+    shutil.rmtree(art_path)
+    make_venv(venvs_dir, "art", "6.3")
+    assert index.load(art_path, "art").versions == {"art": "6.3"}
+
+    shutil.rmtree(venvs_dir / "jc")
+    assert index.venv_names() == ["art"]
+
+
+def test_iter_refresh_unlocked(tmp_path: Path, make_venv: Callable[[Path, str, str], Path]) -> None:
+    """the index is not locked while the caller handles a state streamed"""
+    venvs_dir = tmp_path / "venvs"
+    make_venv(venvs_dir, "jc", "1.25.2")
+    make_venv(venvs_dir, "art", "6.2")
+
+    index = StateIndex(tmp_path / "state.sqlite", venvs_dir)
+    states = index.iter_refresh()
+    assert next(states).name == "art"
+    with closing(sqlite3.connect(str(tmp_path / "state.sqlite"), timeout=0)) as con:
+        con.execute("BEGIN IMMEDIATE")  # another process writing the index
+        con.rollback()
+    assert [s.name for s in states] == ["jc"]
+
+
+def test_exposed_apps(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    make_venv: Callable[[Path, str, str], Path],
+) -> None:
+    """the owners of the exposed apps are found from the index, which follows the venvs changed or removed"""
+    venvs_dir = tmp_path / "venvs"
+    make_venv(venvs_dir, "jc", "1.25.2")
+    make_venv(venvs_dir, "art", "6.2")
+
+    index = StateIndex(tmp_path / "state.sqlite", venvs_dir)
+    assert index.exposed_apps(exposed_names=["jc"]) == [ExposedApp("jc", "jc", "/bin/dir/jc")]
+    assert [app.venv_name for app in index.exposed_apps(exposed_paths=["/bin/dir/jc", "/bin/dir/art"])] == [
+        "art",
+        "jc",
+    ]
+    assert index.exposed_apps(exposed_names=["unknown"]) == []
+    assert index.exposed_apps(exposed_names=[]) == []
+
+    shutil.rmtree(venvs_dir / "jc")
+    assert index.exposed_apps(exposed_names=["jc"]) == []
+    make_venv(venvs_dir, "tool", "1.0")
+    assert index.exposed_apps(exposed_names=["tool"])[0].venv_name == "tool"
+
+    # only the venvs matched are checked, not every venv
+    fingerprinted = []
+    venv_fingerprint = uvpipx_state.venv_fingerprint
+    monkeypatch.setattr(
+        uvpipx_state,
+        "venv_fingerprint",
+        lambda venv_path, site_packages: (
+            fingerprinted.append(venv_path.name) or venv_fingerprint(venv_path, site_packages)
+        ),
+    )
+    assert index.exposed_apps(exposed_names=["art"])[0].venv_name == "art"
+    assert fingerprinted == ["art"]
+
+    # a venv changed by uvpipx updates the index
+    model = read_venv_model(venvs_dir / "tool", "tool")
+    model.exposed.apps["tool2"] = UvPipxVenvExposeAppModel("tool2", "/bin/dir/tool2", ["tool"])
+    save_venv_model(model, index)
+    assert index.exposed_apps(exposed_names=["tool2"])[0].venv_name == "tool"
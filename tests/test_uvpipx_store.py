@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import os
+import subprocess  # nosec: B404 # noqa: S404
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from uvpipx import config
+from uvpipx.uvpipx_core import PathLink
+from uvpipx.uvpipx_store import COMPLETE_FILE, REFS_DIR, VenvStore, _locked, _ref_name, store_entry_of
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="the store is not used on windows")
+
+
+def make_entry(store_dir: Path, key: str) -> Path:
+    entry = store_dir / key
+    (entry / ".venv" / "bin").mkdir(parents=True)
+    (entry / ".venv" / "bin" / "tool").write_text("#!/bin/sh\n")
+    (entry / REFS_DIR).mkdir()
+    (entry / COMPLETE_FILE).touch()
+    return entry
+
+
+def link_venv(venv_path: Path, entry: Path) -> None:
+    venv_path.mkdir(parents=True)
+    (venv_path / ".venv").symlink_to(entry / ".venv", target_is_directory=True)
+    (entry / REFS_DIR / _ref_name(venv_path)).write_text(str(venv_path))
+
+
+def test_release_frees_last_reference(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(config, "uvpipx_trash", tmp_path / "trash")
+    store = VenvStore(tmp_path / "store")
+    entry = make_entry(store.store_dir, "0123abcd")
+    venv_a, venv_b = tmp_path / "a" / "tool", tmp_path / "b" / "tool"
+    link_venv(venv_a, entry)
+    link_venv(venv_b, entry)
+
+    assert store_entry_of(venv_a) == entry
+    assert VenvStore.of_venv(venv_a) == store
+    assert len(store.refs(entry)) == 2
+
+    assert store.release(venv_a) == []
+    assert entry.exists()
+    assert store.refs(entry) == [_ref_name(venv_b)]
+
+    assert store.release(venv_b) == [tmp_path / "trash"]
+    assert not entry.exists()
+    assert list(store.store_dir.iterdir()) == []  # the lock file of the entry is removed too
+
+
+def test_locked_after_lock_file_removed(tmp_path: Path) -> None:
+    """a process waiting on a lock file removed by its holder locks the new lock file, seen by the others"""
+    import fcntl  # noqa: PLC0415
+
+    lock_path = tmp_path / "0123abcd.lock"
+    waiting, locked, release = threading.Event(), threading.Event(), threading.Event()
+
+    def waiter() -> None:
+        waiting.set()
+        with _locked(lock_path):
+            locked.set()
+            release.wait(10)
+
+    with _locked(lock_path):
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        waiting.wait(10)
+        time.sleep(0.2)
+        lock_path.unlink()
+    assert locked.wait(10)
+
+    with lock_path.open("a") as lock_file, pytest.raises(BlockingIOError):
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    release.set()
+    thread.join(10)
+
+
+def test_path_link_valid_through_store(tmp_path: Path) -> None:
+    entry = make_entry(tmp_path / "store", "0123abcd")
+    venv_path = tmp_path / "venvs" / "tool"
+    link_venv(venv_path, entry)
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+
+    path_link = PathLink(venv_path / ".venv" / "bin" / "tool", bin_dir / "tool")
+    path_link.link()
+
+    assert path_link.is_valid()
+
+
+def test_store_shared_install(tmp_path: Path) -> None:
+    store_dir = tmp_path / "store"
+    runenv = {**os.environ, "UVPIPX_STORE": str(store_dir), "UVPIPX_HOME": str(tmp_path / "home")}
+    users = {
+        user: {**runenv, "UVPIPX_LOCAL_VENVS": str(tmp_path / user / "venvs"), "UVPIPX_BIN_DIR": str(tmp_path / user)}
+        for user in ["a", "b"]
+    }
+
+    for env in users.values():
+        result = subprocess.run(  # nosec: B603, B607  # noqa: S603, S607
+            ["uvpipx", "install", "jc==1.24.0"],  # noqa: S603, S607
+            capture_output=True,
+            text=True,
+            env=env,
+            check=False,
+        )
+        assert result.returncode == 0
+
+    entries = [entry for entry in store_dir.iterdir() if entry.is_dir()]
+    assert len(entries) == 1
+    assert len(list((entries[0] / REFS_DIR).iterdir())) == 2
+    assert "reuse store entry" in result.stdout
+    for user in users:
+        assert (tmp_path / user / "jc").resolve().is_relative_to(entries[0])
+
+    for nb, env in enumerate(users.values()):
+        result = subprocess.run(  # nosec: B603, B607  # noqa: S603, S607
+            ["uvpipx", "uninstall", "jc"],  # noqa: S603, S607
+            capture_output=True,
+            text=True,
+            env=env,
+            check=False,
+        )
+        assert result.returncode == 0
+        assert entries[0].exists() == (nb == 0)
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import errno
+from pathlib import Path
+
+import pytest
+
+from uvpipx.uvpipx_trash import SIBLING_TRASH_NAME, empty_trash, move_to_trash
+
+
+def make_tree(path: Path, nb_files: int = 3) -> Path:
+    (path / "sub").mkdir(parents=True)
+    for nb in range(nb_files):
+        (path / "sub" / f"file{nb}.txt").write_text(str(nb))
+    return path
+
+
+def test_move_to_trash_and_empty(tmp_path: Path) -> None:
+    trash_dir = tmp_path / "home" / "trash"
+    venvs = [make_tree(tmp_path / "venvs" / name) for name in ["jc", "art"]]
+
+    used = {move_to_trash(venv, trash_dir) for venv in venvs}
+
+    assert used == {trash_dir}
+    assert not any(venv.exists() for venv in venvs)
+    assert len(list(trash_dir.iterdir())) == 2
+
+    results = empty_trash([trash_dir], jobs=2)
+
+    assert len(results) == 2
+    assert all(result.ok for result in results)
+    assert list(trash_dir.iterdir()) == []
+
+
+def test_move_to_trash_cross_device(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    trash_dir = tmp_path / "home" / "trash"
+    venv = make_tree(tmp_path / "venvs" / "jc")
+    rename = Path.rename
+
+    def rename_no_cross_device(self: Path, target: Path) -> Path:
+        if Path(target).parent == trash_dir:
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+        return rename(self, target)
+
+    monkeypatch.setattr(Path, "rename", rename_no_cross_device)
+
+    used = move_to_trash(venv, trash_dir)
+
+    assert used == tmp_path / "venvs" / SIBLING_TRASH_NAME
+    assert not venv.exists()
+
+    empty_trash([used])
+
+    assert list(used.iterdir()) == []
@@ -5,10 +5,13 @@ import os
 import subprocess  # nosec: B404  # noqa: S404
 import tempfile
 from pathlib import Path
-from typing import Any, Dict, Generator, Tuple
+from typing import Any, Callable, Dict, Generator, Tuple
 
 import pytest
 
+from uvpipx.uvpipx_core import UvPipxVenv
+from uvpipx.uvpipx_upgrade import exact_pins, pins_satisfied
+
 
 @pytest.fixture(scope="class")
 def env_setup() -> Generator[Tuple[str, Dict, str], Any, None]:
@@ -86,8 +89,9 @@ class TestUpgrade:
         ) as outfile:
             json.dump(d_dict, outfile)
 
+        diff_json = Path(uvpipx_local_venvs) / "diff.json"
         result = subprocess.run(  # nosec: B603, B607  # noqa: S603, S607
-            ["uvpipx", "upgrade", "jc"],  # noqa: S603, S607
+            ["uvpipx", "upgrade", "jc", "--diff-json", str(diff_json)],  # noqa: S603, S607
             capture_output=True,
             text=True,
             env=runenv,
@@ -95,8 +99,8 @@ class TestUpgrade:
         )
 
         assert result.returncode == 0
-        assert "- jc==1.24.0" in result.stdout
-        assert "+ jc==" in result.stdout
+        assert "⬆️  jc 1.24.0 -> " in result.stdout
+        assert json.loads(diff_json.read_text())["jc"]["upgraded"]["jc"]["from"] == "1.24.0"
 
         result = subprocess.run(  # nosec: B603, B607  # noqa: S603, S607
             ["uvpipx", "info", "jc"],  # noqa: S603, S607
@@ -182,3 +186,121 @@ class TestUpgradeAll:
 
         assert result.returncode == 0
         assert "jc==1.24.0" not in result.stdout
+
+
+class TestUpgradeAllJobs:
+    def test_upgrade_all_jobs(self, env_setup: tuple[str, dict, str]) -> None:
+        uvpipx_local_venvs, uvenvs, uvpipx_bin_dir = env_setup
+        runenv = {**os.environ, **uvenvs}
+
+        for pkg in ["jc==1.24.0", "art==6.0"]:
+            result = subprocess.run(  # nosec: B603, B607  # noqa: S603, S607
+                ["uvpipx", "install", pkg],  # noqa: S603, S607
+                capture_output=True,
+                text=True,
+                env=runenv,
+                check=False,
+            )
+            assert result.returncode == 0
+
+        # patch file to allow upgrade
+        for pkg in ["jc", "art"]:
+            with (Path(runenv["UVPIPX_LOCAL_VENVS"]) / f"{pkg}/uvpipx.json").open("r") as infile:
+                d_dict = json.load(infile)
+            d_dict["main_package"]["package_name_spec"] = pkg
+            with (Path(runenv["UVPIPX_LOCAL_VENVS"]) / f"{pkg}/uvpipx.json").open("w") as outfile:
+                json.dump(d_dict, outfile)
+
+        result = subprocess.run(  # nosec: B603, B607  # noqa: S603, S607
+            ["uvpipx", "upgrade-all", "--jobs", "2"],  # noqa: S603, S607
+            capture_output=True,
+            text=True,
+            env=runenv,
+            check=False,
+        )
+
+        assert result.returncode == 0
+        assert "⬆️  Upgrade art" in result.stdout
+        assert "⬆️  Upgrade jc" in result.stdout
+        assert "2 🟢 succeeded, 0 🔴 failed" in result.stdout
+
+        for pkg, old_vers in [("jc", "jc==1.24.0"), ("art", "art==6.0")]:
+            result = subprocess.run(  # nosec: B603, B607  # noqa: S603, S607
+                ["uvpipx", "info", pkg],  # noqa: S603, S607
+                capture_output=True,
+                text=True,
+                env=runenv,
+                check=False,
+            )
+
+            assert result.returncode == 0
+            assert old_vers not in result.stdout
+
+
+def test_pins_satisfied(tmp_path: Path, make_venv: Callable[[Path, str, str], Path]) -> None:
+    """only exact pins of the installed versions skip uv"""
+    assert exact_pins(["jc==1.25.2", "Py_Figlet[x] == 1.0"]) == {"jc": "1.25.2", "py-figlet": "1.0"}
+    for spec in ["jc", "jc>=1.25", "jc==1.25.*", "jc==1.25.2,<2", "jc==1.25.2; python_version<'3.8'", "./jc"]:
+        assert exact_pins(["art==6.2", spec]) is None
+    assert exact_pins(["git+https://github.com/kellyjonbrazil/jc@v1.25.2"]) is None
+
+    venv = UvPipxVenv(make_venv(tmp_path, "jc", "1.25.2"))
+    assert pins_satisfied(venv, ["jc==1.25.2"])
+    assert pins_satisfied(venv, ["jc==1.25.2.0"])
+    assert not pins_satisfied(venv, ["jc==1.25.3"])
+    assert not pins_satisfied(venv, ["jc==1.25.2", "art==6.2"])
+    assert not pins_satisfied(venv, ["jc"])
+
+
+class TestUpgradeNoop:
+    def test_upgrade_noop(self, env_setup: tuple[str, dict, str]) -> None:
+        uvpipx_local_venvs, uvenvs, uvpipx_bin_dir = env_setup
+        runenv = {**os.environ, **uvenvs}
+
+        result = subprocess.run(  # nosec: B603, B607  # noqa: S603, S607
+            ["uvpipx", "install", "jc==1.24.0"],  # noqa: S603, S607
+            capture_output=True,
+            text=True,
+            env=runenv,
+            check=False,
+        )
+        assert result.returncode == 0
+
+        # an exact pin already installed: uv is not called
+        result = subprocess.run(  # nosec: B603, B607  # noqa: S603, S607
+            ["uvpipx", "upgrade", "jc"],  # noqa: S603, S607
+            capture_output=True,
+            text=True,
+            env=runenv,
+            check=False,
+        )
+        assert result.returncode == 0
+        assert "nothing to upgrade" in result.stdout
+        assert "uv pip install" not in result.stdout
+
+        uvpipx_json = Path(runenv["UVPIPX_LOCAL_VENVS"]) / "jc/uvpipx.json"
+        d_dict = json.loads(uvpipx_json.read_text())
+        assert d_dict["last_upgrade"] is not None
+        d_dict["main_package"]["package_name_spec"] = "jc"
+        uvpipx_json.write_text(json.dumps(d_dict))
+
+        # upgraded less than a day ago: skipped
+        result = subprocess.run(  # nosec: B603, B607  # noqa: S603, S607
+            ["uvpipx", "upgrade-all", "--min-interval", "1d"],  # noqa: S603, S607
+            capture_output=True,
+            text=True,
+            env=runenv,
+            check=False,
+        )
+        assert result.returncode == 0
+        assert "less than --min-interval 1.0d: skipped" in result.stdout
+        assert "jc==1.24.0" in (Path(runenv["UVPIPX_LOCAL_VENVS"]) / "jc/requirements.txt").read_text()
+
+        result = subprocess.run(  # nosec: B603, B607  # noqa: S603, S607
+            ["uvpipx", "upgrade", "jc", "--min-interval", "soon"],  # noqa: S603, S607
+            capture_output=True,
+            text=True,
+            env=runenv,
+            check=False,
+        )
+        assert result.returncode != 0
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+from uvpipx.internal_libs.Logger import Logger, LogMode
+from uvpipx.internal_libs.misc import ChildUsage
+from uvpipx.uvpipx_uv import UvSummary, collect_uv_phases, parse_uv_duration, record_uv_summary
+
+
+def test_parse_uv_duration() -> None:
+    assert parse_uv_duration("340ms") == 0.34
+    assert parse_uv_duration("1.20s") == 1.2
+    assert parse_uv_duration("2m 3s") == 123
+    assert parse_uv_duration("a while") is None
+
+
+def test_summary_feed() -> None:
+    lines: List[str] = []
+    summary = UvSummary()
+    on_line = summary.parse_output(lambda _stream_name, line: lines.append(line))
+    for line in [
+        "Using CPython 3.11.7",
+        "Resolved 12 packages in 340ms",
+        "\x1b[2mPrepared 2 packages in 1.02s\x1b[0m",
+        "Installed 12 packages in 25ms",
+        " + jc==1.25.2",
+        "Bytecode compiled 812 files in 1.5s",
+    ]:
+        on_line("stderr", line)
+
+    assert len(lines) == 6  # the output is still shown
+    assert set(summary.phases) == {"resolve", "prepare", "install", "compile"}
+    assert (summary.phases["install"].count, summary.phases["install"].seconds) == (12, 0.025)
+    assert summary.cache_hits == 10
+    assert summary.to_dict()["phases"]["prepare"] == {"count": 2, "seconds": 1.02}
+    assert summary.show().endswith("10 from cache")
+    assert not summary.feed("Resolved 12 packages")
+
+
+def test_collect_uv_phases() -> None:
+    logger = Logger(log_mode=LogMode.BUFFER)
+    one = UvSummary(usage=ChildUsage(user_s=1, sys_s=0.5, max_rss_kib=2048, write_blocks=8))
+    one.add("install", 3, 0.5)
+    one.nb_commands = 1
+
+    result: Dict[str, Any] = {}
+    with collect_uv_phases(logger, result) as outer:
+        record_uv_summary(one)
+        with collect_uv_phases(logger) as inner:
+            record_uv_summary(one)
+    record_uv_summary(one)  # nothing collects it anymore
+
+    assert inner.phases["install"].count == 3
+    assert outer.phases["install"].count == 6
+    assert result["uv"]["phases"] == {"install": {"count": 6, "seconds": 1.0}}
+    assert result["uv"]["cache_hits"] == 6
+    # the times and blocks are summed, the peak memory is the max
+    assert result["uv"]["usage"] == {"user_s": 2, "sys_s": 1, "max_rss_kib": 2048, "read_blocks": 0, "write_blocks": 16}
+
+    result = {}
+    with collect_uv_phases(logger, result):
+        pass
+    assert "uv" not in result  # no uv command run
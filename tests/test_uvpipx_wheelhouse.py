@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import os
+import subprocess  # nosec: B404  # noqa: S404
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Generator, Tuple
+
+import pytest
+
+from uvpipx.internal_libs.Logger import get_logger
+from uvpipx.uvpipx_core import UvPipxVenv
+from uvpipx.uvpipx_wheelhouse import freeze_requirements, venv_requirements
+
+
+@pytest.fixture(scope="class")
+def env_setup() -> Generator[Tuple[str, Dict, str], Any, None]:
+    with (
+        tempfile.TemporaryDirectory(
+            prefix="uvpipxbindir-",
+        ) as uvpipx_bin_dir,
+        tempfile.TemporaryDirectory(
+            prefix="uvpipxvenvs-",
+        ) as uvpipx_local_venvs,
+    ):
+        uvenvs = {}
+        uvenvs["UVPIPX_LOCAL_VENVS"] = uvpipx_local_venvs
+        uvenvs["UVPIPX_BIN_DIR"] = uvpipx_bin_dir
+
+        yield uvpipx_local_venvs, uvenvs, uvpipx_bin_dir
+
+
+def test_freeze_requirements() -> None:
+    requirements = freeze_requirements(
+        "jc==1.24.0\n\n# comment\n-e file:///src/mytool\nmylib @ file:///wheels/mylib-1.0-py3-none-any.whl\n",
+        get_logger("test"),
+    )
+
+    assert requirements == ["jc==1.24.0", "mylib @ file:///wheels/mylib-1.0-py3-none-any.whl"]
+
+
+def test_venv_requirements(tmp_path: Path) -> None:
+    """the installed versions are exported, not the requirements.txt saved at install (upgrade does not rewrite it)"""
+    dist_info = tmp_path / ".venv/lib/python3.12/site-packages/jc-1.25.2.dist-info"
+    dist_info.mkdir(parents=True)
+    (dist_info / "METADATA").write_text("Name: jc\nVersion: 1.25.2\n\n")
+    (tmp_path / "requirements.txt").write_text("jc==1.24.0\n")
+
+    assert venv_requirements(UvPipxVenv(tmp_path), get_logger("test")) == ["jc==1.25.2"]
+
+
+class TestWheelhouse:
+    def test_export_and_offline_install(self, env_setup: tuple[str, dict, str], tmp_path: Path) -> None:
+        uvpipx_local_venvs, uvenvs, uvpipx_bin_dir = env_setup
+        runenv = {**os.environ, **uvenvs}
+        wheelhouse_dir = tmp_path / "wheelhouse"
+
+        for args in [["install", "jc==1.24.0"], ["wheelhouse", "export", str(wheelhouse_dir)], ["uninstall", "jc"]]:
+            result = subprocess.run(  # nosec: B603, B607  # noqa: S603, S607
+                ["uvpipx", *args],  # noqa: S603, S607
+                capture_output=True,
+                text=True,
+                env=runenv,
+                check=False,
+            )
+            assert result.returncode == 0
+
+        assert (wheelhouse_dir / "jc-1.24.0-py3-none-any.whl").exists()
+        assert all(path.suffix == ".whl" for path in wheelhouse_dir.iterdir())
+
+        # no index at all: only the wheelhouse can be used
+        result = subprocess.run(  # nosec: B603, B607  # noqa: S603, S607
+            ["uvpipx", "install", "jc", "--wheelhouse", str(wheelhouse_dir)],  # noqa: S603, S607
+            capture_output=True,
+            text=True,
+            env={**runenv, "UV_OFFLINE": "1"},
+            check=False,
+        )
+
+        assert result.returncode == 0
+        assert (Path(uvpipx_bin_dir) / "jc").exists()
+        assert "jc==1.24.0" in (Path(uvpipx_local_venvs) / "jc" / "requirements.txt").read_text()
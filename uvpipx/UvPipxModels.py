@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+import os
 from dataclasses import asdict, dataclass, field
 from pathlib import Path
 from typing import Any, Dict, List, TypeVar, Union
@@ -13,6 +14,10 @@ class UvPipxVenvExposeAppModel:
     bin_app_name: str
     exposed_app_path: str
     packages_name_sets: List[str]
+    # content hash, size and mtime of the exposed app when it is a copy (copy mode), to validate it with a stat
+    md5: Union[None, str] = None
+    size: Union[None, int] = None
+    mtime_ns: Union[None, int] = None
 
     def exposed_app(self) -> Path:
         return Path(self.exposed_app_path)
@@ -23,6 +28,9 @@ class UvPipxVenvExposeAppModel:
             bin_app_name=data["bin_app_name"],
             exposed_app_path=data["exposed_app_path"],
             packages_name_sets=data["packages_name_sets"],
+            md5=data.get("md5"),
+            size=data.get("size"),
+            mtime_ns=data.get("mtime_ns"),
         )
 
 
@@ -58,12 +66,14 @@ class UvPipxExposedModel:
 class UvPipxVenvModel:
     uvpipx_dir: str
     name_override: Union[None, str] = None
+    store_entry: Union[None, str] = None
 
     @staticmethod
     def from_dict(data: Dict[str, Any]) -> "UvPipxVenvModel":
         return UvPipxVenvModel(
             uvpipx_dir=data["uvpipx_dir"],
             name_override=data.get("name_override"),
+            store_entry=data.get("store_entry"),
         )
 
     def name(self) -> str:
@@ -93,6 +103,7 @@ class UvPipxModel:
     injected_packages: Dict[str, UvPipxPackageModel]
     exposed: Union[UvPipxExposedModel, None]
     config_version: str = "0.2.0"
+    last_upgrade: Union[None, float] = None  # timestamp of the last upgrade, for upgrade --min-interval
 
     @staticmethod
     def from_dict(data: Dict[str, Any]) -> "UvPipxModel":
@@ -102,11 +113,16 @@ class UvPipxModel:
             injected_packages={k: UvPipxPackageModel.from_dict(v) for k, v in data["injected_packages"].items()},
             exposed=UvPipxExposedModel.from_dict(data["exposed"]),
             config_version=data.get("config_version", "0.2.0"),
+            last_upgrade=data.get("last_upgrade"),
         )
 
     def save_json(self, file_name: Union[str, Path]) -> None:
-        with (self.venv.uvpipx_path() / file_name).open("w") as outfile:
+        """Writes the model in a temporary file renamed over the previous one: it is never seen partly written."""
+        path = self.venv.uvpipx_path() / file_name
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with tmp_path.open("w") as outfile:
             json.dump(to_dict(self), outfile, indent=4, default=str)
+        tmp_path.replace(path)
 
 
 def to_dict(obj: Any) -> Dict[str, Any]:  # noqa: ANN401
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import sys
-from typing import Dict
 
 from uvpipx.internal_libs.stylist import Painter
 from uvpipx.version import show_version
@@ -14,14 +13,11 @@ __maintainer__ = "Gaëtan Montury"
 __email__ = "#"
 __status__ = "Development"
 
-import uvpipx.cmd_launcher as cmd_launcher
 from uvpipx.internal_libs.text_formatter import (
     max_string_length_per_column,
     wrap_text_in_table,
 )
-from uvpipx.uvpipx_args import arg_parser
-
-cmd_map: Dict[str, str] = {"list": "uvpipx_list", "environnement": "uvpipx_show_config", "environment": "uvpipx_show_config"}
+from uvpipx.uvpipx_args import commands
 
 
 def show_main_help() -> None:
@@ -30,7 +26,7 @@ def show_main_help() -> None:
     )
 
     print("uvpipx cmd [--help] ... parameters ...\n\ncmd can be:")
-    help_ = [[f"{k}", f"{v.help}"] for k, v in arg_parser.items()]
+    help_ = [[f"{k}", f"{v.help}"] for k, v in commands.items()]
     size_col = max_string_length_per_column(help_)
 
     wrapped = wrap_text_in_table(help_, [size_col[0], 100 - size_col[0]])
@@ -53,10 +49,13 @@ def main() -> None:
         sys.exit(0)
 
     main_cmd = sys.argv[1]
-    if main_cmd in arg_parser:
-        main_cmd_map = main_cmd.replace("-", "_")
-        cmd_function = getattr(cmd_launcher, cmd_map.get(main_cmd_map, main_cmd_map))
-        cmd_function(arg_parser[sys.argv[1]])
+    if main_cmd in commands:
+        # only the command run is imported and gets its parser built
+        from uvpipx import cmd_launcher  # noqa: PLC0415
+
+        command = commands[main_cmd]
+        cmd_function = getattr(cmd_launcher, command.launcher)
+        cmd_launcher.run_command(command.name, lambda: cmd_function(command.arg_parser()))
 
     else:
         print(f"Unknown command {sys.argv[1]}, below the help")
@@ -6,42 +6,162 @@ __maintainer__ = "Gaëtan Montury"
 __email__ = "#"
 __status__ = "Development"
 
+import datetime
 import os
 import sys
-from typing import List
-
-import uvpipx.uvpipx_run
-from uvpipx import (
-    uvpipx_all,
-    uvpipx_expose,
-    uvpipx_infos,
-    uvpipx_inject,
-    uvpipx_install,
-    uvpipx_upgrade,
-)
+import time
+from pathlib import Path
+from typing import Callable, List, Union
+
+from uvpipx import config
 from uvpipx.internal_libs.args import ArgParser
-from uvpipx.internal_libs.Logger import get_logger
-from uvpipx.internal_libs.misc import Elapser, check_type, check_type_n_None
+from uvpipx.internal_libs.Logger import (
+    EventSink,
+    LogLevel,
+    OutputFormat,
+    get_event_sink,
+    get_logger,
+    set_event_sink,
+    set_show_level,
+)
+from uvpipx.internal_libs.misc import Elapser, check_type, check_type_n_None, parse_duration
+from uvpipx.internal_libs.tracing import Tracer, get_tracer, profile_kinds, profiling, set_tracer
+
+# The module of each command is imported in its function (after the parsing of the args),
+# so running a command only imports what it needs.
 
 
 def common_args(argp: ArgParser) -> None:
     logger = get_logger()
     argp.parse(sys.argv[2:])
-    os.environ["UVPIPX_SHOW_DEBUG_LEVEL"] = str(
-        argp.args["--verbose"].defaulted_value(),
-    )
-    logger.log_debug(f"Received args {sys.argv}")
+    verbose = check_type(argp.args["--verbose"].defaulted_value(), int)
+    os.environ["UVPIPX_SHOW_DEBUG_LEVEL"] = str(verbose)
+    if verbose:
+        set_show_level(LogLevel.DEBUG)
 
     if argp.args["--help"].defaulted_value():
         argp.print_help()
         sys.exit(0)
 
+    if "--format" in argp.args:
+        output_format = format_arg(argp)
+        if output_format != OutputFormat.TEXT:
+            set_event_sink(EventSink(output_format))
+    logger.log_debug(f"Received args {sys.argv}")  # once the sink is set, the logs go to stderr
+
+    trace_path = check_type_n_None(argp.args["--trace"].defaulted_value(), str) if "--trace" in argp.args else None
+    if trace_path:
+        set_tracer(Tracer(f"uvpipx {sys.argv[1]}", Path(trace_path)))
+
+
+def run_command(name: str, cmd_function: Callable[[], None]) -> None:
+    """
+    Runs a command, then ends its structured output and writes its trace and profiles if asked.
+
+    Explanation:
+    With --format json|ndjson the events end with command.finished, with --trace the spans are written as a
+    Chrome trace, and with UVPIPX_PROFILE the cpu and/or memory profiles of the command are written.
+
+    Args:
+        name (str): The name of the command.
+        cmd_function (Callable[[], None]): The command, with its parser.
+
+    Returns:
+        None
+    """
+    logger = get_logger()
+    kinds = profile_kinds(config.uvpipx_profile)
+    profile_base = config.uvpipx_profiles / f"{name}-{datetime.datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}"
+
+    profiles: List[Path] = []
+    status = "failed"
+    start = time.perf_counter()
+    try:
+        if kinds:
+            with profiling(kinds, profile_base) as profiles:
+                cmd_function()
+        else:
+            cmd_function()
+        status = "ok"
+    except SystemExit as e:
+        status = "ok" if e.code in (None, 0) else "failed"
+        raise
+    finally:
+        for profile_path in profiles:
+            logger.log_info(f" 📊 profile written to {profile_path}")
+
+        tracer = get_tracer()
+        if tracer is not None and tracer.trace_path is not None:
+            tracer.root.args["status"] = status
+            tracer.finish()
+            tracer.write_chrome_trace(tracer.trace_path)
+            logger.log_info(f" 🧭 trace written to {tracer.trace_path} (open it with https://ui.perfetto.dev)")
+
+        sink = get_event_sink()
+        if sink is not None:
+            from uvpipx import uvpipx_events as events  # noqa: PLC0415
+
+            logger.log_event(
+                events.COMMAND_FINISHED,
+                command=name,
+                status=status,
+                duration_s=round(time.perf_counter() - start, 6),
+            )
+            sink.close()
+
+
+def format_arg(argp: ArgParser) -> OutputFormat:
+    output_format = check_type(argp.args["--format"].defaulted_value(), str)
+    formats = [f.value for f in OutputFormat]
+    if output_format not in formats:
+        msg = f"🔴 --format must be one of {', '.join(formats)}, got {output_format}"
+        raise RuntimeError(msg)
+
+    return OutputFormat(output_format)
+
+
+def jobs_arg(argp: ArgParser) -> Union[None, int]:
+    jobs = check_type_n_None(argp.args["--jobs"].defaulted_value(), str)
+    if jobs is None:
+        return None
+
+    if not jobs.isdigit() or int(jobs) < 1:
+        msg = f"🔴 --jobs must be a positive integer, got {jobs}"
+        raise RuntimeError(msg)
+
+    return int(jobs)
+
+
+def wheelhouse_arg(argp: ArgParser) -> Union[None, Path]:
+    wheelhouse = check_type_n_None(argp.args["--wheelhouse"].defaulted_value(), str)
+    if wheelhouse is None:
+        return None
+
+    if not Path(wheelhouse).is_dir():
+        msg = f"🔴 --wheelhouse {wheelhouse} is not a directory"
+        raise RuntimeError(msg)
+
+    return Path(wheelhouse).resolve()
+
+
+def min_interval_arg(argp: ArgParser) -> Union[None, float]:
+    min_interval = check_type_n_None(argp.args["--min-interval"].defaulted_value(), str)
+    if min_interval is None:
+        return None
+
+    try:
+        return parse_duration(min_interval)
+    except ValueError as e:
+        msg = f"🔴 --min-interval: {e}"
+        raise RuntimeError(msg) from e
+
 
 def install(argp: ArgParser) -> None:
     """install package locally in their own venv"""
     logger = get_logger("install")
 
     common_args(argp)
+    from uvpipx import uvpipx_install  # noqa: PLC0415
 
     with Elapser() as ela:
         expose_rule_names = check_type_n_None(
@@ -49,20 +169,37 @@ def install(argp: ArgParser) -> None:
             List[str],
         )
         force_reinstall = check_type(argp.args["--force"].defaulted_value(), bool)
-        uvpipx_install.install(
-            argp.args["python_pkg"].value,
-            expose_rule_names=expose_rule_names,
-            inject_pkgs=argp.args["--inject"].value,
-            force_reinstall=force_reinstall,
-        )
+        python_pkgs = check_type(argp.args["python_pkg"].value, List[str])
+        if len(python_pkgs) == 1:
+            uvpipx_install.install(
+                python_pkgs[0],
+                expose_rule_names=expose_rule_names,
+                inject_pkgs=argp.args["--inject"].value,
+                force_reinstall=force_reinstall,
+                wheelhouse=wheelhouse_arg(argp),
+            )
+            results = []
+        else:
+            results = uvpipx_install.install_many(
+                python_pkgs,
+                expose_rule_names=expose_rule_names,
+                inject_pkgs=argp.args["--inject"].value,
+                force_reinstall=force_reinstall,
+                wheelhouse=wheelhouse_arg(argp),
+                jobs=jobs_arg(argp),
+            )
 
     logger.log_info(f"\n 🏁 Finish install  ⏱️  {ela.elapsed_second}")
 
+    if any(not result.ok for result in results):
+        sys.exit(1)
+
 
 def ensurepath(argp: ArgParser) -> None:
     """help to define PATH"""
 
     common_args(argp)
+    from uvpipx import uvpipx_infos  # noqa: PLC0415
 
     uvpipx_infos.ensurepath()
 
@@ -71,6 +208,7 @@ def uvpipx_show_config(argp: ArgParser) -> None:
     """show the list of uvpipx venv"""
 
     common_args(argp)
+    from uvpipx import uvpipx_infos  # noqa: PLC0415
 
     uvpipx_infos.uvpipx_show_config()
 
@@ -79,6 +217,7 @@ def uvpipx_list(argp: ArgParser) -> None:
     """show the list of uvpipx venv"""
 
     common_args(argp)
+    from uvpipx import uvpipx_infos  # noqa: PLC0415
 
     uvpipx_infos.uvpipx_list()
 
@@ -89,16 +228,46 @@ def info(
     """show the list of uvpipx venv"""
 
     common_args(argp)
+    from uvpipx import uvpipx_infos  # noqa: PLC0415
 
     get_venv = check_type(argp.args["--get-venv"].defaulted_value(), bool)
     uvpipx_infos.info(argp.args["python_pkg"].value, get_venv=get_venv)
 
 
+def which(argp: ArgParser) -> None:
+    """show the uvpipx venv exposing a program"""
+
+    common_args(argp)
+    from uvpipx import uvpipx_infos  # noqa: PLC0415
+
+    get_venv = check_type(argp.args["--get-venv"].defaulted_value(), bool)
+    if not uvpipx_infos.which(argp.args["bin_name"].value, get_venv=get_venv):
+        sys.exit(1)
+
+
+def outdated(argp: ArgParser) -> None:
+    """show the packages with a newer version on the package index"""
+    logger = get_logger("outdated")
+
+    common_args(argp)
+    from uvpipx import uvpipx_outdated  # noqa: PLC0415
+
+    with Elapser() as ela:
+        venv_names = check_type_n_None(argp.args["python_pkg"].value, List[str])
+        report = uvpipx_outdated.outdated(venv_names, jobs=jobs_arg(argp))
+
+    logger.log_info(f"\n 🏁 Finish outdated  ⏱️  {ela.elapsed_second}")
+
+    if any(package.error for package in report.packages):
+        sys.exit(1)
+
+
 def uninstall(argp: ArgParser) -> None:
     """uninstall package and their venv"""
     logger = get_logger("uninstall")
 
     common_args(argp)
+    from uvpipx import uvpipx_install  # noqa: PLC0415
 
     with Elapser() as ela:
         uvpipx_install.uninstall(
@@ -113,6 +282,7 @@ def uninstall_all(argp: ArgParser) -> None:
     logger = get_logger("upgrade")
 
     common_args(argp)
+    from uvpipx import uvpipx_all  # noqa: PLC0415
 
     with Elapser() as ela:
         uvpipx_all.uninstall_all()
@@ -123,8 +293,9 @@ def uninstall_all(argp: ArgParser) -> None:
 def venv(argp: ArgParser) -> None:
     """run command of a package without installing it"""
     common_args(argp)
+    from uvpipx import uvpipx_run  # noqa: PLC0415
 
-    uvpipx.uvpipx_run.run_venv_bin(argp.args["python_pkg"].value, argp.extra_args)
+    uvpipx_run.run_venv_bin(argp.args["python_pkg"].value, argp.extra_args)
 
 
 def upgrade(argp: ArgParser) -> None:
@@ -132,11 +303,17 @@ def upgrade(argp: ArgParser) -> None:
     logger = get_logger("upgrade")
 
     common_args(argp)
+    from uvpipx import uvpipx_upgrade  # noqa: PLC0415
 
+    diff_json = check_type_n_None(argp.args["--diff-json"].defaulted_value(), str)
     with Elapser() as ela:
-        uvpipx_upgrade.upgrade(
+        diff = uvpipx_upgrade.upgrade(
             argp.args["python_pkg"].value,
+            wheelhouse=wheelhouse_arg(argp),
+            min_interval=min_interval_arg(argp),
         )
+    if diff_json:
+        uvpipx_upgrade.write_diffs_json(Path(diff_json), {argp.args["python_pkg"].value: diff})
 
     logger.log_info(f"\n 🏁 Finish upgrade  ⏱️  {ela.elapsed_second}")
 
@@ -146,21 +323,34 @@ def upgrade_all(argp: ArgParser) -> None:
     logger = get_logger("upgrade")
 
     common_args(argp)
+    from uvpipx import uvpipx_all, uvpipx_upgrade  # noqa: PLC0415
 
+    diff_json = check_type_n_None(argp.args["--diff-json"].defaulted_value(), str)
     with Elapser() as ela:
-        uvpipx_all.upgrade_all()
+        results = uvpipx_all.upgrade_all(
+            jobs=jobs_arg(argp),
+            wheelhouse=wheelhouse_arg(argp),
+            min_interval=min_interval_arg(argp),
+        )
+    if diff_json:
+        uvpipx_upgrade.write_diffs_json(Path(diff_json), {r.name: r.value for r in results if r.ok})
 
     logger.log_info(f"\n 🏁 Finish upgrade all  ⏱️  {ela.elapsed_second}")
 
+    if any(not result.ok for result in results):
+        sys.exit(1)
+
 
 def inject(argp: ArgParser) -> None:
     """inject package locally in venv"""
     logger = get_logger("inject")
 
     common_args(argp)
+    from uvpipx import uvpipx_inject  # noqa: PLC0415
 
     with Elapser() as ela:
-        inject_pkg = [argp.args["inject_python_pkg"].value, *argp.extra_args]
+        # the args after -- are still passed as is to uv, like before the options were parsed
+        inject_pkg = [*check_type(argp.args["inject_python_pkg"].value, List[str]), *argp.extra_args]
         uvpipx_inject.inject(argp.args["python_pkg"].value, inject_pkg)
 
     logger.log_info(f"\n 🏁 Finish inject  ⏱️  {ela.elapsed_second}")
@@ -171,9 +361,11 @@ def uninject(argp: ArgParser) -> None:
     logger = get_logger("uninject")
 
     common_args(argp)
+    from uvpipx import uvpipx_inject  # noqa: PLC0415
 
     with Elapser() as ela:
-        inject_pkg = [argp.args["uninject_python_pkg"].value, *argp.extra_args]
+        # the args after -- are still passed as is to uv, like before the options were parsed
+        inject_pkg = [*check_type(argp.args["uninject_python_pkg"].value, List[str]), *argp.extra_args]
         uvpipx_inject.uninject(argp.args["python_pkg"].value, inject_pkg)
 
     logger.log_info(f"\n 🏁 Finish uninject  ⏱️  {ela.elapsed_second}")
@@ -184,6 +376,7 @@ def expose(argp: ArgParser) -> None:
     logger = get_logger("expose")
 
     common_args(argp)
+    from uvpipx import uvpipx_expose  # noqa: PLC0415
 
     with Elapser() as ela:
         uvpipx_expose.expose(
@@ -199,8 +392,89 @@ def expose_all(argp: ArgParser) -> None:
     logger = get_logger("expose")
 
     common_args(argp)
+    from uvpipx import uvpipx_expose  # noqa: PLC0415
 
     with Elapser() as ela:
         uvpipx_expose.expose_all([argp.args["expose_rule_names"].value])
 
     logger.log_info(f"\n 🏁 Finish expose all  ⏱️  {ela.elapsed_second}")
+
+
+def wheelhouse(argp: ArgParser) -> None:
+    """export the wheels of the packages for offline install"""
+    logger = get_logger("wheelhouse")
+
+    common_args(argp)
+    from uvpipx import uvpipx_wheelhouse  # noqa: PLC0415
+
+    action = argp.args["action"].value
+    if action != "export":
+        msg = f"🔴 Unknown wheelhouse action {action}, only export is possible"
+        raise RuntimeError(msg)
+
+    with Elapser() as ela:
+        results = uvpipx_wheelhouse.export(Path(argp.args["wheelhouse_dir"].value), argp.extra_args or None)
+
+    logger.log_info(f"\n 🏁 Finish wheelhouse export  ⏱️  {ela.elapsed_second}")
+
+    if any(not result.ok for result in results):
+        sys.exit(1)
+
+
+def dedup(argp: ArgParser) -> None:
+    """hardlink the identical files of the venvs"""
+    logger = get_logger("dedup")
+
+    common_args(argp)
+    from uvpipx import uvpipx_dedup  # noqa: PLC0415
+
+    dry_run = check_type(argp.args["--dry-run"].defaulted_value(), bool)
+    incremental = check_type(argp.args["--incremental"].defaulted_value(), bool)
+
+    with Elapser() as ela:
+        uvpipx_dedup.dedup(dry_run=dry_run, incremental=incremental)
+
+    logger.log_info(f"\n 🏁 Finish dedup  ⏱️  {ela.elapsed_second}")
+
+
+def doctor(argp: ArgParser) -> None:
+    """check and fix the exposed programs and the venvs"""
+    logger = get_logger("doctor")
+
+    common_args(argp)
+    from uvpipx import uvpipx_doctor  # noqa: PLC0415
+
+    fix = check_type(argp.args["--fix"].defaulted_value(), bool)
+
+    with Elapser() as ela:
+        report = uvpipx_doctor.doctor(fix=fix)
+
+    logger.log_info(f"\n 🏁 Finish doctor  ⏱️  {ela.elapsed_second}")
+
+    if any(not issue.fixed for issue in report.issues):
+        sys.exit(1)
+
+
+def stats(argp: ArgParser) -> None:
+    """show the durations of the operations recorded in the history"""
+    logger = get_logger("stats")
+
+    common_args(argp)
+    from uvpipx import uvpipx_history  # noqa: PLC0415
+
+    venv_names = check_type_n_None(argp.args["python_pkg"].value, List[str])
+    since = check_type_n_None(argp.args["--since"].defaulted_value(), str)
+    top = check_type(argp.args["--top"].defaulted_value(), str)
+    if not top.isdigit():
+        msg = f"🔴 --top must be a positive integer, got {top}"
+        raise RuntimeError(msg)
+    try:
+        since_seconds = parse_duration(since) if since is not None else None
+    except ValueError as e:
+        msg = f"🔴 --since: {e}"
+        raise RuntimeError(msg) from e
+
+    with Elapser() as ela:
+        uvpipx_history.stats(venv_names, since_seconds=since_seconds, top=int(top))
+
+    logger.log_info(f"\n 🏁 Finish stats  ⏱️  {ela.elapsed_second}")
@@ -50,3 +50,33 @@ if home == Path("/root"):
 # default_local_bin for windows
 
 uvpipx_local_bin = env_to_path("UVPIPX_BIN_DIR", default_local_bin)
+
+uvpipx_state_db = env_to_path("UVPIPX_STATE_DB", uvpipx_home / "uvpipx_state.sqlite")
+
+uvpipx_trash = uvpipx_home / "trash"
+
+uvpipx_profiles = uvpipx_home / "profiles"
+
+# the history of the operations (see uvpipx stats), one json line by operation, disabled if UVPIPX_HISTORY is empty
+uvpipx_history = (
+    None if os.environ.get("UVPIPX_HISTORY") == "" else env_to_path("UVPIPX_HISTORY", uvpipx_home / "history.jsonl")
+)
+
+# the profiles captured for each command (see UVPIPX_PROFILE): cpu and/or memory, comma separated
+uvpipx_profile = os.environ.get("UVPIPX_PROFILE", "")
+
+uvpipx_cache = env_to_path("UVPIPX_CACHE_DIR", uvpipx_home / "cache")
+
+# the package index queried by outdated (PEP 691 JSON api), the index of uv if it is configured
+uvpipx_index_url = (
+    os.environ.get("UVPIPX_INDEX_URL")
+    or os.environ.get("UV_DEFAULT_INDEX")
+    or os.environ.get("UV_INDEX_URL")
+    or "https://pypi.org/simple"
+)
+
+# optional content-addressed store of venvs, shared by the uvpipx venvs with the same packages (disabled if not set)
+uvpipx_store = env_to_path("UVPIPX_STORE") if os.environ.get("UVPIPX_STORE") else None
+
+# how the apps are exposed in the bin dir: "symlink" (default) or "copy" (always used on windows)
+uvpipx_expose_mode = os.environ.get("UVPIPX_EXPOSE_MODE", "symlink")
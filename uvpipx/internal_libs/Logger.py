@@ -1,12 +1,18 @@
 from __future__ import annotations
 
 import datetime
+import json
 import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from enum import Enum, IntEnum
-from typing import Dict, List
+from typing import Any, Dict, Iterator, List, TextIO, Union
 
 from uvpipx.internal_libs.stylist import Color, Painter
+from uvpipx.internal_libs.tracing import span
 
 
 class LogMode(Enum):
@@ -22,6 +28,12 @@ class LogLevel(IntEnum):
     ERROR = 300
 
 
+class OutputFormat(Enum):
+    TEXT = "text"
+    JSON = "json"
+    NDJSON = "ndjson"
+
+
 @dataclass
 class LogEntry:
     level: LogLevel
@@ -29,6 +41,81 @@ class LogEntry:
     message: str
 
 
+_CAPTURE = threading.local()
+
+
+def _captured_entries() -> Union[None, List[LogEntry]]:
+    return getattr(_CAPTURE, "entries", None)
+
+
+@contextmanager
+def capture_log_entries() -> Iterator[List[LogEntry]]:
+    """
+    Captures every log entry rendered by any logger in the current thread.
+
+    Explanation:
+    Used to buffer the output of a job running in a worker thread, so it can be shown later as one block.
+
+    Returns:
+        Iterator[List[LogEntry]]: The list filled with the captured entries.
+    """
+    prev_entries = _captured_entries()
+    entries: List[LogEntry] = []
+    _CAPTURE.entries = entries
+    try:
+        yield entries
+    finally:
+        _CAPTURE.entries = prev_entries
+
+
+@dataclass
+class EventSink:
+    """
+    Writes the structured events as they happen: one json object by line (ndjson) or one streamed json array (json).
+
+    Explanation:
+    Each event is written and flushed at once, from any thread (the events of the parallel jobs are not captured),
+    nothing is kept in memory, so even thousands of events stream in constant memory.
+    """
+
+    output_format: OutputFormat = OutputFormat.NDJSON
+    stream: TextIO = field(default_factory=lambda: sys.stdout)
+
+    def __post_init__(self) -> None:
+        self._lock = threading.Lock()
+        self.nb_events = 0
+
+    def emit(self, event: str, data: Dict[str, Any]) -> None:
+        record = {"event": event, "ts": datetime.datetime.now().astimezone().isoformat(), **data}
+        line = json.dumps(record, default=str, ensure_ascii=False)
+        with self._lock:
+            if self.output_format == OutputFormat.JSON:
+                line = ("[\n" if self.nb_events == 0 else ",\n") + line
+            else:
+                line += "\n"
+            self.stream.write(line)
+            self.stream.flush()
+            self.nb_events += 1
+
+    def close(self) -> None:
+        if self.output_format == OutputFormat.JSON:
+            with self._lock:
+                self.stream.write("[]\n" if self.nb_events == 0 else "\n]\n")
+                self.stream.flush()
+
+
+_EVENT_SINK: List[EventSink] = []
+
+
+def set_event_sink(sink: Union[None, EventSink]) -> None:
+    """Sets (or removes with None) the sink of the structured events of all the loggers."""
+    _EVENT_SINK[:] = [sink] if sink else []
+
+
+def get_event_sink() -> Union[None, EventSink]:
+    return _EVENT_SINK[0] if _EVENT_SINK else None
+
+
 @dataclass
 class Logger:
     log_mode: LogMode = LogMode.PRINT
@@ -43,8 +130,12 @@ class Logger:
         self.__buffer = []
 
     def render(self, messages: List[LogEntry]) -> None:
+        captured = _captured_entries()
         for message in messages:
             if message.level >= self.show_level:
+                if captured is not None:
+                    captured.append(message)
+                    continue
                 if self.log_mode == LogMode.PRINT:
                     self.screen_log_entry(message)
                 elif self.log_mode == LogMode.BUFFER:
@@ -64,13 +155,70 @@ class Logger:
         return f"[{text_info}] " if self.show_log_mode_prefix else ""
 
     def screen_log_entry(self, entry: LogEntry) -> None:
-        print(f"{self.render_level_prefix(entry.level)}{entry.message}")
+        # with a structured output, stdout only has the events
+        print(f"{self.render_level_prefix(entry.level)}{entry.message}", file=sys.stderr if _EVENT_SINK else None)
+
+    def log_event(self, event: str, **data: Any) -> None:  # noqa: ANN401
+        """
+        Emits a structured event to the event sink, if one is set (see --format).
+
+        Args:
+            event (str): The type of event (for example "install.finished").
+            **data (Any): The data of the event, serialized as json.
+
+        Returns:
+            None
+        """
+        sink = get_event_sink()
+        if sink is not None:
+            sink.emit(event, data)
+
+    @contextmanager
+    def operation_events(self, operation: str, **data: Any) -> Iterator[Dict[str, Any]]:  # noqa: ANN401
+        """
+        Emits <operation>.started, and <operation>.finished with its status and duration once the block is done.
+
+        Explanation:
+        The block is also a span of the trace (see --trace), named by the operation and its str data ("install jc").
+
+        Args:
+            operation (str): The operation (for example "install").
+            **data (Any): The data of both events (for example the venv name).
+
+        Returns:
+            Iterator[Dict[str, Any]]: A dict to add data to the finished event, with its status and duration_s once done.
+        """
+        self.log_event(f"{operation}.started", **data)
+        result: Dict[str, Any] = {"status": "ok"}
+        start = time.perf_counter()
+        try:
+            with span(" ".join([operation, *(v for v in data.values() if isinstance(v, str))]), cat="operation"):
+                yield result
+        except BaseException as e:
+            result.update(status="failed", error=str(e))
+            raise
+        finally:
+            result["duration_s"] = round(time.perf_counter() - start, 6)
+            self.log_event(f"{operation}.finished", **data, **result)
 
     def log_at_level(self, level: LogLevel, messages: str) -> None:
         ts = datetime.datetime.now().astimezone()
         log_messages = [LogEntry(level, ts, message) for message in messages.split("\n")]
         self.render(log_messages)
 
+    def replay(self, entries: List[LogEntry]) -> None:
+        """
+        Renders again some already built entries (for example captured by capture_log_entries).
+
+        Args:
+            entries (List[LogEntry]): The entries to render.
+
+        Returns:
+            None
+        """
+
+        self.render(entries)
+
     def log_debug(self, messages: str) -> None:
         """
         Logs a message with an optional verbosity level.
@@ -145,9 +293,17 @@ class Logger:
 
 
 LOGGER: Dict[str, Logger] = {}
+_SHOW_LEVEL: List[LogLevel] = [LogLevel.INFO]
+
+
+def set_show_level(level: LogLevel) -> None:
+    """Sets the lowest level shown by all the loggers, the ones already created and the next ones (see --verbose)."""
+    _SHOW_LEVEL[:] = [level]
+    for logger in LOGGER.values():
+        logger.show_level = level
 
 
 def get_logger(name: str = "default") -> Logger:
     if name not in LOGGER:
-        LOGGER[name] = Logger()
+        LOGGER[name] = Logger(show_level=_SHOW_LEVEL[0])
     return LOGGER[name]
@@ -179,8 +179,15 @@ class ArgParser:
             self.args[val_arg].value += 1
 
     def _parse_positional_argument(self, val_arg: str) -> Tuple[int, Arg]:
+        if len(self.args_pos) == self._nb_expected_args and self.args_pos:
+            # all positional are set, only a last positional in array mode can take more values
+            last_pos = list(self.args_pos.values())[-1]
+            if last_pos.mode == "array":
+                last_pos.value.append(val_arg)
+                return 1, last_pos
+
         i_pos_name = list(self.args_pos_def.keys())[len(self.args_pos.keys())]
-        self.args[i_pos_name].value = val_arg
+        self.args[i_pos_name].value = [val_arg] if self.args[i_pos_name].mode == "array" else val_arg
         self.args_pos[i_pos_name] = self.args[i_pos_name]
 
         return 1, self.args[i_pos_name]
@@ -204,7 +211,7 @@ class ArgParser:
                 next_value = "" if arg.mode == "count" or (arg.mode and arg.mode.startswith("bool/")) else ' "value"'
                 info_option.append([f"""{opt}{next_value}""", arg.help])
             else:
-                info_not_option.append([arg.name, arg.help])
+                info_not_option.append([f"{arg.name} ..." if arg.mode == "array" else arg.name, arg.help])
 
         infos = info_not_option + info_option
 
@@ -14,12 +14,16 @@ __status__ = "Development"
 import hashlib
 import os
 import platform
+import queue
 import shutil
 import subprocess  # nosec: B404  # noqa: S404
+import sys
+import threading
 import time
-from dataclasses import dataclass
+from collections import deque
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Tuple, Type, TypeVar, Union, get_args, get_origin
+from typing import IO, Any, Callable, Deque, Dict, Iterator, List, Tuple, Type, TypeVar, Union, get_args, get_origin
 
 import uvpipx.platform
 from uvpipx.internal_libs.Logger import Logger, get_logger
@@ -83,6 +87,39 @@ class Elapser:
         return f"{message}   ⏱️  {self.elapsed_second}"
 
 
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def parse_duration(duration: str) -> float:
+    """
+    Parses a duration like "90", "30m", "12h" or "7d" (seconds when no unit is given).
+
+    Args:
+        duration (str): The duration, a positive number with an optional unit among s, m, h, d and w.
+
+    Returns:
+        float: The duration in seconds.
+    """
+    value, unit = (duration[:-1], duration[-1]) if duration[-1:] in DURATION_UNITS else (duration, "s")
+    try:
+        seconds = float(value) * DURATION_UNITS[unit]
+    except ValueError:
+        seconds = -1
+    if not seconds >= 0:  # negative or nan
+        msg = f"Invalid duration {duration}, expected for example 90, 30m, 12h or 7d"
+        raise ValueError(msg)
+
+    return seconds
+
+
+def human_duration(seconds: float) -> str:
+    for unit, unit_seconds in reversed(DURATION_UNITS.items()):
+        if seconds >= unit_seconds or unit == "s":
+            return f"{seconds / unit_seconds:.1f}{unit}" if unit != "s" else f"{int(seconds)}s"
+
+    return f"{int(seconds)}s"
+
+
 def shell_run(
     command: str,
     *,
@@ -129,7 +166,7 @@ def shell_run(
         # stdout = stdout.decode(encoding)
         # stderr = stderr.decode(encoding)
         if rc != 0 and raise_on_error:
-            short_msg = f"{stderr:2000}".rstrip()
+            short_msg = f"{stderr:.2000}".rstrip()
             msg = f"🔴 Command failed with return code {rc} {short_msg}..."
             raise RuntimeError(
                 msg,
@@ -138,6 +175,241 @@ def shell_run(
     return rc, stdout, stderr
 
 
+def exec_run(
+    argv: List[str],
+    *,
+    cwd: Union[None, Path] = None,
+    env: Union[None, Dict[str, str]] = None,
+    raise_on_error: bool = True,
+) -> Tuple[int, str, str]:
+    """
+    Executes a command given as an argv list, directly (without a shell), and returns the result.
+
+    Explanation:
+    Unlike shell_run, there is no /bin/sh between uvpipx and the command, and each element of argv
+    is passed as is (a spec like "foo>=1,<2" needs no quoting).
+
+    Args:
+        argv (List[str]): The program and its arguments.
+        raise_on_error (bool): Flag to raise an error if the command execution fails. Default is True.
+
+    Returns:
+        Tuple[int, str, str]: A tuple containing the return code, standard output, and standard error.
+    """
+    env_ = cmd_prepare_env(env)
+
+    try:
+        proc = subprocess.Popen(  # nosec: B603 # noqa: S603
+            argv,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            env=env_,
+            cwd=cwd,
+        )
+    except OSError as e:  # program not found or not executable, like rc 127 of a shell
+        if raise_on_error:
+            msg = f"🔴 Command {argv[0]} failed to start: {e}"
+            raise RuntimeError(msg) from e
+        return 127, "", str(e)
+
+    with proc:
+        stdout, stderr = proc.communicate()
+
+    rc = proc.returncode
+    if rc != 0 and raise_on_error:
+        short_msg = f"{stderr:.2000}".rstrip()
+        msg = f"🔴 Command failed with return code {rc} {short_msg}..."
+        raise RuntimeError(msg)
+
+    return rc, stdout, stderr
+
+
+@dataclass
+class ChildUsage:
+    """
+    The resources used by a child process: cpu time, peak memory and block I/O (see os.wait4).
+
+    Explanation:
+    The usage is the one of the child and of its own children it waited for (uv and its build backends).
+    max_rss_kib is the peak of the biggest of them, the times and blocks are summed.
+    """
+
+    user_s: float = 0
+    sys_s: float = 0
+    max_rss_kib: int = 0
+    read_blocks: int = 0
+    write_blocks: int = 0
+
+    @classmethod
+    def from_rusage(cls, rusage: Any) -> ChildUsage:  # noqa: ANN401
+        max_rss = rusage.ru_maxrss // 1024 if sys.platform == "darwin" else rusage.ru_maxrss  # bytes on macOS
+        return cls(rusage.ru_utime, rusage.ru_stime, max_rss, rusage.ru_inblock, rusage.ru_oublock)
+
+    def merge(self, other: ChildUsage) -> None:
+        self.user_s += other.user_s
+        self.sys_s += other.sys_s
+        self.max_rss_kib = max(self.max_rss_kib, other.max_rss_kib)
+        self.read_blocks += other.read_blocks
+        self.write_blocks += other.write_blocks
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "user_s": round(self.user_s, 6),
+            "sys_s": round(self.sys_s, 6),
+            "max_rss_kib": self.max_rss_kib,
+            "read_blocks": self.read_blocks,
+            "write_blocks": self.write_blocks,
+        }
+
+    def show(self) -> str:
+        return (
+            f"cpu {self.user_s:.2f}s user + {self.sys_s:.2f}s sys, max rss {self.max_rss_kib / 1024:.1f} MiB,"
+            f" io {self.read_blocks} blocks in / {self.write_blocks} out"
+        )
+
+
+def wait_child(proc: subprocess.Popen) -> Union[None, ChildUsage]:
+    """
+    Waits for a child process, with os.wait4 where it exists, to also get its resource usage.
+
+    Explanation:
+    os.wait4 reaps this child only, so the usage is right even with other children running in other threads,
+    unlike the deltas of getrusage(RUSAGE_CHILDREN). The returncode of proc is set like Popen.wait does.
+
+    Args:
+        proc (subprocess.Popen): The child process, not waited for yet.
+
+    Returns:
+        Union[None, ChildUsage]: The usage of the child, None if it is not available (windows).
+    """
+    wait4 = getattr(os, "wait4", None)
+    if wait4 is None or proc.returncode is not None:
+        proc.wait()
+        return None
+
+    try:
+        _, status, rusage = wait4(proc.pid, 0)
+    except ChildProcessError:  # already reaped
+        proc.wait()
+        return None
+
+    proc.returncode = -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+    return ChildUsage.from_rusage(rusage)
+
+
+@dataclass
+class StreamRunner:
+    """
+    Runs a command given as an argv list and yields its output lines as they arrive.
+
+    Explanation:
+    stdout and stderr are read by two threads, but the lines are yielded in the calling thread,
+    so callbacks (Logger, parsers) run where the command was started. Only a bounded tail
+    of the output is kept, for the error message. Once done, usage has the resources used by the command.
+
+    Examples:
+        runner = StreamRunner(["uv", "pip", "install", "jc"])
+        for stream_name, line in runner.lines():
+            print(stream_name, line)
+        runner.check()
+    """
+
+    argv: List[str]
+    cwd: Union[None, Path] = None
+    env: Union[None, Dict[str, str]] = None
+    tail_size: int = 50
+    returncode: Union[None, int] = field(init=False, default=None)
+    usage: Union[None, ChildUsage] = field(init=False, default=None)
+    tail: Deque[str] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.tail = deque(maxlen=self.tail_size)
+
+    @staticmethod
+    def _read_pipe(stream_name: str, pipe: IO[str], lines: queue.Queue) -> None:
+        with pipe:
+            for line in pipe:
+                lines.put((stream_name, line.rstrip("\r\n")))
+        lines.put((stream_name, None))
+
+    def lines(self) -> Iterator[Tuple[str, str]]:
+        try:
+            proc = subprocess.Popen(  # nosec: B603 # noqa: S603
+                self.argv,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                env=cmd_prepare_env(self.env),
+                cwd=self.cwd,
+            )
+        except OSError as e:  # program not found or not executable, like rc 127 of a shell
+            self.returncode = 127
+            self.tail.append(str(e))
+            return
+
+        lines: queue.Queue = queue.Queue()
+        readers = [
+            threading.Thread(target=self._read_pipe, args=(name, pipe, lines), daemon=True)
+            for name, pipe in [("stdout", proc.stdout), ("stderr", proc.stderr)]
+        ]
+        for reader in readers:
+            reader.start()
+
+        with proc:
+            nb_open = len(readers)
+            while nb_open:
+                stream_name, line = lines.get()
+                if line is None:
+                    nb_open -= 1
+                    continue
+                self.tail.append(line)
+                yield stream_name, line
+
+            self.usage = wait_child(proc)
+            self.returncode = proc.returncode
+
+    def run(self, on_line: Union[None, Callable[[str, str], None]] = None) -> int:
+        for stream_name, line in self.lines():
+            if on_line:
+                on_line(stream_name, line)
+
+        return self.returncode if self.returncode is not None else -1
+
+    def check(self) -> None:
+        if self.returncode != 0:
+            short_msg = "\n".join(self.tail)
+            msg = f"🔴 Command failed with return code {self.returncode} {short_msg}"
+            raise RuntimeError(msg)
+
+
+def stream_run(
+    argv: List[str],
+    *,
+    cwd: Union[None, Path] = None,
+    env: Union[None, Dict[str, str]] = None,
+    on_line: Union[None, Callable[[str, str], None]] = None,
+    raise_on_error: bool = True,
+) -> StreamRunner:
+    """
+    Executes a command given as an argv list, sending each output line to on_line as soon as it is written.
+
+    Args:
+        argv (List[str]): The program and its arguments.
+        on_line (Union[None, Callable[[str, str], None]]): Called with the stream name (stdout/stderr) and the line.
+        raise_on_error (bool): Flag to raise an error if the command execution fails. Default is True.
+
+    Returns:
+        StreamRunner: The finished runner, with its returncode and the tail of its output.
+    """
+    runner = StreamRunner(argv, cwd=cwd, env=env)
+    runner.run(on_line)
+    if raise_on_error:
+        runner.check()
+
+    return runner
+
+
 def cmd_run(
     cwd: Union[Path, str],
     command: Union[str, List[str]],
@@ -163,12 +435,12 @@ def cmd_run(
     # encoding = cmd_prepare_encoding()
     pipe_type = None if raw_pipe else subprocess.PIPE
 
-    with subprocess.Popen(  # nosec: B602 # noqa: S602
+    with subprocess.Popen(  # nosec: B602, B603 # noqa: S602, S603
         command,
         stdout=pipe_type,
         stderr=pipe_type,
         cwd=cwd,
-        shell=True,  # nosec: B602 # noqa: S602
+        shell=isinstance(command, str),  # an argv list is executed directly  # nosec: B602 # noqa: S602
         text=True,
         env=env_,
     ) as proc:
@@ -186,7 +458,7 @@ def cmd_run(
 
     rc = proc.returncode
     if rc != 0 and raise_on_error:
-        short_msg = f"{stderr:2000}".rstrip()
+        short_msg = f"{stderr:.2000}".rstrip()
         msg = f"🔴 Command failed with return code {rc} {short_msg}..."
         raise RuntimeError(msg)
 
@@ -295,6 +567,9 @@ def check_type_n_None(
     raise InvalidTypeError(expected_types_, type(value))
 
 
+HASH_BUFFER_SIZE = 1024 * 1024
+
+
 def file_md5(file_path) -> str:
     md5_hash = hashlib.md5(usedforsecurity=False)
     file_path = Path(file_path)
@@ -303,6 +578,6 @@ def file_md5(file_path) -> str:
         raise FileNotFoundError(f"File not found: {file_path}")
 
     with file_path.open(mode="rb") as file:
-        for chunk in iter(lambda: file.read(4096), b""):
+        for chunk in iter(lambda: file.read(HASH_BUFFER_SIZE), b""):
             md5_hash.update(chunk)
     return md5_hash.hexdigest()
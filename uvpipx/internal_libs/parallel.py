@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+__author__ = "Gaëtan Montury"
+__copyright__ = "Copyright (c) 2024-2025 Gaëtan Montury"
+__license__ = """GNU GENERAL PUBLIC LICENSE refer to file LICENSE in repo"""
+__version__ = "0.2.0"  # to bump
+__maintainer__ = "Gaëtan Montury"
+__email__ = "#"
+__status__ = "Development"
+
+
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Union
+
+from uvpipx.internal_libs.Logger import LogEntry, Logger, capture_log_entries
+from uvpipx.internal_libs.misc import Elapser
+
+MAX_DEFAULT_JOBS = 8
+
+
+def default_jobs() -> int:
+    """
+    Returns the default number of parallel jobs, based on the CPU count.
+
+    Explanation:
+    Jobs mostly wait for uv subprocesses (which are already multi-threaded), so it is capped to MAX_DEFAULT_JOBS.
+
+    Returns:
+        int: The default number of jobs.
+    """
+    return max(1, min(MAX_DEFAULT_JOBS, os.cpu_count() or 1))
+
+
+@dataclass
+class JobResult:
+    name: str
+    interval_seconds: float = -1
+    logs: List[LogEntry] = field(default_factory=list)
+    error: Union[None, BaseException] = None
+    value: Any = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _run_job(name: str, job: Callable[[], Any], capture: bool) -> JobResult:
+    result = JobResult(name)
+    with Elapser() as ela:
+        if capture:
+            with capture_log_entries() as entries:
+                try:
+                    result.value = job()
+                except Exception as e:  # noqa: BLE001
+                    result.error = e
+            result.logs = entries
+        else:
+            try:
+                result.value = job()
+            except Exception as e:  # noqa: BLE001
+                result.error = e
+
+    result.interval_seconds = ela.interval_seconds
+    return result
+
+
+def run_jobs(
+    jobs: Dict[str, Callable[[], Any]],
+    max_workers: Union[None, int] = None,
+    on_done: Union[None, Callable[[JobResult], None]] = None,
+) -> List[JobResult]:
+    """
+    Runs independent jobs in a bounded thread pool, a failing job does not stop the others.
+
+    Explanation:
+    With more than one worker, the log of each job is captured and kept in its JobResult,
+    on_done is called in the calling thread as soon as a job is finished (so blocks are not mixed).
+    With one worker the jobs run in order and log as usual.
+
+    Args:
+        jobs (Dict[str, Callable[[], Any]]): The jobs by name.
+        max_workers (Union[None, int]): The size of the pool. Default is default_jobs().
+        on_done (Union[None, Callable[[JobResult], None]]): Called with the result of each finished job.
+
+    Returns:
+        List[JobResult]: The results in the order of jobs.
+    """
+    max_workers_ = max_workers or default_jobs()
+    results: Dict[str, JobResult] = {}
+
+    if max_workers_ <= 1 or len(jobs) <= 1:
+        for name, job in jobs.items():
+            results[name] = _run_job(name, job, capture=False)
+            if on_done:
+                on_done(results[name])
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers_, thread_name_prefix="uvpipx-job") as executor:
+            futures = [executor.submit(_run_job, name, job, True) for name, job in jobs.items()]
+            for future in as_completed(futures):
+                result = future.result()
+                results[result.name] = result
+                if on_done:
+                    on_done(result)
+
+    return [results[name] for name in jobs]
+
+
+def log_jobs_summary(logger: Logger, action: str, results: List[JobResult], ela: Elapser) -> None:
+    """
+    Logs the summary of finished jobs: number of successes and failures, wall and cumulated time, failures reasons.
+
+    Args:
+        logger (Logger): The logger to use.
+        action (str): The name of the action done by the jobs (for example "upgrade").
+        results (List[JobResult]): The results of the jobs.
+        ela (Elapser): The Elapser measuring the wall time of all the jobs.
+
+    Returns:
+        None
+    """
+    failed = [r for r in results if not r.ok]
+    cumulated = sum(r.interval_seconds for r in results)
+    logger.log_info(
+        ela.ela_str(
+            f" 📊 {action}: {len(results) - len(failed)} 🟢 succeeded, {len(failed)} 🔴 failed (cumulated {cumulated:.3f} seconds)",
+        ),
+    )
+    for result in failed:
+        logger.log_error(f"   🔴 {result.name}: {result.error}")
@@ -0,0 +1,250 @@
+"""intend to be independent(internal one file) PEP 440 versions ... parse, compare and diff"""
+
+from __future__ import annotations
+
+__author__ = "Gaëtan Montury"
+__copyright__ = "Copyright (c) 2024-2025 Gaëtan Montury"
+__license__ = """GNU GENERAL PUBLIC LICENSE refer to file LICENSE in repo"""
+__version__ = "0.2.0"  # to bump
+__maintainer__ = "Gaëtan Montury"
+__email__ = "#"
+__status__ = "Development"
+
+
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache, total_ordering
+from typing import Any, Dict, List, Tuple, Union
+
+# the regex of the appendix of PEP 440
+RE_VERSION = re.compile(
+    r"""^\s*v?
+    (?:(?P<epoch>[0-9]+)!)?                                       # epoch
+    (?P<release>[0-9]+(?:\.[0-9]+)*)                              # release segment
+    (?P<pre>[-_.]?(?P<pre_l>alpha|a|beta|b|preview|pre|c|rc)[-_.]?(?P<pre_n>[0-9]+)?)?
+    (?P<post>(?:-(?P<post_n1>[0-9]+))|(?:[-_.]?(?P<post_l>post|rev|r)[-_.]?(?P<post_n2>[0-9]+)?))?
+    (?P<dev>[-_.]?(?P<dev_l>dev)[-_.]?(?P<dev_n>[0-9]+)?)?
+    (?:\+(?P<local>[a-z0-9]+(?:[-_.][a-z0-9]+)*))?                # local version
+    \s*$""",
+    re.VERBOSE | re.IGNORECASE,
+)
+
+PRE_RELEASE_LABELS = {
+    "alpha": "a",
+    "a": "a",
+    "beta": "b",
+    "b": "b",
+    "c": "rc",
+    "pre": "rc",
+    "preview": "rc",
+    "rc": "rc",
+}
+PRE_RELEASE_RANKS = {"a": 0, "b": 1, "rc": 2}
+
+SortKey = Tuple[Any, ...]
+
+
+class InvalidVersion(ValueError):
+    pass
+
+
+@total_ordering
+@dataclass(frozen=True)
+class Version:
+    """
+    A version of PEP 440, compared like pip and uv compare them.
+
+    Explanation:
+    The normalized parts are kept, and the sort key is computed once: the trailing zeros of the release are
+    ignored (1.0 == 1.0.0), a dev release is before the pre-releases, a post release after the final release,
+    and a local version after the public version.
+    """
+
+    epoch: int
+    release: Tuple[int, ...]
+    pre: Union[None, Tuple[str, int]] = None
+    post: Union[None, int] = None
+    dev: Union[None, int] = None
+    local: Union[None, Tuple[Union[int, str], ...]] = None
+    key: SortKey = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        release = self.release
+        while len(release) > 1 and release[-1] == 0:
+            release = release[:-1]
+
+        if self.pre is not None:
+            pre_key: SortKey = (1, PRE_RELEASE_RANKS[self.pre[0]], self.pre[1])
+        elif self.post is None and self.dev is not None:  # 1.0.dev0 is before 1.0a0
+            pre_key = (0,)
+        else:
+            pre_key = (2,)
+        post_key = (0,) if self.post is None else (1, self.post)
+        dev_key = (1,) if self.dev is None else (0, self.dev)
+        # a numeric segment of a local version is after an alphanumeric one
+        local_key = (
+            () if self.local is None else tuple((1, s, "") if isinstance(s, int) else (0, 0, s) for s in self.local)
+        )
+
+        object.__setattr__(self, "key", (self.epoch, release, pre_key, post_key, dev_key, local_key))
+
+    @staticmethod
+    def parse(version: str) -> Version:
+        match = RE_VERSION.match(version)
+        if not match:
+            msg = f"Invalid version {version!r}"
+            raise InvalidVersion(msg)
+
+        pre = None
+        if match["pre_l"]:
+            pre = (PRE_RELEASE_LABELS[match["pre_l"].lower()], int(match["pre_n"] or 0))
+        post = None
+        if match["post"]:
+            post = int(match["post_n1"] or match["post_n2"] or 0)
+        local = None
+        if match["local"]:
+            local = tuple(int(s) if s.isdigit() else s.lower() for s in re.split(r"[-_.]", match["local"]))
+
+        return Version(
+            epoch=int(match["epoch"] or 0),
+            release=tuple(int(s) for s in match["release"].split(".")),
+            pre=pre,
+            post=post,
+            dev=int(match["dev_n"] or 0) if match["dev"] else None,
+            local=local,
+        )
+
+    @property
+    def is_prerelease(self) -> bool:
+        return self.pre is not None or self.dev is not None
+
+    @property
+    def public(self) -> Version:
+        return Version(self.epoch, self.release, self.pre, self.post, self.dev)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Version):
+            return NotImplemented
+        return self.key == other.key
+
+    def __lt__(self, other: Version) -> bool:
+        return self.key < other.key
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    def __str__(self) -> str:
+        s = f"{self.epoch}!" if self.epoch else ""
+        s += ".".join(str(n) for n in self.release)
+        if self.pre is not None:
+            s += f"{self.pre[0]}{self.pre[1]}"
+        if self.post is not None:
+            s += f".post{self.post}"
+        if self.dev is not None:
+            s += f".dev{self.dev}"
+        if self.local is not None:
+            s += "+" + ".".join(str(s) for s in self.local)
+        return s
+
+
+@lru_cache(maxsize=16384)
+def parse_version(version: str) -> Union[None, Version]:
+    """Parses a version (cached, the same versions are parsed many times across the venvs), None if invalid."""
+    try:
+        return Version.parse(version)
+    except InvalidVersion:
+        return None
+
+
+def version_key(version: str) -> SortKey:
+    """Returns the sort key of a version, the invalid versions (legacy ones) before the valid ones."""
+    parsed = parse_version(version)
+    if parsed is None:
+        return (0, version)
+
+    return (1, parsed.key)
+
+
+def is_prerelease(version: str) -> bool:
+    parsed = parse_version(version)
+    return parsed is not None and parsed.is_prerelease
+
+
+def same_version(version: str, other: str) -> bool:
+    """Tells if two versions are equal for PEP 440 (1.0 and 1.0.0 are), or the same string if one is invalid."""
+    parsed, parsed_other = parse_version(version), parse_version(other)
+    if parsed is None or parsed_other is None:
+        return version == other
+
+    return parsed == parsed_other
+
+
+@dataclass
+class VersionsDiff:
+    """
+    The changes between two sets of installed packages (normalized name -> version).
+
+    Explanation:
+    changed holds the versions that differ but are neither newer nor older (an invalid version).
+    """
+
+    added: Dict[str, str] = field(default_factory=dict)
+    removed: Dict[str, str] = field(default_factory=dict)
+    upgraded: Dict[str, Tuple[str, str]] = field(default_factory=dict)
+    downgraded: Dict[str, Tuple[str, str]] = field(default_factory=dict)
+    changed: Dict[str, Tuple[str, str]] = field(default_factory=dict)
+
+    def __bool__(self) -> bool:
+        return any([self.added, self.removed, self.upgraded, self.downgraded, self.changed])
+
+    def to_dict(self) -> Dict[str, Any]:
+        def from_to(changes: Dict[str, Tuple[str, str]]) -> Dict[str, Dict[str, str]]:
+            return {name: {"from": old, "to": new} for name, (old, new) in sorted(changes.items())}
+
+        return {
+            "added": dict(sorted(self.added.items())),
+            "removed": dict(sorted(self.removed.items())),
+            "upgraded": from_to(self.upgraded),
+            "downgraded": from_to(self.downgraded),
+            "changed": from_to(self.changed),
+        }
+
+    def lines(self) -> List[str]:
+        lines = [f"⬆️  {name} {old} -> {new}" for name, (old, new) in sorted(self.upgraded.items())]
+        lines += [f"⬇️  {name} {old} -> {new}" for name, (old, new) in sorted(self.downgraded.items())]
+        lines += [f"🔀 {name} {old} -> {new}" for name, (old, new) in sorted(self.changed.items())]
+        lines += [f"➕ {name} {version}" for name, version in sorted(self.added.items())]  # noqa: RUF001
+        lines += [f"➖ {name} {version}" for name, version in sorted(self.removed.items())]  # noqa: RUF001
+        return lines
+
+
+def diff_versions(old: Dict[str, str], new: Dict[str, str]) -> VersionsDiff:
+    """
+    Diffs two sets of installed packages in one pass over each dict.
+
+    Args:
+        old (Dict[str, str]): The versions before, by normalized package name.
+        new (Dict[str, str]): The versions after, by normalized package name.
+
+    Returns:
+        VersionsDiff: The added, removed, upgraded, downgraded and changed packages.
+    """
+    diff = VersionsDiff()
+    for name, new_version in new.items():
+        old_version = old.get(name)
+        if old_version is None:
+            diff.added[name] = new_version
+        elif old_version != new_version and not same_version(old_version, new_version):
+            old_parsed, new_parsed = parse_version(old_version), parse_version(new_version)
+            if old_parsed is None or new_parsed is None:
+                diff.changed[name] = (old_version, new_version)
+            elif new_parsed > old_parsed:
+                diff.upgraded[name] = (old_version, new_version)
+            else:
+                diff.downgraded[name] = (old_version, new_version)
+
+    for name, old_version in old.items():
+        if name not in new:
+            diff.removed[name] = old_version
+
+    return diff
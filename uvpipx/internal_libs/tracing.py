@@ -0,0 +1,252 @@
+"""intend to be independent(internal one file) nested timing spans, exported as a Chrome trace, and profiling"""
+
+from __future__ import annotations
+
+__author__ = "Gaëtan Montury"
+__copyright__ = "Copyright (c) 2024-2025 Gaëtan Montury"
+__license__ = """GNU GENERAL PUBLIC LICENSE refer to file LICENSE in repo"""
+__version__ = "0.2.0"  # to bump
+__maintainer__ = "Gaëtan Montury"
+__email__ = "#"
+__status__ = "Development"
+
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import FrameType
+from typing import Any, Dict, Iterator, List, Union
+
+PROFILE_KINDS = ("cpu", "memory")
+MEMORY_TOP_LINES = 30
+
+
+@dataclass
+class TraceSpan:
+    name: str
+    cat: str
+    tid: int
+    start_ns: int
+    args: Dict[str, Any] = field(default_factory=dict)
+    end_ns: Union[None, int] = None
+
+    @property
+    def duration_ns(self) -> int:
+        return (self.end_ns or time.perf_counter_ns()) - self.start_ns
+
+
+@dataclass
+class Tracer:
+    """
+    Records nested timing spans (command -> venv -> phase) of all the threads, for a Chrome trace.
+
+    Explanation:
+    Each thread has its own stack of open spans, so the spans of the parallel jobs nest in their own thread.
+    A span is only kept once it is closed, and a root span (the command) encloses all the spans of its thread.
+    """
+
+    root_name: str = "uvpipx"
+    trace_path: Union[None, Path] = None
+
+    def __post_init__(self) -> None:
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.spans: List[TraceSpan] = []
+        self.thread_names: Dict[int, str] = {}
+        self.origin_ns = time.perf_counter_ns()
+        self.root = self.begin(self.root_name, "command")
+
+    def _stack(self) -> List[TraceSpan]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def begin(self, name: str, cat: str, **args: Any) -> TraceSpan:  # noqa: ANN401
+        tid = threading.get_ident()
+        if tid not in self.thread_names:
+            with self._lock:
+                self.thread_names[tid] = threading.current_thread().name
+        trace_span = TraceSpan(name, cat, tid, time.perf_counter_ns(), args)
+        self._stack().append(trace_span)
+        return trace_span
+
+    def end(self, trace_span: TraceSpan) -> None:
+        trace_span.end_ns = time.perf_counter_ns()
+        stack = self._stack()
+        if trace_span in stack:
+            stack.remove(trace_span)
+        with self._lock:
+            self.spans.append(trace_span)
+
+    @contextmanager
+    def span(self, name: str, cat: str = "phase", **args: Any) -> Iterator[TraceSpan]:  # noqa: ANN401
+        trace_span = self.begin(name, cat, **args)
+        try:
+            yield trace_span
+        except BaseException as e:
+            trace_span.args["error"] = str(e) or type(e).__name__
+            raise
+        finally:
+            self.end(trace_span)
+
+    def finish(self) -> None:
+        """Closes the root span, the spans still open (a failure) are closed at the same time."""
+        for trace_span in reversed(self._stack()):
+            self.end(trace_span)
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """
+        Returns the spans as a Chrome trace (trace event format), for chrome://tracing or https://ui.perfetto.dev.
+
+        Returns:
+            Dict[str, Any]: The trace, a complete ("X") event by span and the name of each thread.
+        """
+        pid = os.getpid()
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: (s.start_ns, -s.duration_ns))
+            thread_names = dict(self.thread_names)
+
+        events: List[Dict[str, Any]] = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+            for tid, name in thread_names.items()
+        ]
+        events += [
+            {
+                "name": s.name,
+                "cat": s.cat,
+                "ph": "X",
+                "ts": (s.start_ns - self.origin_ns) / 1000,
+                "dur": s.duration_ns / 1000,
+                "pid": pid,
+                "tid": s.tid,
+                "args": s.args,
+            }
+            for s in spans
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w") as outfile:
+            json.dump(self.chrome_trace(), outfile, default=str)
+
+
+_TRACER: List[Tracer] = []
+
+
+def set_tracer(tracer: Union[None, Tracer]) -> None:
+    """Sets (or removes with None) the tracer recording the spans."""
+    _TRACER[:] = [tracer] if tracer else []
+
+
+def get_tracer() -> Union[None, Tracer]:
+    return _TRACER[0] if _TRACER else None
+
+
+@contextmanager
+def span(name: str, cat: str = "phase", **args: Any) -> Iterator[Union[None, TraceSpan]]:  # noqa: ANN401
+    """
+    Records a span with the tracer if one is set (see --trace), else does nothing.
+
+    Explanation:
+    Like any contextmanager, it can also decorate a function: @span("freeze") records each call.
+
+    Args:
+        name (str): The name of the span (for example "uv pip install").
+        cat (str): The category of the span: command, venv, phase, uv or http.
+        **args (Any): The data shown with the span.
+
+    Returns:
+        Iterator[Union[None, TraceSpan]]: The span, to add data to it, None without tracer.
+    """
+    tracer = get_tracer()
+    if tracer is None:
+        yield None
+        return
+
+    with tracer.span(name, cat, **args) as trace_span:
+        yield trace_span
+
+
+def profile_kinds(value: str) -> List[str]:
+    kinds = [kind.strip() for kind in value.split(",") if kind.strip()]
+    unknown = [kind for kind in kinds if kind not in PROFILE_KINDS]
+    if unknown:
+        msg = f"Unknown profile kind(s) {', '.join(unknown)}, expected a list of {', '.join(PROFILE_KINDS)}"
+        raise ValueError(msg)
+
+    return kinds
+
+
+@contextmanager
+def profiling(kinds: List[str], output_base: Path) -> Iterator[List[Path]]:
+    """
+    Profiles the block with cProfile (cpu) and/or tracemalloc (memory).
+
+    Explanation:
+    The cpu profile is written to <output_base>.prof (read it with python -m pstats or snakeviz), the memory
+    profile to <output_base>.memory.txt: the peak of the traced memory and the lines allocating the most.
+    Both modules are only imported when asked. Before python 3.12, cProfile only sees the thread enabling it:
+    each thread started in the block (the jobs of run_jobs) gets its own profiler, merged in the cpu profile.
+
+    Args:
+        kinds (List[str]): The profiles to capture, among cpu and memory.
+        output_base (Path): The path of the files written, without suffix.
+
+    Returns:
+        Iterator[List[Path]]: The files written, filled once the block is done.
+    """
+    written: List[Path] = []
+    profiler = None
+    thread_profilers: List[Any] = []
+    if "memory" in kinds:
+        import tracemalloc  # noqa: PLC0415
+
+        tracemalloc.start()
+    if "cpu" in kinds:
+        import cProfile  # noqa: PLC0415
+
+        profiler = cProfile.Profile()
+        if sys.version_info < (3, 12):  # since 3.12, cProfile sees all the threads (sys.monitoring)
+            lock = threading.Lock()
+
+            def profile_thread(_frame: FrameType, _event: str, _arg: object) -> None:
+                # first call in a new thread: its own profiler replaces this hook
+                thread_profiler = cProfile.Profile()
+                with lock:
+                    thread_profilers.append(thread_profiler)
+                thread_profiler.enable()
+
+            threading.setprofile(profile_thread)
+        profiler.enable()
+
+    try:
+        yield written
+    finally:
+        output_base.parent.mkdir(parents=True, exist_ok=True)
+        if profiler is not None:
+            profiler.disable()
+            threading.setprofile(None)  # type: ignore[arg-type]
+            import pstats  # noqa: PLC0415
+
+            stats = pstats.Stats(profiler)
+            for thread_profiler in thread_profilers:
+                stats.add(thread_profiler)  # the threads of the block are done, their stats are complete
+            cpu_path = output_base.with_name(f"{output_base.name}.prof")
+            stats.dump_stats(str(cpu_path))
+            written.append(cpu_path)
+        if "memory" in kinds:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            lines = [f"peak {peak / 1024**2:.2f} MiB, at the end {current / 1024**2:.2f} MiB", ""]
+            lines += [str(stat) for stat in snapshot.statistics("lineno")[:MEMORY_TOP_LINES]]
+            memory_path = output_base.with_name(f"{output_base.name}.memory.txt")
+            memory_path.write_text("\n".join(lines) + "\n")
+            written.append(memory_path)
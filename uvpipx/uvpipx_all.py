@@ -1,8 +1,17 @@
 from __future__ import annotations
 
-from uvpipx.internal_libs.Logger import get_logger
-from uvpipx.uvpipx_install import uninstall
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Union
+
+from uvpipx.internal_libs.Logger import Logger, get_logger
+from uvpipx.internal_libs.misc import Elapser
+from uvpipx.internal_libs.parallel import JobResult, log_jobs_summary, run_jobs
+from uvpipx.internal_libs.pep440 import VersionsDiff
+from uvpipx.uvpipx_install import bin_links_by_venv, uninstall
+from uvpipx.uvpipx_trash import spawn_reaper
 from uvpipx.uvpipx_upgrade import upgrade
+from uvpipx.uvpipx_venv_load import uvpipx_venv_names
 
 __author__ = "Gaëtan Montury"
 __copyright__ = "Copyright (c) 2024-2025 Gaëtan Montury"
@@ -13,46 +22,66 @@ __email__ = "#"
 __status__ = "Development"
 
 
-from uvpipx import config
+def log_diffs_summary(logger: Logger, diffs: Dict[str, VersionsDiff]) -> None:
+    changed = [diff for diff in diffs.values() if diff]
+    if not changed:
+        return
 
+    counts = {
+        kind: sum(len(getattr(diff, kind)) for diff in changed)
+        for kind in ["upgraded", "downgraded", "changed", "added", "removed"]
+    }
+    details = ", ".join(f"{count} {kind}" for kind, count in counts.items() if count)
+    logger.log_info(f" 🏗️  {len(changed)} venv(s) changed: {details} package(s)")
 
-def upgrade_all() -> None:
+
+def upgrade_all(
+    jobs: Union[None, int] = None,
+    wheelhouse: Union[None, Path] = None,
+    min_interval: Union[None, float] = None,
+) -> List[JobResult]:
     logger = get_logger("upgrade_all")
 
-    infos = ""
+    venv_names = uvpipx_venv_names()
+    if not venv_names:
+        logger.log_info("⭕ No uvpipx package installed!")
+        return []
+
+    def show_job(result: JobResult) -> None:
+        logger.replay(result.logs)
+        if not result.ok:
+            logger.log_error(f" 🔴 Upgrade of {result.name} failed: {result.error}")
+        logger.log_info(" ----------------\n")
 
-    nb = 0
-    if config.uvpipx_venvs.exists():
-        for pck_venv in config.uvpipx_venvs.iterdir():
-            if nb > 0:
-                logger.log_info("")
-            upgrade(pck_venv.name)  # This is a tricky way to get the name
-            logger.log_info(" ----------------")
-            nb += 1
+    with Elapser() as ela:
+        results = run_jobs(
+            # This is a tricky way to get the name
+            {name: partial(upgrade, name, wheelhouse=wheelhouse, min_interval=min_interval) for name in venv_names},
+            max_workers=jobs,
+            on_done=show_job,
+        )
 
-    if nb == 0:
-        infos += "⭕ No uvpipx package installed!"
+    log_jobs_summary(logger, "upgrade", results, ela)
+    log_diffs_summary(logger, {r.name: r.value for r in results if isinstance(r.value, VersionsDiff)})
 
-    if infos:
-        logger.log_info(infos)
+    return results
 
 
 def uninstall_all() -> None:
     logger = get_logger("uninstall_all")
 
-    infos = ""
-
-    nb = 0
-    if config.uvpipx_venvs.exists():
-        for pck_venv in config.uvpipx_venvs.iterdir():
-            if nb > 0:
-                logger.log_info("")
-            uninstall(pck_venv.name)  # This is a tricky way to get the name
-            logger.log_info(" ----------------")
-            nb += 1
-
-    if nb == 0:
-        infos += "⭕ No uvpipx package installed!"
-
-    if infos:
-        logger.log_info(infos)
+    venv_names = uvpipx_venv_names()
+    bin_links = bin_links_by_venv() if venv_names else {}  # one scan of the bin directory for all the venvs
+    trash_dirs: List[Path] = []
+    for nb, venv_name in enumerate(venv_names):
+        if nb > 0:
+            logger.log_info("")
+        trash_dirs.extend(uninstall(venv_name, reap=False, bin_links=bin_links))  # This is a tricky way to get the name
+        logger.log_info(" ----------------")
+
+    if not venv_names:
+        logger.log_info("⭕ No uvpipx package installed!")
+        return
+
+    # one reaper deletes in parallel all the venvs moved to the trash
+    spawn_reaper(trash_dirs)
@@ -9,9 +9,66 @@ __email__ = "#"
 __status__ = "Development"
 
 
+from dataclasses import dataclass
+from typing import Callable, Dict, Union
+
 from uvpipx.internal_libs.args import Arg, ArgParser, ArgParserMode
 
-arg_parser: dict[str, ArgParser] = {}
+
+@dataclass
+class Command:
+    """
+    A uvpipx command of the registry.
+
+    Explanation:
+    Only the help is known at import time. The ArgParser is built, and the module of the command imported
+    (in its cmd_launcher function), only for the command being run, to keep the startup of uvpipx fast.
+
+    Args:
+        name (str): The name of the command (for example "upgrade-all").
+        help (str): The help of the command, shown in the general help.
+        build_parser (Callable[[], ArgParser]): Builds the ArgParser of the command.
+        launcher (str): The name of the function of cmd_launcher running the command.
+    """
+
+    name: str
+    help: str
+    build_parser: Callable[[], ArgParser]
+    launcher: str
+
+    def arg_parser(self) -> ArgParser:
+        argp = self.build_parser()
+        argp.help = self.help
+
+        return argp
+
+
+commands: Dict[str, Command] = {}
+
+
+def command(
+    name: str,
+    help_: str,
+    launcher: Union[None, str] = None,
+) -> Callable[[Callable[[], ArgParser]], Callable[[], ArgParser]]:
+    """
+    Registers the decorated ArgParser builder as a uvpipx command.
+
+    Args:
+        name (str): The name of the command.
+        help_ (str): The help of the command.
+        launcher (Union[None, str]): The function of cmd_launcher. Default is the name with "_" instead of "-".
+
+    Returns:
+        Callable[[Callable[[], ArgParser]], Callable[[], ArgParser]]: The decorator.
+    """
+
+    def decorator(build_parser: Callable[[], ArgParser]) -> Callable[[], ArgParser]:
+        commands[name] = Command(name, help_, build_parser, launcher or name.replace("-", "_"))
+        return build_parser
+
+    return decorator
+
 
 verbose_arg = Arg(
     "--verbose",
@@ -25,194 +82,399 @@ help_arg = Arg(
     help="""Show help""",
 )
 
-arg_parser["install"] = ArgParser(
-    [
-        Arg(
-            "python_pkg",
-            help="""The python package name to install (for example "jc")\nBut you can also give version using "jc==1.25.2" """,
-        ),
-        Arg(
-            "--expose",
-            mode="array",
-            default=["__main__"],
-            help="""By default, all executable program in bin will be exposed to `uvpipx_local_bin`\nYou can use --expose jc to expose only this program. you can use many --expose\n--expose _ tell to expose nothing""",
-        ),
-        Arg(
-            "--inject",
-            mode="array",
-            default=[],
-            help="""Inject a package in the venv like main package""",
-        ),
-        Arg(
-            "--force",
-            mode="bool/true",
-            help="""Allow to force reinstall""",
-        ),
-        verbose_arg,
-        help_arg,
-    ],
-    help="Install a python package",
+jobs_arg = Arg(
+    "--jobs",
+    help="""Number of venvs processed in parallel (default based on the CPU count)\nUse --jobs 1 to process them one by one""",
 )
 
-arg_parser["uninstall"] = ArgParser(
-    [
-        Arg(
-            "python_pkg",
-            help="""The python package name to uninstall (for example "jc")""",
-        ),
-        verbose_arg,
-        help_arg,
-    ],
-    help="Uninstall a python package",
+wheelhouse_arg = Arg(
+    "--wheelhouse",
+    help="""Install only from the wheels of this directory, without any index (see uvpipx wheelhouse export)""",
 )
 
-arg_parser["uninstall-all"] = ArgParser(
-    [
-        verbose_arg,
-        help_arg,
-    ],
-    help="Uninstall all python packages",
+diff_json_arg = Arg(
+    "--diff-json",
+    help="""Write the changes (added, removed, upgraded and downgraded packages) of each venv in this json file""",
 )
 
-arg_parser["venv"] = ArgParser(
-    [
-        Arg(
-            "python_pkg",
-            help="""The python package name of the venv you want to use (for example "jc")""",
-        ),
-        verbose_arg,
-        help_arg,
-    ],
-    help="Run a command in the venv of the python package",
+min_interval_arg = Arg(
+    "--min-interval",
+    help="""Skip the venvs upgraded less than this duration ago (for example 3600, 30m, 12h or 7d)""",
 )
 
-arg_parser["ensurepath"] = ArgParser(
-    [
-        verbose_arg,
-        help_arg,
-    ],
-    help="Configure PATH for uvpipx",
+format_arg = Arg(
+    "--format",
+    default="text",
+    help="""The output format: text (default), json or ndjson\nWith json or ndjson, stdout only has the events (install.started, app.exposed, venv.listed, ...), the logs go to stderr""",
 )
 
-arg_parser["list"] = ArgParser(
-    [
-        verbose_arg,
-        help_arg,
-    ],
-    help="Show the list of python packages installed",
-)
-arg_parser["info"] = ArgParser(
-    [
-        Arg(
-            "python_pkg",
-            help="""The python package name to get information (for example "jc")""",
-        ),
-        verbose_arg,
-        help_arg,
-        Arg("--get-venv", mode="bool/true"),
-    ],
-    help="Show information about a python package",
+trace_arg = Arg(
+    "--trace",
+    help="""Write the timings of the command, by venv and by phase (uv install, freeze, metadata, expose...), in this Chrome trace file\nOpen it with https://ui.perfetto.dev or chrome://tracing""",
 )
 
-arg_parser["upgrade"] = ArgParser(
-    [
-        Arg(
-            "python_pkg",
-            help="""The python package name to upgrade (for example "jc")\nBut you can also give version using "jc==1.25.2" """,
-        ),
-        verbose_arg,
-        help_arg,
-    ],
-    help="Upgrade a python package",
-)
 
-arg_parser["upgrade-all"] = ArgParser(
-    [
-        verbose_arg,
-        help_arg,
-    ],
-    help="Upgrade all python packages",
-)
+@command("install", "Install a python package")
+def install_parser() -> ArgParser:
+    return ArgParser(
+        [
+            Arg(
+                "python_pkg",
+                mode="array",
+                help="""The python package name to install (for example "jc")\nBut you can also give version using "jc==1.25.2"\nMany packages can be given, each one is installed in its own venv (see --jobs)""",
+            ),
+            Arg(
+                "--expose",
+                mode="array",
+                default=["__main__"],
+                help="""By default, all executable program in bin will be exposed to `uvpipx_local_bin`\nYou can use --expose jc to expose only this program. you can use many --expose\n--expose _ tell to expose nothing""",
+            ),
+            Arg(
+                "--inject",
+                mode="array",
+                default=[],
+                help="""Inject a package in the venv like main package""",
+            ),
+            Arg(
+                "--force",
+                mode="bool/true",
+                help="""Allow to force reinstall""",
+            ),
+            wheelhouse_arg,
+            jobs_arg,
+            format_arg,
+            trace_arg,
+            verbose_arg,
+            help_arg,
+        ],
+    )
 
-arg_parser["inject"] = ArgParser(
-    [
-        Arg(
-            "python_pkg",
-            help="""The python main package name (for example "jc")\nBut you can also give version using "jc==1.25.2" """,
-        ),
-        Arg(
-            "inject_python_pkg",
-            help="""The python package name to inject (for example "jc")\nBut you can also give version using "jc==1.25.2" """,
-        ),
-        verbose_arg,
-        help_arg,
-    ],
-    mode=ArgParserMode.AUTO_EXTRA_ARGS,
-    help="Inject one or many python package(s) in main python package",
-)
 
-arg_parser["uninject"] = ArgParser(
-    [
-        Arg(
-            "python_pkg",
-            help="""The python main package name (for example "jc")\nBut you can also give version using "jc==1.25.2" """,
-        ),
-        Arg(
-            "uninject_python_pkg",
-            help="""The python package name to uninject (for example "jc")\nBut you can also give version using "jc==1.25.2" """,
-        ),
-        verbose_arg,
-        help_arg,
-    ],
-    mode=ArgParserMode.AUTO_EXTRA_ARGS,
-    help="Uninject one or many python package(s) in main python package",
-)
+@command("uninstall", "Uninstall a python package")
+def uninstall_parser() -> ArgParser:
+    return ArgParser(
+        [
+            Arg(
+                "python_pkg",
+                help="""The python package name to uninstall (for example "jc")""",
+            ),
+            format_arg,
+            trace_arg,
+            verbose_arg,
+            help_arg,
+        ],
+    )
 
-arg_parser["expose"] = ArgParser(
-    [
-        Arg(
-            "python_pkg",
-            help="""The python package name to expose (for example "jc")""",
-        ),
-        Arg(
-            "expose_rule_names",
-            help="""Expose only scripts from main package""",
-        ),
-        verbose_arg,
-        help_arg,
-    ],
-    help="Expose a python package",
-)
 
-arg_parser["expose-all"] = ArgParser(
-    [
-        Arg(
-            "expose_rule_names",
-            help="""Expose only scripts from main package""",
-        ),
-        # Arg(
-        #     "--main-package-scripts",
-        #     help="""Expose only scripts from main package""",
-        #     mode="bool/true",
-        # ),
-        verbose_arg,
-        help_arg,
-    ],
-    help="Expose all python packages",
-)
+@command("uninstall-all", "Uninstall all python packages")
+def uninstall_all_parser() -> ArgParser:
+    return ArgParser(
+        [
+            format_arg,
+            trace_arg,
+            verbose_arg,
+            help_arg,
+        ],
+    )
+
+
+@command("venv", "Run a command in the venv of the python package")
+def venv_parser() -> ArgParser:
+    return ArgParser(
+        [
+            Arg(
+                "python_pkg",
+                help="""The python package name of the venv you want to use (for example "jc")""",
+            ),
+            verbose_arg,
+            help_arg,
+        ],
+    )
+
+
+@command("ensurepath", "Configure PATH for uvpipx")
+def ensurepath_parser() -> ArgParser:
+    return ArgParser(
+        [
+            verbose_arg,
+            help_arg,
+        ],
+    )
+
+
+@command("list", "Show the list of python packages installed", launcher="uvpipx_list")
+def list_parser() -> ArgParser:
+    return ArgParser(
+        [
+            format_arg,
+            trace_arg,
+            verbose_arg,
+            help_arg,
+        ],
+    )
+
+
+@command("info", "Show information about a python package")
+def info_parser() -> ArgParser:
+    return ArgParser(
+        [
+            Arg(
+                "python_pkg",
+                help="""The python package name to get information (for example "jc")""",
+            ),
+            verbose_arg,
+            help_arg,
+            Arg("--get-venv", mode="bool/true"),
+        ],
+    )
+
+
+@command("which", "Show the python package exposing a program")
+def which_parser() -> ArgParser:
+    return ArgParser(
+        [
+            Arg(
+                "bin_name",
+                help="""The name of the exposed program (for example "jc")""",
+            ),
+            verbose_arg,
+            help_arg,
+            Arg("--get-venv", mode="bool/true"),
+        ],
+    )
+
+
+@command("outdated", "Show the python packages with a newer version on the package index")
+def outdated_parser() -> ArgParser:
+    return ArgParser(
+        [
+            Arg(
+                "python_pkg",
+                mode="array",
+                help="""The python packages to check (for example "jc"), all of them if not given""",
+            ),
+            jobs_arg,
+            format_arg,
+            trace_arg,
+            verbose_arg,
+            help_arg,
+        ],
+        mode=ArgParserMode.ALLOW_MISSING_POSITIONAL,
+    )
+
+
+@command("upgrade", "Upgrade a python package")
+def upgrade_parser() -> ArgParser:
+    return ArgParser(
+        [
+            Arg(
+                "python_pkg",
+                help="""The python package name to upgrade (for example "jc")\nBut you can also give version using "jc==1.25.2" """,
+            ),
+            wheelhouse_arg,
+            min_interval_arg,
+            diff_json_arg,
+            format_arg,
+            trace_arg,
+            verbose_arg,
+            help_arg,
+        ],
+    )
+
+
+@command("upgrade-all", "Upgrade all python packages")
+def upgrade_all_parser() -> ArgParser:
+    return ArgParser(
+        [
+            wheelhouse_arg,
+            min_interval_arg,
+            diff_json_arg,
+            jobs_arg,
+            format_arg,
+            trace_arg,
+            verbose_arg,
+            help_arg,
+        ],
+    )
+
+
+@command("inject", "Inject one or many python package(s) in main python package")
+def inject_parser() -> ArgParser:
+    return ArgParser(
+        [
+            Arg(
+                "python_pkg",
+                help="""The python main package name (for example "jc")\nBut you can also give version using "jc==1.25.2" """,
+            ),
+            Arg(
+                "inject_python_pkg",
+                mode="array",
+                help="""The python package name to inject (for example "jc")\nBut you can also give version using "jc==1.25.2" """,
+            ),
+            format_arg,
+            trace_arg,
+            verbose_arg,
+            help_arg,
+        ],
+    )
+
+
+@command("uninject", "Uninject one or many python package(s) in main python package")
+def uninject_parser() -> ArgParser:
+    return ArgParser(
+        [
+            Arg(
+                "python_pkg",
+                help="""The python main package name (for example "jc")\nBut you can also give version using "jc==1.25.2" """,
+            ),
+            Arg(
+                "uninject_python_pkg",
+                mode="array",
+                help="""The python package name to uninject (for example "jc")\nBut you can also give version using "jc==1.25.2" """,
+            ),
+            format_arg,
+            trace_arg,
+            verbose_arg,
+            help_arg,
+        ],
+    )
+
+
+@command("expose", "Expose a python package")
+def expose_parser() -> ArgParser:
+    return ArgParser(
+        [
+            Arg(
+                "python_pkg",
+                help="""The python package name to expose (for example "jc")""",
+            ),
+            Arg(
+                "expose_rule_names",
+                help="""Expose only scripts from main package""",
+            ),
+            format_arg,
+            trace_arg,
+            verbose_arg,
+            help_arg,
+        ],
+    )
+
+
+@command("expose-all", "Expose all python packages")
+def expose_all_parser() -> ArgParser:
+    return ArgParser(
+        [
+            Arg(
+                "expose_rule_names",
+                help="""Expose only scripts from main package""",
+            ),
+            # Arg(
+            #     "--main-package-scripts",
+            #     help="""Expose only scripts from main package""",
+            #     mode="bool/true",
+            # ),
+            format_arg,
+            trace_arg,
+            verbose_arg,
+            help_arg,
+        ],
+    )
+
+
+@command("wheelhouse", "Export the wheels of the python packages installed, for offline install")
+def wheelhouse_parser() -> ArgParser:
+    return ArgParser(
+        [
+            Arg(
+                "action",
+                help="""The action, only "export" for now\nUse install/upgrade --wheelhouse to install from a wheelhouse""",
+            ),
+            Arg(
+                "wheelhouse_dir",
+                help="""The wheelhouse directory, where the wheels of the requirements.txt of every venv are collected""",
+            ),
+            verbose_arg,
+            help_arg,
+        ],
+        mode=ArgParserMode.AUTO_EXTRA_ARGS,
+    )
+
+
+@command("dedup", "Hardlink the identical files of the venvs of the python packages")
+def dedup_parser() -> ArgParser:
+    return ArgParser(
+        [
+            Arg(
+                "--dry-run",
+                mode="bool/true",
+                help="""Only report the duplicate files and the space that would be reclaimed""",
+            ),
+            Arg(
+                "--incremental",
+                mode="bool/true",
+                help="""Only scan the venvs changed since the last dedup (the hashes of the other venvs are reused)""",
+            ),
+            verbose_arg,
+            help_arg,
+        ],
+    )
+
+
+@command("doctor", "Check and fix the exposed programs and the venvs of the python packages")
+def doctor_parser() -> ArgParser:
+    return ArgParser(
+        [
+            Arg(
+                "--fix",
+                mode="bool/true",
+                help="""Fix the issues found: remove the stale links and orphan venvs, expose again the missing programs""",
+            ),
+            verbose_arg,
+            help_arg,
+        ],
+    )
+
+
+@command("stats", "Show the durations of the install, upgrade... recorded in the history")
+def stats_parser() -> ArgParser:
+    return ArgParser(
+        [
+            Arg(
+                "python_pkg",
+                mode="array",
+                help="""The venvs of the python packages to show (for example "jc"), all of them if not given""",
+            ),
+            Arg(
+                "--since",
+                help="""Only the operations of this last duration (for example 12h, 7d or 4w)""",
+            ),
+            Arg(
+                "--top",
+                default="5",
+                help="""Number of slowest tools shown (default 5)""",
+            ),
+            verbose_arg,
+            help_arg,
+        ],
+        mode=ArgParserMode.ALLOW_MISSING_POSITIONAL,
+    )
+
+
+@command("environnement", "Show config of uvpipx (deprecated use environment)", launcher="uvpipx_show_config")
+def environnement_parser() -> ArgParser:
+    return ArgParser(
+        [
+            verbose_arg,
+            help_arg,
+        ],
+    )
 
-arg_parser["environnement"] = ArgParser(
-    [
-        verbose_arg,
-        help_arg,
-    ],
-    help="Show config of uvpipx (deprecated use environment)",
-)
 
-arg_parser["environment"] = ArgParser(
-    [
-        verbose_arg,
-        help_arg,
-    ],
-    help="Show config of uvpipx",
-)
\ No newline at end of file
+@command("environment", "Show config of uvpipx", launcher="uvpipx_show_config")
+def environment_parser() -> ArgParser:
+    return ArgParser(
+        [
+            verbose_arg,
+            help_arg,
+        ],
+    )
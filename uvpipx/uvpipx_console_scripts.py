@@ -12,6 +12,7 @@ __status__ = "Development"
 
 
 import configparser
+import hashlib
 import json
 import pathlib
 import sys
@@ -24,6 +25,19 @@ from typing import Dict, Union
 class SitePackagesManager:
     site_packages_path: pathlib.Path
 
+    @classmethod
+    def from_site_packages(cls, site_packages_path: Union[str, pathlib.Path]) -> SitePackagesManager:
+        """
+        Creates a new instance of the SitePackagesManager class from an explicit site-packages path.
+
+        Explanation:
+        Unlike from_sys_path, it does not need to run in the python of the venv, so it can be used in the uvpipx process.
+
+        Returns:
+            SitePackagesManager: A new instance of the SitePackagesManager class.
+        """
+        return cls(pathlib.Path(site_packages_path))
+
     @classmethod
     def from_sys_path(cls, venv: str) -> SitePackagesManager:
         """
@@ -84,6 +98,27 @@ class SitePackagesManager:
 
         return scripts
 
+    def entry_points_fingerprint(self) -> str:
+        """
+        Returns a fingerprint of the console scripts of the site-packages, without reading any file.
+
+        Explanation:
+        It is a hash of the names of the .dist-info directories (so of the installed versions)
+        and of the mtime of their entry_points.txt: any install, upgrade or uninstall of a package changes it.
+
+        Returns:
+            str: The fingerprint.
+        """
+        h = hashlib.sha256()
+        for dist_info_dir in sorted(self.site_packages_path.glob("*.dist-info")):
+            try:
+                mtime_ns = (dist_info_dir / "entry_points.txt").stat().st_mtime_ns
+            except OSError:
+                mtime_ns = 0
+            h.update(f"{dist_info_dir.name}:{mtime_ns}\n".encode())
+
+        return h.hexdigest()
+
     def save_console_scripts_json(self, json_file: pathlib.Path) -> None:
         """
         Saves the console scripts dictionary to a JSON file in the site-packages directory.
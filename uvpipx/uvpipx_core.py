@@ -3,14 +3,20 @@ from __future__ import annotations
 import os
 import re
 import shutil
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Tuple, Union
+from typing import Callable, Dict, List, Tuple, Union
 
 import uvpipx.platform
 from uvpipx import config
-from uvpipx.internal_libs.misc import file_md5, find_executable, shell_run
+from uvpipx.internal_libs.Logger import Logger
+from uvpipx.internal_libs.misc import StreamRunner, exec_run, file_md5, find_executable
+from uvpipx.internal_libs.stylist import Color, Painter
+from uvpipx.internal_libs.tracing import span
 from uvpipx.req_spec import Requirement
+from uvpipx.uvpipx_console_scripts import SitePackagesManager
+from uvpipx.uvpipx_metadata import installed_dists, installed_versions, normalize_name, site_packages_dirs
+from uvpipx.uvpipx_uv import run_uv
 
 
 @dataclass
@@ -20,20 +26,23 @@ class UvPipxVenv:
     def exists(self) -> bool:
         return (self.venv_path / ".venv").exists()
 
-    def create_venv_if_need(self) -> bool:
+    def create_venv_if_need(self, python: Union[None, str] = None) -> bool:
         self.venv_path.mkdir(exist_ok=True, parents=True)
 
         if not self.exists():
-            rc, std_o, std_e = shell_run(
-                f"uv venv {self.venv_path / '.venv'}",
-                raise_on_error=True,
-            )
+            opt = ["--python", python] if python else []
+            run_uv(["uv", "venv", *opt, str(self.venv_path / ".venv")], venv=self.venv_path.name, name="uv venv")
             return True
         return False
 
+    @span("freeze")
     def freeze(self) -> str:
-        rc, stdout, stderr = shell_run("uv pip freeze", cwd=self.venv_path)
-        return stdout  # if isinstance(stdout, str) else stdout.decode("utf-8")
+        dists = installed_dists(self.venv_path)
+        if dists is None:  # unknown layout, ask uv
+            rc, stdout, stderr = exec_run(["uv", "pip", "freeze"], cwd=self.venv_path)
+            return stdout  # if isinstance(stdout, str) else stdout.decode("utf-8")
+
+        return "".join(f"{dist.to_freeze_line()}\n" for dist in dists)
 
     def installed_package(self) -> list[str]:
         return self.freeze().rstrip().split("\n")
@@ -44,25 +53,38 @@ class UvPipxVenv:
 
         return req_tuple
 
+    def installed_versions(self) -> Dict[str, str]:
+        versions = installed_versions(self.venv_path)
+        if versions is None:  # unknown layout, ask uv
+            return {
+                normalize_name(req.name): ",".join(req.version_specifiers or []).lstrip("=")
+                for req in self.installed_package_as_req()
+            }
+
+        return versions
+
     def install(
         self,
         packages_name_spec: List[str],
         allow_upgrade: bool = False,
-    ) -> str:
-        opt = " --upgrade" if allow_upgrade else ""
-        install_pkgs = " ".join(packages_name_spec)
-        rc, stdout, stderr = shell_run(
-            f"uv pip install{opt} {install_pkgs}",
-            cwd=self.venv_path,
-        )
-        return stdout  # if isinstance(stdout, str) else stdout.decode("utf-8")
+        on_output: Union[None, Callable[[str, str], None]] = None,
+        wheelhouse: Union[None, Path] = None,
+    ) -> StreamRunner:
+        opt = ["--upgrade"] if allow_upgrade else []
+        if wheelhouse:  # offline install, only from the wheels of the wheelhouse
+            opt += ["--no-index", "--find-links", str(wheelhouse)]
+        return self.run_uv(["uv", "pip", "install", *opt, *packages_name_spec], on_output)
+
+    def uninstall(
+        self,
+        packages_name_spec: List[str],
+        on_output: Union[None, Callable[[str, str], None]] = None,
+    ) -> StreamRunner:
+        return self.run_uv(["uv", "pip", "uninstall", *packages_name_spec], on_output)
 
-    def uninstall(self, package_name_spec: str) -> str:
-        rc, stdout, stderr = shell_run(
-            f"uv pip uninstall {package_name_spec}",
-            cwd=self.venv_path,
-        )
-        return stdout  # if isinstance(stdout, str) else stdout.decode("utf-8")
+    def run_uv(self, argv: List[str], on_output: Union[None, Callable[[str, str], None]] = None) -> StreamRunner:
+        """Runs a uv command in the venv, see uvpipx_uv.run_uv."""
+        return run_uv(argv, cwd=self.venv_path, venv=self.venv_path.name, on_output=on_output)
 
     def venv_bin_dir(self) -> Path:
         return self.venv_path / ".venv" / uvpipx.platform.venv_bin_dir
@@ -83,34 +105,121 @@ class UvPipxVenv:
 
     def run_in_venv(
         self,
-        cmdline: str,
+        cmdline: List[str],
         *,
         cwd: Union[None, Path] = None,
         env: Union[None, Dict[str, str]] = None,
     ) -> Tuple[int, str, str]:
-        rc, stdo, stde = shell_run(cmdline, cwd=cwd, env=env)
+        rc, stdo, stde = exec_run(cmdline, cwd=cwd, env=env, raise_on_error=False)
         if rc != 0:
             msg = f"🔴 Command failed with return code {rc} {stdo} {stde}"
             raise RuntimeError(msg)
 
         return rc, stdo, stde
 
-    def update_metadata(self, if_not_exist: bool = True) -> None:
+    @span("metadata")
+    def update_metadata(self, force: bool = False) -> bool:
+        """
+        Writes pip_metadata.json (the console scripts of each package) when the entry points of the venv changed.
+
+        Explanation:
+        The fingerprint of the entry points (see SitePackagesManager.entry_points_fingerprint) is saved next to
+        pip_metadata.json, the metadata is generated again only when it changes.
+
+        Args:
+            force (bool): Generate the metadata even if the fingerprint did not change.
+
+        Returns:
+            bool: True if pip_metadata.json has been written.
+        """
         pip_metadata = self.venv_path / "pip_metadata.json"
-        if pip_metadata.exists() and if_not_exist:
-            return
+        fingerprint_file = self.venv_path / "pip_metadata.fingerprint"
+
+        site_packages = site_packages_dirs(self.venv_path)
+        if site_packages:
+            manager = SitePackagesManager.from_site_packages(site_packages[0])
+            fingerprint = manager.entry_points_fingerprint()
+            if (
+                not force
+                and pip_metadata.exists()
+                and fingerprint_file.exists()
+                and fingerprint_file.read_text() == fingerprint
+            ):
+                return False
+            manager.save_console_scripts_json(pip_metadata)
+            fingerprint_file.write_text(fingerprint)
+            return True
+
+        if pip_metadata.exists() and not force:
+            return False
 
+        # unknown layout, ask the python of the venv where is its site-packages
         uvpipx_console_scripts = config.uvpipx_self_dir / "uvpipx/uvpipx_console_scripts.py"
-        python_venv_bin = self.venv_bin_dir() / "python"
+        python_venv_bin = self.venv_bin_dir() / ("python" + uvpipx.platform.bin_ext)
         self.run_in_venv(
-            f"{python_venv_bin} {uvpipx_console_scripts} {self.venv_path} {pip_metadata}",
+            [str(python_venv_bin), str(uvpipx_console_scripts), str(self.venv_path), str(pip_metadata)],
         )
+        return True
+
+
+def log_uv_output(logger: Logger) -> Callable[[str, str], None]:
+    """
+    Returns an on_output callback showing the uv output lines in real time with the logger.
+
+    Args:
+        logger (Logger): The logger to use.
+
+    Returns:
+        Callable[[str, str], None]: The callback, for UvPipxVenv.install/uninstall.
+    """
+
+    def on_output(stream_name: str, line: str) -> None:  # noqa: ARG001
+        logger.log_info(Painter.color_str(f"    {line}", Color.ST_DIM))
+
+    return on_output
+
+
+def expose_copy_mode() -> bool:
+    if config.uvpipx_expose_mode not in ("symlink", "copy"):
+        msg = f"🔴 UVPIPX_EXPOSE_MODE must be symlink or copy, got {config.uvpipx_expose_mode}"
+        raise RuntimeError(msg)
+
+    return uvpipx.platform.sys_platform == "win" or config.uvpipx_expose_mode == "copy"
+
+
+@dataclass
+class CopyStamp:
+    """
+    The content hash, size and mtime of an exposed app copied in the bin dir (copy mode).
+
+    Explanation:
+    The copy keeps the mtime of the app of the venv (shutil.copy2), so while the size and mtime of both files
+    are the ones of the stamp, the copy is valid without reading them.
+    """
+
+    md5: str
+    size: int
+    mtime_ns: int
+
+    @classmethod
+    def of_file(cls, path: Path, md5: Union[None, str] = None) -> CopyStamp:
+        st = path.stat()
+        return cls(md5 or file_md5(path), st.st_size, st.st_mtime_ns)
+
+    def matches(self, path: Path) -> bool:
+        try:
+            st = path.stat()
+        except OSError:
+            return False
+        return (st.st_size, st.st_mtime_ns) == (self.size, self.mtime_ns)
 
 
 @dataclass
 class PathLink:
     local_path: Path
     link_path: Union[Path, None] = None
+    stamp: Union[None, CopyStamp] = None
+    copy: bool = field(default_factory=expose_copy_mode)
 
     def exists(self) -> bool:
         return self.local_path.exists()
@@ -127,23 +236,41 @@ class PathLink:
             msg = "link_path is None"
             raise ValueError(msg)
 
-        if uvpipx.platform.sys_platform == "win":
-            return self.link_path.exists() and file_md5(self.link_path) == file_md5(
-                self.local_path,
-            )
+        if not self.link_path.exists():
+            return False
 
-        if self.link_path.exists():
-            return self.link_path.is_symlink() and (self.local_path == self.link_path.resolve())
+        if self.link_path.is_symlink():
+            # the .venv of the uvpipx venv can itself be a link (to a store entry), so both sides are resolved
+            return self.local_path.resolve() == self.link_path.resolve()
 
-        return False
+        return self.is_valid_copy()
+
+    def is_valid_copy(self) -> bool:
+        if self.link_path is None:
+            msg = "link_path is None"
+            raise ValueError(msg)
+
+        if self.stamp is not None and self.stamp.matches(self.link_path) and self.stamp.matches(self.local_path):
+            return True
+
+        # no stamp or one of the files changed: compare the contents, the stamp is dropped (see link)
+        self.stamp = None
+        try:
+            return file_md5(self.link_path) == file_md5(self.local_path)
+        except FileNotFoundError:
+            return False
 
     def link(self) -> None:
         if self.link_path is None:
             msg = "link_path is None"
             raise ValueError(msg)
 
-        if uvpipx.platform.sys_platform == "win":
-            shutil.copy2(self.local_path, self.link_path)
+        if self.copy:
+            # copied aside then renamed, so a copy (even one in use) is replaced atomically
+            tmp_path = self.link_path.with_name(f".{self.link_path.name}.uvpipx-{os.getpid()}")
+            shutil.copy2(self.local_path, tmp_path)
+            self.stamp = CopyStamp.of_file(tmp_path)
+            tmp_path.replace(self.link_path)
         else:
             os.symlink(self.local_path, self.link_path)
 
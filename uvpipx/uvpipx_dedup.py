@@ -0,0 +1,335 @@
+from __future__ import annotations
+
+__author__ = "Gaëtan Montury"
+__copyright__ = "Copyright (c) 2024-2025 Gaëtan Montury"
+__license__ = """GNU GENERAL PUBLIC LICENSE refer to file LICENSE in repo"""
+__version__ = "0.8.1"  # to bump
+__maintainer__ = "Gaëtan Montury"
+__email__ = "#"
+__status__ = "Development"
+
+
+import hashlib
+import os
+import sqlite3
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Set, Tuple, Union
+
+from uvpipx.internal_libs.Logger import get_logger
+from uvpipx.internal_libs.misc import HASH_BUFFER_SIZE, Elapser
+from uvpipx.uvpipx_state import StateIndex, venv_fingerprint
+
+# the dedup_file rows committed at once, see Deduplicator._save
+SAVE_BATCH_SIZE = 10_000
+
+
+@dataclass
+class IndexedFile:
+    root: str
+    rel_path: str
+    size: int
+    mtime_ns: int
+    ino: int
+    dev: int
+    mode: int
+    nlink: int
+    digest: Union[None, str] = None
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.root, self.rel_path)  # noqa: PTH118
+
+    def same_stat(self, other: IndexedFile) -> bool:
+        return (self.size, self.mtime_ns, self.ino, self.dev) == (other.size, other.mtime_ns, other.ino, other.dev)
+
+
+@dataclass
+class DedupReport:
+    nb_venvs: int = 0
+    nb_scanned_venvs: int = 0
+    nb_files: int = 0
+    nb_hashed: int = 0
+    nb_linked: int = 0
+    reclaimed_bytes: int = 0
+    errors: List[str] = field(default_factory=list)
+
+
+def human_size(nb_bytes: float) -> str:
+    for unit in ["B", "KiB", "MiB", "GiB"]:
+        if nb_bytes < 1024 or unit == "GiB":  # noqa: PLR2004
+            return f"{nb_bytes:.1f} {unit}" if unit != "B" else f"{int(nb_bytes)} B"
+        nb_bytes /= 1024
+
+    return f"{nb_bytes:.1f} GiB"
+
+
+def file_digest(path: str) -> str:
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:  # noqa: PTH123
+        while chunk := f.read(HASH_BUFFER_SIZE):
+            h.update(chunk)
+
+    return h.hexdigest()
+
+
+def _scan_files(root: str) -> Iterator[Tuple[str, os.stat_result]]:
+    dirs = [root]
+    while dirs:
+        with os.scandir(dirs.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    dirs.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield os.path.relpath(entry.path, root), entry.stat(follow_symlinks=False)
+
+
+def scan_root(root: str, cached: Dict[str, IndexedFile], rehash: bool) -> List[IndexedFile]:
+    """
+    Lists the regular files of a site-packages directory (symlinks are ignored), keeping the cached digests.
+
+    Args:
+        root (str): The site-packages directory.
+        cached (Dict[str, IndexedFile]): The files of the previous pass, by relative path.
+        rehash (bool): Forget the cached digests.
+
+    Returns:
+        List[IndexedFile]: The files.
+    """
+    files = []
+    for rel_path, st in _scan_files(root):
+        if st.st_size == 0:
+            continue
+        indexed = IndexedFile(
+            root,
+            rel_path,
+            st.st_size,
+            st.st_mtime_ns,
+            st.st_ino,
+            st.st_dev,
+            st.st_mode,
+            st.st_nlink,
+        )
+        previous = cached.get(rel_path)
+        if not rehash and previous is not None and previous.same_stat(indexed):
+            indexed.digest = previous.digest
+        files.append(indexed)
+
+    return files
+
+
+def _link_replace(source: str, target: str) -> None:
+    tmp_target = f"{target}.uvpipx-dedup-{os.getpid()}"
+    os.link(source, tmp_target)
+    try:
+        os.replace(tmp_target, target)  # noqa: PTH105
+    except OSError:
+        os.unlink(tmp_target)  # noqa: PTH108
+        raise
+
+
+@dataclass
+class Deduplicator:
+    """
+    Hardlinks the identical regular files of the site-packages of all the uvpipx venvs.
+
+    Explanation:
+    Files are grouped by filesystem, size and mode, only the files of a group with many inodes are hashed.
+    The files (stat and digest) and the fingerprint of each venv are kept in the state index,
+    so an incremental pass only scans again the venvs whose fingerprint changed since the last pass.
+    """
+
+    dry_run: bool = False
+    incremental: bool = False
+    state_index: Union[None, StateIndex] = None
+
+    def __post_init__(self) -> None:
+        self.logger = get_logger("dedup")
+        self.state_index_ = self.state_index or StateIndex()
+        self.report = DedupReport()
+        self.site_packages_: Dict[str, str] = {}
+
+    def _venv_roots(self) -> Dict[str, Tuple[str, str]]:
+        roots = {}
+        for state in self.state_index_.refresh():
+            if state.model is None or state.site_packages is None:
+                continue
+            # resolved, so the venvs sharing a store entry share one root
+            roots[str(state.venv_path)] = (os.path.realpath(state.site_packages), state.fingerprint)
+            self.site_packages_[str(state.venv_path)] = state.site_packages
+
+        return roots
+
+    def _load(self, con: sqlite3.Connection) -> Tuple[Dict[str, Tuple[str, str]], Dict[str, Dict[str, IndexedFile]]]:
+        venvs = {
+            venv_path: (root, fingerprint) for venv_path, root, fingerprint in con.execute("SELECT * FROM dedup_venv")
+        }
+        files: Dict[str, Dict[str, IndexedFile]] = defaultdict(dict)
+        for row in con.execute(
+            "SELECT root, rel_path, size, mtime_ns, ino, dev, mode, nlink, digest FROM dedup_file",
+        ):
+            files[row[0]][row[1]] = IndexedFile(*row)
+
+        return venvs, files
+
+    def _save(
+        self,
+        con: sqlite3.Connection,
+        venv_roots: Dict[str, Tuple[str, str]],
+        files_by_root: Dict[str, List[IndexedFile]],
+    ) -> None:
+        """
+        Replaces the dedup_* rows, committed by batch so other uvpipx processes are not locked out of the index.
+
+        Explanation:
+        The venvs are written last: after an interrupted save, a venv without its row is scanned again
+        by the next incremental pass, which still reuses the digests of the files already saved.
+        """
+        con.execute("DELETE FROM dedup_venv")
+        con.execute("DELETE FROM dedup_file")
+        con.commit()
+        rows = [
+            (f.root, f.rel_path, f.size, f.mtime_ns, f.ino, f.dev, f.mode, f.nlink, f.digest)
+            for files in files_by_root.values()
+            for f in files
+        ]
+        for start in range(0, len(rows), SAVE_BATCH_SIZE):
+            con.executemany(
+                "INSERT INTO dedup_file VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows[start : start + SAVE_BATCH_SIZE],
+            )
+            con.commit()
+        con.executemany("INSERT INTO dedup_venv VALUES (?, ?, ?)", [(k, *v) for k, v in venv_roots.items()])
+
+    def index(
+        self,
+        venv_roots: Dict[str, Tuple[str, str]],
+        previous_venvs: Dict[str, Tuple[str, str]],
+        previous_files: Dict[str, Dict[str, IndexedFile]],
+    ) -> Dict[str, List[IndexedFile]]:
+        changed_roots: Set[str] = set()
+        for venv_path, (root, fingerprint) in venv_roots.items():
+            if not self.incremental or previous_venvs.get(venv_path) != (root, fingerprint):
+                changed_roots.add(root)
+
+        files_by_root = {}
+        for root in {root for root, _ in venv_roots.values()}:
+            if root in changed_roots or root not in previous_files:
+                files_by_root[root] = scan_root(root, previous_files.get(root, {}), rehash=not self.incremental)
+                self.report.nb_scanned_venvs += sum(1 for r, _ in venv_roots.values() if r == root)
+            else:
+                files_by_root[root] = list(previous_files[root].values())
+
+        return files_by_root
+
+    def hash_candidates(self, files: List[IndexedFile]) -> None:
+        by_stat: Dict[Tuple[int, int, int], List[IndexedFile]] = defaultdict(list)
+        for f in files:
+            by_stat[(f.dev, f.size, f.mode)].append(f)
+
+        for group in by_stat.values():
+            if len({f.ino for f in group}) < 2:  # noqa: PLR2004
+                continue
+            for f in group:
+                if f.digest is None:
+                    try:
+                        f.digest = file_digest(f.path)
+                        self.report.nb_hashed += 1
+                    except OSError as e:
+                        self.report.errors.append(f"{f.path}: {e}")
+
+    def link_duplicates(self, files: List[IndexedFile]) -> None:
+        groups: Dict[Tuple[int, int, int, str], List[IndexedFile]] = defaultdict(list)
+        for f in files:
+            if f.digest is not None:
+                groups[(f.dev, f.size, f.mode, f.digest)].append(f)
+
+        for group in groups.values():
+            inodes: Dict[int, List[IndexedFile]] = defaultdict(list)
+            for f in group:
+                inodes[f.ino].append(f)
+            if len(inodes) < 2:  # noqa: PLR2004
+                continue
+
+            # the inode with the most links stays, the others are replaced by links to it
+            canonical_ino = max(inodes, key=lambda ino: (len(inodes[ino]), inodes[ino][0].nlink))
+            canonical = inodes[canonical_ino][0]
+            nb_linked = 0
+            for ino, ino_files in inodes.items():
+                if ino == canonical_ino:
+                    continue
+                nlink = ino_files[0].nlink
+                for f in ino_files:
+                    if not self.dry_run:
+                        try:
+                            _link_replace(canonical.path, f.path)
+                        except OSError as e:
+                            self.report.errors.append(f"{f.path}: {e}")
+                            continue
+                        f.ino, f.mtime_ns = canonical.ino, canonical.mtime_ns
+                    nb_linked += 1
+                    nlink -= 1
+                # the space is only reclaimed when no other link to the inode is left (uv cache, other files)
+                if nlink <= 0:
+                    self.report.reclaimed_bytes += canonical.size
+
+            self.report.nb_linked += nb_linked
+            if not self.dry_run:
+                for f in inodes[canonical_ino]:
+                    f.nlink += nb_linked
+
+    def run(self) -> DedupReport:
+        venv_roots = self._venv_roots()
+        self.report.nb_venvs = len(venv_roots)
+
+        # the index is only read then written, the scan, hashing and linking are done out of any transaction
+        with self.state_index_.connect() as con:
+            previous_venvs, previous_files = self._load(con)
+
+        files_by_root = self.index(venv_roots, previous_venvs, previous_files)
+        all_files = [f for files in files_by_root.values() for f in files]
+        self.report.nb_files = len(all_files)
+
+        self.hash_candidates(all_files)
+        self.link_duplicates(all_files)
+
+        if self.report.nb_linked and not self.dry_run:
+            # a file replaced at the top of site-packages changes the fingerprint of the venv
+            venv_roots = {
+                venv_path: (root, venv_fingerprint(Path(venv_path), self.site_packages_[venv_path]))
+                for venv_path, (root, _) in venv_roots.items()
+            }
+        with self.state_index_.connect() as con:
+            self._save(con, venv_roots, files_by_root)
+
+        return self.report
+
+
+def dedup(*, dry_run: bool = False, incremental: bool = False) -> DedupReport:
+    """
+    Hardlinks the identical files of the site-packages of all the uvpipx venvs and reports the space reclaimed.
+
+    Args:
+        dry_run (bool): Only report what would be linked and reclaimed.
+        incremental (bool): Only scan again the venvs whose fingerprint changed since the last pass.
+
+    Returns:
+        DedupReport: The report of the pass.
+    """
+    logger = get_logger("dedup")
+
+    with Elapser() as ela:
+        report = Deduplicator(dry_run=dry_run, incremental=incremental).run()
+
+    verb = "would be" if dry_run else "were"
+    logger.log_info(
+        f" 🔎 {report.nb_files} files indexed in {report.nb_venvs} venvs"
+        f" ({report.nb_scanned_venvs} venvs scanned, {report.nb_hashed} files hashed)",
+    )
+    logger.log_info(f" 🔗 {report.nb_linked} duplicate files {verb} hardlinked")
+    logger.log_info(ela.ela_str(f" 💾 {human_size(report.reclaimed_bytes)} {verb} reclaimed"))
+    for error in report.errors:
+        logger.log_warn(f" ⚠️  {error}")
+
+    return report
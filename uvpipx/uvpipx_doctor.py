@@ -0,0 +1,309 @@
+from __future__ import annotations
+
+__author__ = "Gaëtan Montury"
+__copyright__ = "Copyright (c) 2024-2025 Gaëtan Montury"
+__license__ = """GNU GENERAL PUBLIC LICENSE refer to file LICENSE in repo"""
+__version__ = "0.8.1"  # to bump
+__maintainer__ = "Gaëtan Montury"
+__email__ = "#"
+__status__ = "Development"
+
+
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+
+from uvpipx import config
+from uvpipx.internal_libs.Logger import get_logger
+from uvpipx.internal_libs.misc import Elapser
+from uvpipx.uvpipx_state import StateIndex, VenvState, save_venv_model
+from uvpipx.uvpipx_trash import move_to_trash, spawn_reaper
+from uvpipx.uvpipx_venv_factory import expose_app_model, path_link_from_model
+
+# The kinds of issue, with the emoji shown and the fix applied by --fix
+DANGLING_LINK = "dangling link"  # a link into a valid venv to a program that does not exist anymore: removed
+DELETED_VENV_LINK = "link into a deleted venv"  # removed
+ORPHAN_VENV_LINK = "link into an orphan venv"  # removed (the orphan venv is also removed)
+UNTRACKED_LINK = "link not in the model of its venv"  # an app exposed before, or an injected app: removed
+ORPHAN_VENV = "orphan venv"  # a directory of the venvs without uvpipx.json: moved to the trash
+NEW_VENV = "venv without uvpipx.json modified recently"  # maybe an install in progress: only reported
+BROKEN_VENV = "venv with an invalid uvpipx.json"  # only reported
+MISSING_LINK = "exposed program missing"  # in the model but not in the bin dir: exposed again (or forgotten)
+CONFLICT = "exposed program replaced"  # in the model but the bin dir has another file: only reported
+
+ISSUE_EMOJIS = {
+    DANGLING_LINK: "💔",
+    DELETED_VENV_LINK: "👻",
+    ORPHAN_VENV_LINK: "👻",
+    UNTRACKED_LINK: "❔",
+    ORPHAN_VENV: "🏚️ ",
+    NEW_VENV: "🚧",
+    BROKEN_VENV: "🔴",
+    MISSING_LINK: "🕳️ ",
+    CONFLICT: "⚠️ ",
+}
+
+# a venv directory without uvpipx.json is an orphan only when not modified since this delay (seconds):
+# uvpipx.json is written at the end of an install, which creates the venv directory first
+ORPHAN_VENV_MIN_AGE = 3600.0
+
+
+@dataclass
+class Issue:
+    kind: str
+    path: Path
+    venv_name: Union[None, str] = None
+    detail: str = ""
+    fixed: bool = False
+
+    def show(self) -> str:
+        venv = f" ({self.venv_name})" if self.venv_name else ""
+        detail = f" -> {self.detail}" if self.detail else ""
+        fixed = " ✅ fixed" if self.fixed else ""
+        return f" {ISSUE_EMOJIS[self.kind]} {self.kind}{venv}: {self.path}{detail}{fixed}"
+
+
+@dataclass
+class BinEntry:
+    path: str
+    target: Union[None, str]  # None when not a symlink (a copy, or not a uvpipx program)
+
+
+@dataclass
+class DoctorReport:
+    nb_bin_entries: int = 0
+    nb_venvs: int = 0
+    issues: List[Issue] = field(default_factory=list)
+
+
+def scan_bin_dir(bin_dir: Path) -> Dict[str, BinEntry]:
+    """
+    Lists the entries of the bin directory with their link target, in one pass of scandir.
+
+    Explanation:
+    The target of a symlink is read with readlink and only normalized (joined to the bin directory if relative),
+    nothing is resolved, so even a bin directory like /usr/local/bin with thousands of entries is scanned at once.
+
+    Args:
+        bin_dir (Path): The bin directory.
+
+    Returns:
+        Dict[str, BinEntry]: The entries by path.
+    """
+    entries: Dict[str, BinEntry] = {}
+    if not bin_dir.is_dir():
+        return entries
+
+    with os.scandir(bin_dir) as it:
+        for entry in it:
+            target = None
+            if entry.is_symlink():
+                try:
+                    target = os.path.normpath(os.path.join(bin_dir, os.readlink(entry.path)))  # noqa: PTH115, PTH118
+                except OSError:
+                    continue
+            entries[entry.path] = BinEntry(entry.path, target)
+
+    return entries
+
+
+def modified_since(venv_path: Path) -> float:
+    """Returns the seconds since the last change of the venv directory or of its .venv, the newest of both."""
+    mtimes = []
+    for path in [venv_path, venv_path / ".venv"]:
+        try:
+            mtimes.append(path.stat().st_mtime)
+        except OSError:
+            continue
+
+    return time.time() - max(mtimes) if mtimes else 0.0
+
+
+def venv_name_of_target(target: str, venvs_prefixes: Tuple[str, ...]) -> Union[None, str]:
+    """Returns the name of the uvpipx venv a link target is into, None if the target is not in the venvs directory."""
+    for prefix in venvs_prefixes:
+        if target.startswith(prefix):
+            return target[len(prefix) :].split(os.sep, 1)[0]
+
+    return None
+
+
+@dataclass
+class Doctor:
+    """
+    Checks the uvpipx bin directory against the uvpipx venvs, and fixes what is broken in bulk.
+
+    Explanation:
+    The bin directory is scanned once, and a reverse index (link target -> owning venv) is built from the link
+    targets only. It is checked against the models of the venvs (from the state index): the links into deleted
+    or orphan venvs, the dangling links, the links not in the model of their venv, the orphan venvs and the
+    exposed programs of the models that are missing. A venv directory without uvpipx.json modified recently
+    (see ORPHAN_VENV_MIN_AGE) may be an install in progress: it is only reported, never moved to the trash.
+    """
+
+    fix: bool = False
+    bin_dir: Union[None, Path] = None
+    state_index: Union[None, StateIndex] = None
+    orphan_min_age: float = ORPHAN_VENV_MIN_AGE
+
+    def __post_init__(self) -> None:
+        self.logger = get_logger("doctor")
+        self.bin_dir_ = self.bin_dir or config.uvpipx_local_bin
+        self.state_index_ = self.state_index or StateIndex()
+        self.report = DoctorReport()
+        self.trash_dirs: List[Path] = []
+
+    def _venvs_prefixes(self) -> Tuple[str, ...]:
+        venvs_dir = str(self.state_index_.venvs_dir_)
+        real_venvs_dir = os.path.realpath(venvs_dir)
+        return tuple(dict.fromkeys([os.path.join(venvs_dir, ""), os.path.join(real_venvs_dir, "")]))  # noqa: PTH118
+
+    def check_links(
+        self,
+        bin_entries: Dict[str, BinEntry],
+        states: Dict[str, VenvState],
+        tracked: Dict[str, str],
+    ) -> None:
+        venvs_prefixes = self._venvs_prefixes()
+        for entry in bin_entries.values():
+            if entry.target is None:
+                continue
+            venv_name = venv_name_of_target(entry.target, venvs_prefixes)
+            if venv_name is None:  # not a uvpipx program
+                continue
+
+            state = states.get(venv_name)
+            if state is None:
+                self.report.issues.append(Issue(DELETED_VENV_LINK, Path(entry.path), venv_name, entry.target))
+            elif state.model is None:
+                self.report.issues.append(Issue(ORPHAN_VENV_LINK, Path(entry.path), venv_name, entry.target))
+            elif not os.path.exists(entry.target):  # noqa: PTH110
+                self.report.issues.append(Issue(DANGLING_LINK, Path(entry.path), venv_name, entry.target))
+            elif tracked.get(entry.path) != venv_name:
+                self.report.issues.append(Issue(UNTRACKED_LINK, Path(entry.path), venv_name, entry.target))
+
+    def check_models(self, bin_entries: Dict[str, BinEntry], states: Dict[str, VenvState]) -> None:
+        venvs_prefixes = self._venvs_prefixes()
+        for state in states.values():
+            if state.model is None:
+                if (state.venv_path / "uvpipx.json").exists():
+                    kind = BROKEN_VENV
+                elif modified_since(state.venv_path) < self.orphan_min_age:
+                    kind = NEW_VENV
+                else:
+                    kind = ORPHAN_VENV
+                self.report.issues.append(Issue(kind, state.venv_path, state.name))
+                continue
+
+            exposed = state.model.exposed
+            for app in exposed.apps.values() if exposed else []:
+                exposed_path = app.exposed_app_path
+                entry = bin_entries.get(exposed_path)
+                if entry is None and not os.path.lexists(exposed_path):
+                    self.report.issues.append(Issue(MISSING_LINK, Path(exposed_path), state.name, app.bin_app_name))
+                elif entry is not None and entry.target is not None:
+                    # a link of the bin dir: it must be into its venv, the rest is checked by check_links
+                    if venv_name_of_target(entry.target, venvs_prefixes) != state.name:
+                        self.report.issues.append(Issue(CONFLICT, Path(exposed_path), state.name, entry.target))
+                elif not path_link_from_model(exposed, app).is_valid():
+                    # a copy (copy mode) or a path outside of the bin dir
+                    self.report.issues.append(Issue(CONFLICT, Path(exposed_path), state.name))
+
+    def check(self) -> DoctorReport:
+        states = {state.name: state for state in self.state_index_.refresh()}
+        bin_entries = scan_bin_dir(self.bin_dir_)
+        tracked = {
+            app.exposed_app_path: state.name
+            for state in states.values()
+            if state.model and state.model.exposed
+            for app in state.model.exposed.apps.values()
+        }
+        self.report.nb_bin_entries = len(bin_entries)
+        self.report.nb_venvs = len(states)
+
+        self.check_links(bin_entries, states, tracked)
+        self.check_models(bin_entries, states)
+
+        return self.report
+
+    def _fix_missing_link(self, issue: Issue, states: Dict[str, VenvState]) -> None:
+        state = states[issue.venv_name or ""]
+        model = state.model
+        if model is None or model.exposed is None:
+            return
+
+        apps = model.exposed.apps
+        app_key = next(k for k, app in apps.items() if app.exposed_app_path == str(issue.path))
+        path_link = path_link_from_model(model.exposed, apps[app_key])
+        if path_link.exists():
+            issue.path.parent.mkdir(parents=True, exist_ok=True)
+            path_link.link()
+            apps[app_key] = expose_app_model(apps[app_key].bin_app_name, path_link, apps[app_key].packages_name_sets)
+        else:  # the program is not in the venv anymore
+            del apps[app_key]
+        save_venv_model(model, self.state_index_)
+
+    def fix_issues(self) -> None:
+        states = {state.name: state for state in self.state_index_.refresh()}
+        for issue in self.report.issues:
+            try:
+                if issue.kind in (DANGLING_LINK, DELETED_VENV_LINK, ORPHAN_VENV_LINK, UNTRACKED_LINK):
+                    issue.path.unlink()
+                elif issue.kind == ORPHAN_VENV:
+                    if (issue.path / "uvpipx.json").exists() or modified_since(issue.path) < self.orphan_min_age:
+                        continue  # an install started since the check
+                    self.trash_dirs.append(move_to_trash(issue.path))
+                elif issue.kind == MISSING_LINK:
+                    self._fix_missing_link(issue, states)
+                else:
+                    continue
+            except OSError as e:
+                self.logger.log_warn(f" ⚠️  Unable to fix {issue.path}: {e}")
+                continue
+            issue.fixed = True
+
+        if self.trash_dirs:
+            spawn_reaper(self.trash_dirs)
+
+    def run(self) -> DoctorReport:
+        self.check()
+        if self.fix:
+            self.fix_issues()
+
+        return self.report
+
+
+def doctor(*, fix: bool = False) -> DoctorReport:
+    """
+    Reports (and fixes with fix) the broken links of the bin directory and the broken uvpipx venvs.
+
+    Args:
+        fix (bool): Fix the issues: remove the stale links and orphan venvs, expose again the missing programs.
+
+    Returns:
+        DoctorReport: The report, each issue tells if it has been fixed.
+    """
+    logger = get_logger("doctor")
+    logger.log_info(f"🩺 Checking {config.uvpipx_local_bin} and {config.uvpipx_venvs}\n")
+
+    with Elapser() as ela:
+        report = Doctor(fix=fix).run()
+
+    for issue in report.issues:
+        logger.log_info(issue.show())
+    if report.issues:
+        logger.log_info("")
+
+    nb_fixed = sum(issue.fixed for issue in report.issues)
+    logger.log_info(
+        ela.ela_str(
+            f" 🔎 {report.nb_bin_entries} entries of the bin dir and {report.nb_venvs} venvs checked,"
+            f" {len(report.issues)} issue(s), {nb_fixed} fixed",
+        ),
+    )
+    if report.issues and not fix:
+        logger.log_info(" 💡 run uvpipx doctor --fix to fix them")
+
+    return report
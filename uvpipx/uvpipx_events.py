@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+__author__ = "Gaëtan Montury"
+__copyright__ = "Copyright (c) 2024-2025 Gaëtan Montury"
+__license__ = """GNU GENERAL PUBLIC LICENSE refer to file LICENSE in repo"""
+__version__ = "0.8.1"  # to bump
+__maintainer__ = "Gaëtan Montury"
+__email__ = "#"
+__status__ = "Development"
+
+
+# The types of the structured events written on stdout with --format json|ndjson (see Logger.log_event)
+COMMAND_FINISHED = "command.finished"  # command, status, duration_s
+VENV_LISTED = "venv.listed"  # venv, valid, main_package, version, injected_packages, exposed_apps (or error)
+APP_EXPOSED = "app.exposed"  # venv, app, path
+APP_UNEXPOSED = "app.unexposed"  # venv, app, path
+PACKAGE_CHECKED = "package.checked"  # venv, package, installed, latest, outdated (or error)
+UV_FINISHED = "uv.finished"  # command, venv, returncode, duration_s, usage (user_s, sys_s, max_rss_kib, blocks)
+
+# The operations, each one emits <operation>.started and <operation>.finished (with status, duration_s and error),
+# see Logger.operation_events
+INSTALL = "install"  # venv, package (finished: versions)
+UNINSTALL = "uninstall"  # venv
+UPGRADE = "upgrade"  # venv (finished: diff)
+INJECT = "inject"  # venv, packages
+UNINJECT = "uninject"  # venv, packages
@@ -1,19 +1,28 @@
 from __future__ import annotations
 
 import json
+import os
 import re
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Tuple, Union
+from typing import Dict, List, Set, Tuple, Union
 
 import uvpipx
 import uvpipx.platform
 from uvpipx import config
+from uvpipx import uvpipx_events as events
 from uvpipx.internal_libs.Logger import Logger, get_logger
+from uvpipx.internal_libs.tracing import span
 from uvpipx.uvpipx_core import UvPipxVenv
-from uvpipx.uvpipx_venv_factory import path_link_factory
-from uvpipx.uvpipx_venv_load import uvpipx_load_venv
-from uvpipx.UvPipxModels import UvPipxExposedModel, UvPipxVenvExposeAppModel
+from uvpipx.uvpipx_state import StateIndex, save_venv_model
+from uvpipx.uvpipx_venv_factory import (
+    copy_stamp_from_model,
+    expose_app_model,
+    path_link_factory,
+    path_link_from_model,
+)
+from uvpipx.uvpipx_venv_load import uvpipx_load_venv, uvpipx_venv_names
+from uvpipx.UvPipxModels import UvPipxExposedModel, UvPipxExposeInstallSets, UvPipxModel, UvPipxVenvExposeAppModel
 
 
 @dataclass
@@ -129,25 +138,28 @@ class ExposeApps:
                 config.uvpipx_local_bin,
                 rename_local_bin=renamed_apps.get(app_bin.name),
             )
+            prev_app = self.prev_exposed.apps.get(app_bin.name) if self.prev_exposed else None
+            if prev_app and prev_app.exposed_app_path == str(pl.link_path):
+                pl.stamp = copy_stamp_from_model(prev_app)
             if not pl.link_exists():
                 self.logger_.log_info(
                     f" 🎯 Exposing program {pl.show_name_with_link()}",
                 )
                 pl.link()
-                exposed_apps[app_bin.name] = UvPipxVenvExposeAppModel(
-                    app_bin.name,
-                    str(pl.link_path),
-                    pkgs_sets,
+                exposed_apps[app_bin.name] = expose_app_model(app_bin.name, pl, pkgs_sets)
+                self.logger_.log_event(
+                    events.APP_EXPOSED,
+                    venv=self.venv.venv_path.name,
+                    app=app_bin.name,
+                    path=str(pl.link_path),
                 )
             elif pl.is_valid():
                 self.logger_.log_info(
                     f" 🔵 Already exposed to current uvpipx venv program {pl.show_name_with_link()}",
                 )
-                exposed_apps[app_bin.name] = UvPipxVenvExposeAppModel(
-                    app_bin.name,
-                    str(pl.link_path),
-                    pkgs_sets,
-                )
+                if pl.copy and not pl.link_path.is_symlink() and pl.stamp is None:
+                    pl.link()  # copied again, to validate it with a stat next time
+                exposed_apps[app_bin.name] = expose_app_model(app_bin.name, pl, pkgs_sets)
             else:
                 if pl.link_path:
                     self.logger_.log_warn(
@@ -159,16 +171,125 @@ class ExposeApps:
 
         return exposed_apps
 
+    def refresh_copies(
+        self,
+        apps: Dict[str, UvPipxVenvExposeAppModel],
+    ) -> Dict[str, UvPipxVenvExposeAppModel]:
+        """
+        Copies again the exposed apps whose copy is no longer the app of the venv (copy mode), e.g. after an upgrade.
+
+        Explanation:
+        A symlink follows the app of the venv by itself, a copy does not. The copies are checked with their stamp
+        (stat only), the contents are compared only when the app or its copy changed.
+
+        Args:
+            apps (Dict[str, UvPipxVenvExposeAppModel]): The apps exposed and kept.
+
+        Returns:
+            Dict[str, UvPipxVenvExposeAppModel]: The apps, with the stamp of the copies made again.
+        """
+        if self.prev_exposed is None:
+            return apps
+
+        refreshed_apps = dict(apps)
+        for app_name, app in apps.items():
+            pl = path_link_from_model(self.prev_exposed, app)
+            if pl.link_path is None or pl.link_path.is_symlink() or not pl.link_exists() or not pl.exists():
+                continue
+            if pl.is_valid_copy() and pl.stamp is not None:
+                continue
+
+            # stale copy, or same contents without a stamp: copied again, to validate it with a stat next time
+            self.logger_.log_info(f" 🔄 Copying again program {pl.show_name_with_link()}")
+            pl.link()
+            refreshed_apps[app_name] = expose_app_model(app.bin_app_name, pl, app.packages_name_sets)
+
+        return refreshed_apps
+
+    def planned_apps(self, expose_app_rules: List[str], main_package_name: str) -> Tuple[List[Path], Dict[str, str]]:
+        """
+        Returns the apps a rule will expose, as far as they are known before the packages are installed.
+
+        Explanation:
+        The apps named by the rules are known, the apps of the main package (its console scripts) are not:
+        the eponym app is expected. The apps of "__all__" are only known after the install.
+
+        Args:
+            expose_app_rules (List[str]): The expose rules (app names, app:renamed, __main__, __eponym__...).
+            main_package_name (str): The main package of the venv.
+
+        Returns:
+            Tuple[List[Path], Dict[str, str]]: The apps in the venv (existing or not yet) and the apps renamed.
+        """
+        if expose_app_rules in (["__main__"], ["__eponym__"]):
+            return [self.venv.venv_bin(main_package_name, fail_if_notexist=False)], {}
+        if not expose_app_rules or "__all__" in expose_app_rules:
+            return [], {}
+
+        renamed_apps = {key: value for item in expose_app_rules if ":" in item for key, value in [item.split(":", 1)]}
+        apps = [self.venv.venv_bin(item.split(":", 1)[0], fail_if_notexist=False) for item in expose_app_rules]
+        return apps, renamed_apps
+
+    def find_conflicts(self, exposing_apps: List[Path], renamed_apps: Dict[str, str]) -> Dict[str, str]:
+        """
+        Finds all the apps that cannot be exposed, before any link is made.
+
+        Explanation:
+        The owners of the exposed paths are found in the exposed apps of the state index (one query, only the
+        matched venvs are checked), the bin dir is only checked for the paths of the apps.
+
+        Args:
+            exposing_apps (List[Path]): The apps of the venv to expose.
+            renamed_apps (Dict[str, str]): The apps exposed with another name.
+
+        Returns:
+            Dict[str, str]: The reason of each conflict, by app name.
+        """
+        path_links = {
+            app_bin.name: path_link_factory(
+                app_bin,
+                config.uvpipx_local_bin,
+                rename_local_bin=renamed_apps.get(app_bin.name),
+            )
+            for app_bin in exposing_apps
+        }
+        owners = {
+            owner.exposed_app_path: owner
+            for owner in StateIndex().exposed_apps(exposed_paths=[str(pl.link_path) for pl in path_links.values()])
+            if owner.venv_name != self.venv.venv_path.name
+        }
+
+        conflicts = {}
+        for app_name, pl in path_links.items():
+            link_path = pl.link_path
+            if link_path is None or not os.path.lexists(link_path) or pl.is_valid():
+                continue
+            owner = owners.get(str(link_path))
+            if owner:
+                conflicts[app_name] = f"{link_path} already exposed by venv {owner.venv_name}"
+            elif link_path.is_symlink():
+                conflicts[app_name] = f"{link_path} already exist to {os.readlink(link_path)}"  # noqa: PTH115
+            else:
+                conflicts[app_name] = f"{link_path} already exist"
+
+        return conflicts
+
     def remove_exposing(
         self,
         remove_apps: Dict[str, Path],
     ) -> None:
         for app_bin, link_path in remove_apps.items():
-            if link_path.exists():
+            if link_path.exists() or link_path.is_symlink():  # the program can be gone from the venv
                 self.logger_.log_info(
                     f" 🗑️  Removing exposing {link_path} -> {app_bin} ",
                 )
                 link_path.unlink()
+                self.logger_.log_event(
+                    events.APP_UNEXPOSED,
+                    venv=self.venv.venv_path.name,
+                    app=app_bin,
+                    path=str(link_path),
+                )
 
     def expose(
         self,
@@ -181,13 +302,107 @@ class ExposeApps:
             main_package_name,
         )
 
-        exposed_apps = self.add_exposing(exposing_apps, renamed_apps, pkgs_sets)
+        conflicts = self.find_conflicts(exposing_apps, renamed_apps)
+        for app_name, reason in conflicts.items():
+            self.logger_.log_warn(f" ❌ Not exposing program {app_name}; {reason}!")
+        if conflicts:
+            self.logger_.log_warn(f" ⚠️  {len(conflicts)} program(s) not exposed, see uvpipx which <program>")
+
+        exposed_apps = self.add_exposing(
+            [app_bin for app_bin in exposing_apps if app_bin.name not in conflicts],
+            renamed_apps,
+            pkgs_sets,
+        )
         remove_apps = self.get_apps_to_remove(exposed_apps)
         self.remove_exposing(remove_apps)
 
         return exposed_apps
 
-    # TODO add function to clean old link in local bin
+    def reexpose(
+        self,
+        main_package_name: str,
+        install_sets: List[UvPipxExposeInstallSets],
+    ) -> Dict[str, UvPipxVenvExposeAppModel]:
+        """
+        Exposes again the apps of the install sets, only the apps added are linked and the apps removed unlinked.
+
+        Explanation:
+        The apps kept are left as they are, except the copies no longer matching the app of the venv.
+
+        Args:
+            main_package_name (str): The main package of the venv.
+            install_sets (List[UvPipxExposeInstallSets]): The install sets, with their expose rules.
+
+        Returns:
+            Dict[str, UvPipxVenvExposeAppModel]: The apps exposed.
+        """
+        prev_apps = self.prev_exposed.apps if self.prev_exposed else {}
+        exposed_apps: Dict[str, UvPipxVenvExposeAppModel] = {}
+        wanted: Set[str] = set()
+        for install_set in install_sets:
+            if not install_set.exposed_apps_rules:
+                continue
+            exposing_apps, renamed_apps = self.get_apps_list(install_set.exposed_apps_rules, main_package_name)
+            added_apps = [app_bin for app_bin in exposing_apps if app_bin.name not in prev_apps]
+            wanted.update(app_bin.name for app_bin in exposing_apps)
+
+            conflicts = self.find_conflicts(added_apps, renamed_apps)
+            for app_name, reason in conflicts.items():
+                self.logger_.log_warn(f" ❌ Not exposing program {app_name}; {reason}!")
+            exposed_apps.update(
+                self.add_exposing(
+                    [app_bin for app_bin in added_apps if app_bin.name not in conflicts],
+                    renamed_apps,
+                    install_set.package_name_sets,
+                ),
+            )
+
+        self.remove_exposing(
+            {k: Path(app.exposed_app_path) for k, app in prev_apps.items() if k not in wanted},
+        )
+
+        kept_apps = self.refresh_copies({k: app for k, app in prev_apps.items() if k in wanted})
+        return {**kept_apps, **exposed_apps}
+
+    # the old links of the local bin are cleaned by uvpipx doctor --fix
+
+
+@span("expose")
+def reexpose_changed(uvpipx_model: UvPipxModel, venv: UvPipxVenv, logger: Logger) -> bool:
+    """
+    After a change of the packages of a venv (upgrade, inject, uninject), updates its exposed apps if needed.
+
+    Explanation:
+    pip_metadata.json is generated again only if the entry points changed (see UvPipxVenv.update_metadata),
+    and then only the apps added or removed are linked or unlinked. Either way, the copies of the apps changed in the
+    venv are made again (copy mode). The model is updated but not saved.
+
+    Args:
+        uvpipx_model (UvPipxModel): The model of the venv.
+        venv (UvPipxVenv): The venv.
+        logger (Logger): The logger to use.
+
+    Returns:
+        bool: True if the entry points changed.
+    """
+    if not venv.update_metadata():
+        logger.log_info(" ⭕ entry points unchanged, exposed programs kept")
+        if uvpipx_model.exposed is not None:
+            expo_app = ExposeApps(venv, logger, uvpipx_model.exposed)
+            uvpipx_model.exposed.apps = expo_app.refresh_copies(uvpipx_model.exposed.apps)
+        return False
+
+    if uvpipx_model.exposed is None:
+        return True
+
+    logger.log_info(" 🎯 Re-exposing programs")
+    expo_app = ExposeApps(venv, logger, uvpipx_model.exposed)
+    uvpipx_model.exposed.apps = expo_app.reexpose(
+        uvpipx_model.main_package.package_name,
+        uvpipx_model.exposed.install_sets,
+    )
+
+    return True
 
 
 def expose(package_name: str, expose_rule_names: List[str]) -> None:
@@ -209,7 +424,11 @@ def expose(package_name: str, expose_rule_names: List[str]) -> None:
         expose_rule_names_,
         [package_name],
     )
-    uvpipx_model.save_json("uvpipx.json")
+    # the rules are kept in the main install set, to expose again the same way after an upgrade or inject
+    for install_set in uvpipx_model.exposed.install_sets:
+        if install_set.package_name_sets == [package_name]:
+            install_set.exposed_apps_rules = expose_rule_names_
+    save_venv_model(uvpipx_model)
 
     logger.log_info(
         f" 🟢 uvpipx venv {uvpipx_model.venv.name()} with {package_name} ready",
@@ -219,22 +438,15 @@ def expose(package_name: str, expose_rule_names: List[str]) -> None:
 def expose_all(expose_rule_names: List[str]) -> None:
     logger = get_logger("expose_all")
 
-    infos = ""
-
-    nb = 0
-    if config.uvpipx_venvs.exists():
-        for pck_venv in config.uvpipx_venvs.iterdir():
-            if nb > 0:
-                logger.log_info("")
-            expose(
-                pck_venv.name,
-                expose_rule_names,
-            )  # This is a tricky way to get the name
-            logger.log_info(" ----------------")
-            nb += 1
-
-    if nb == 0:
-        infos += "⭕ No uvpipx package installed!"
-
-    if infos:
-        logger.log_info(infos)
+    venv_names = uvpipx_venv_names()
+    for nb, venv_name in enumerate(venv_names):
+        if nb > 0:
+            logger.log_info("")
+        expose(
+            venv_name,
+            expose_rule_names,
+        )  # This is a tricky way to get the name
+        logger.log_info(" ----------------")
+
+    if not venv_names:
+        logger.log_info("⭕ No uvpipx package installed!")
@@ -0,0 +1,297 @@
+from __future__ import annotations
+
+__author__ = "Gaëtan Montury"
+__copyright__ = "Copyright (c) 2024-2025 Gaëtan Montury"
+__license__ = """GNU GENERAL PUBLIC LICENSE refer to file LICENSE in repo"""
+__version__ = "0.8.1"  # to bump
+__maintainer__ = "Gaëtan Montury"
+__email__ = "#"
+__status__ = "Development"
+
+
+import datetime
+import json
+import math
+import os
+import threading
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple, Union
+
+from uvpipx import config
+from uvpipx.internal_libs.Logger import get_logger
+from uvpipx.internal_libs.misc import exec_run
+from uvpipx.internal_libs.text_formatter import max_string_length_per_column
+
+# a regression is a last run at least this times slower than the p50 of the runs before
+REGRESSION_RATIO = 2.0
+# the runs needed before the last one to compare it to them
+TREND_MIN_RUNS = 2
+
+_LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def uv_version() -> str:
+    """The version of uv, asked once by process (empty if uv is not found or fails)."""
+    rc, stdout, _ = exec_run(["uv", "--version"], raise_on_error=False)
+    if rc != 0:
+        return ""
+
+    return stdout.strip().removeprefix("uv").strip()
+
+
+def record_operation(
+    operation: str,
+    data: Dict[str, Any],
+    result: Dict[str, Any],
+    history_path: Union[None, Path] = None,
+) -> None:
+    """
+    Appends an operation (install, upgrade...) to the history, as one json line.
+
+    Explanation:
+    The record is the data of the <operation>.finished event (venv, status, duration_s, uv phases...) with the
+    versions of uv and uvpipx. The history is only appended, a failure to write it never fails the operation.
+
+    Args:
+        operation (str): The operation (for example "upgrade").
+        data (Dict[str, Any]): The data of the operation (for example the venv name).
+        result (Dict[str, Any]): The result of the operation, its status and duration.
+        history_path (Union[None, Path]): The history file, config.uvpipx_history if None.
+
+    Returns:
+        None
+    """
+    path = history_path or config.uvpipx_history
+    if path is None:
+        return
+
+    try:
+        record = {
+            "ts": datetime.datetime.now().astimezone().isoformat(),
+            "operation": operation,
+            **data,
+            **result,
+            "uv_version": uv_version(),
+            "uvpipx_version": __version__,
+        }
+        line = (json.dumps(record, default=str) + "\n").encode("utf-8")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with _LOCK, path.open("ab+") as outfile:
+            if outfile.tell():
+                outfile.seek(-1, os.SEEK_END)
+                if outfile.read(1) != b"\n":
+                    line = b"\n" + line  # after an interrupted write, the next records stay readable
+            outfile.write(line)  # one write by record, appended after the records of the other processes
+    except (OSError, RuntimeError, ValueError) as e:
+        get_logger("history").log_debug(f" ⚠️  Unable to record the {operation} in the history {path}: {e}")
+
+
+def read_history(history_path: Union[None, Path] = None) -> Iterator[Dict[str, Any]]:
+    """Yields the records of the history, a line not valid (an interrupted write) is skipped."""
+    path = history_path or config.uvpipx_history
+    if path is None or not path.is_file():
+        return
+
+    with path.open(encoding="utf-8") as infile:
+        for line in infile:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict) and "operation" in record:
+                yield record
+
+
+def record_venv(record: Dict[str, Any]) -> str:
+    """The venv of a record, the package asked for an install which failed before its venv."""
+    return str(record.get("venv") or record.get("package") or "?")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """The percentile (0 to 100) of values, interpolated between the closest ranks."""
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+@dataclass
+class DurationStats:
+    """The durations of the succeeded runs of an operation, the failed and skipped runs are only counted."""
+
+    durations: List[float] = field(default_factory=list)
+    nb_failed: int = 0
+    nb_skipped: int = 0
+
+    def add(self, record: Dict[str, Any]) -> None:
+        status = record.get("status")
+        if status == "failed":
+            self.nb_failed += 1
+        elif status == "skipped":
+            self.nb_skipped += 1
+        elif isinstance(record.get("duration_s"), (int, float)):
+            self.durations.append(float(record["duration_s"]))
+
+    @property
+    def nb_runs(self) -> int:
+        return len(self.durations) + self.nb_failed + self.nb_skipped
+
+    @property
+    def p50(self) -> float:
+        return percentile(self.durations, 50) if self.durations else 0
+
+    @property
+    def p95(self) -> float:
+        return percentile(self.durations, 95) if self.durations else 0
+
+    def trend(self) -> Union[None, float]:
+        """The last run divided by the p50 of the runs before, None without enough runs."""
+        if len(self.durations) <= TREND_MIN_RUNS:
+            return None
+        before = percentile(self.durations[:-1], 50)
+        return self.durations[-1] / before if before > 0 else None
+
+
+@dataclass
+class HistoryStats:
+    by_operation: Dict[str, DurationStats] = field(default_factory=dict)
+    by_venv: Dict[Tuple[str, str], DurationStats] = field(default_factory=dict)
+    nb_records: int = 0
+    first_ts: Union[None, str] = None
+
+    @classmethod
+    def of(
+        cls,
+        records: Iterator[Dict[str, Any]],
+        venv_names: Union[None, List[str]] = None,
+        since: Union[None, datetime.datetime] = None,
+    ) -> HistoryStats:
+        """
+        Computes the stats of the records, in the order of the history (the oldest first).
+
+        Args:
+            records (Iterator[Dict[str, Any]]): The records, see read_history.
+            venv_names (Union[None, List[str]]): Only the records of these venvs, all of them if None.
+            since (Union[None, datetime.datetime]): Only the records since this date (with its timezone).
+
+        Returns:
+            HistoryStats: The durations by operation and by venv and operation.
+        """
+        stats = cls()
+        for record in records:
+            venv = record_venv(record)
+            if venv_names and venv not in venv_names:
+                continue
+            if since and not _recorded_since(record, since):
+                continue
+
+            stats.nb_records += 1
+            stats.first_ts = stats.first_ts or record.get("ts")
+            operation = str(record["operation"])
+            stats.by_operation.setdefault(operation, DurationStats()).add(record)
+            stats.by_venv.setdefault((venv, operation), DurationStats()).add(record)
+
+        return stats
+
+    def slowest(self, top: int) -> List[Tuple[Tuple[str, str], DurationStats]]:
+        ran = [(key, duration) for key, duration in self.by_venv.items() if duration.durations]
+        return sorted(ran, key=lambda item: item[1].p50, reverse=True)[:top]
+
+    def regressions(self) -> List[Tuple[Tuple[str, str], float]]:
+        trends = [(key, duration.trend()) for key, duration in self.by_venv.items()]
+        regressions = [(key, trend) for key, trend in trends if trend is not None and trend >= REGRESSION_RATIO]
+        return sorted(regressions, key=lambda item: item[1], reverse=True)
+
+
+def _recorded_since(record: Dict[str, Any], since: datetime.datetime) -> bool:
+    try:
+        return datetime.datetime.fromisoformat(str(record.get("ts"))) >= since
+    except ValueError:
+        return False
+
+
+def _table(rows: List[List[str]]) -> List[str]:
+    widths = max_string_length_per_column(rows)
+    return ["  " + "  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip() for row in rows]  # noqa: B905
+
+
+def _duration_rows(header: str, items: List[Tuple[str, DurationStats]]) -> List[List[str]]:
+    rows = [[header, "runs", "failed", "skipped", "p50", "p95"]]
+    rows += [
+        [name, str(d.nb_runs), str(d.nb_failed), str(d.nb_skipped), f"{d.p50:.2f}s", f"{d.p95:.2f}s"]
+        for name, d in items
+    ]
+    return rows
+
+
+def stats(
+    venv_names: Union[None, List[str]] = None,
+    since_seconds: Union[None, float] = None,
+    top: int = 5,
+) -> HistoryStats:
+    """
+    Shows the stats of the history: p50/p95 by command and by venv, the slowest tools and the regressions.
+
+    Args:
+        venv_names (Union[None, List[str]]): Only the operations of these venvs, all of them if None.
+        since_seconds (Union[None, float]): Only the operations of this last duration.
+        top (int): The number of slowest tools shown.
+
+    Returns:
+        HistoryStats: The stats shown.
+    """
+    logger = get_logger("stats")
+
+    if config.uvpipx_history is None:
+        logger.log_info("📭 The history is disabled (UVPIPX_HISTORY is empty)")
+        return HistoryStats()
+
+    since = None
+    if since_seconds is not None:
+        since = datetime.datetime.now().astimezone() - datetime.timedelta(seconds=since_seconds)
+    history_stats = HistoryStats.of(read_history(), venv_names, since)
+    if not history_stats.nb_records:
+        logger.log_info(f"📭 No operation recorded in the history {config.uvpipx_history}")
+        return history_stats
+
+    logger.log_info(
+        f"📊 {history_stats.nb_records} operations recorded since {history_stats.first_ts}"
+        f" in {config.uvpipx_history}\n",
+    )
+
+    logger.log_info("⏱️  By command")
+    logger.log_info("\n".join(_table(_duration_rows("command", sorted(history_stats.by_operation.items())))))
+
+    logger.log_info("\n⏱️  By venv")
+    by_venv = sorted(history_stats.by_venv.items())
+    logger.log_info("\n".join(_table(_duration_rows("venv", [(f"{v} {op}", d) for (v, op), d in by_venv]))))
+
+    slowest = history_stats.slowest(top)
+    if slowest:
+        logger.log_info("\n🐢 Slowest tools (p50)")
+        for (venv, operation), duration in slowest:
+            logger.log_info(f"  {venv} {operation} {duration.p50:.2f}s")
+
+    logger.log_info("\n📈 Trends (the last run compared to the p50 of the runs before)")
+    trends = [(key, duration, duration.trend()) for key, duration in by_venv]
+    shown = [(key, duration, trend) for key, duration, trend in trends if trend is not None]
+    for (venv, operation), duration, trend in shown:
+        icon = "🔺" if trend >= REGRESSION_RATIO else "🟢"
+        logger.log_info(
+            f"  {icon} {venv} {operation} {duration.durations[-1]:.2f}s,"
+            f" x{trend:.1f} the p50 of the {len(duration.durations) - 1} runs before",
+        )
+    if not shown:
+        logger.log_info(f"  not enough runs yet, {TREND_MIN_RUNS + 1} succeeded runs of a venv are needed")
+
+    regressions = history_stats.regressions()
+    if regressions:
+        logger.log_warn(
+            f"\n ⚠️  {len(regressions)} regression(s), at least x{REGRESSION_RATIO:.0f} slower: "
+            + ", ".join(f"{venv} {operation}" for (venv, operation), _ in regressions),
+        )
+
+    return history_stats
@@ -4,10 +4,12 @@ import sys
 
 from uvpipx.internal_libs.Logger import Logger, LogMode, get_logger
 from uvpipx.platform.win import get_env_variable, set_env_variable
-from uvpipx.uvpipx_core import UvPipxVenv
+from uvpipx.uvpipx_core import expose_copy_mode
+from uvpipx.uvpipx_metadata import normalize_name
+from uvpipx.uvpipx_state import StateIndex
 from uvpipx.uvpipx_uv import uv_get_version
 from uvpipx.uvpipx_venv_factory import path_link_from_model
-from uvpipx.uvpipx_venv_load import uvpipx_load_venv
+from uvpipx.uvpipx_venv_load import uvpipx_load_venv_state
 from uvpipx.UvPipxModels import UvPipxModel
 from uvpipx.version import show_version
 
@@ -22,11 +24,11 @@ __status__ = "Development"
 
 import os
 from pathlib import Path
-from typing import List, Union
+from typing import Any, Dict, Union
 
 import uvpipx.platform
 from uvpipx import config
-from uvpipx.internal_libs.misc import shell_run
+from uvpipx import uvpipx_events as events
 
 
 def ensurepath(just_check: bool = False) -> str:
@@ -110,24 +112,19 @@ def ensurepath_win(just_check: bool = False) -> str:
     return "OK/RESTART_NEED"
 
 
-def _info(uvpipx: UvPipxModel, venv: UvPipxVenv) -> str:
-    def get_version(pck_name: str, stdout_line: List[str]) -> str:
-        vers = next(
-            (line for line in stdout_line if pck_name in line),
-            None,
-        )
+def _info(uvpipx: UvPipxModel, versions: Dict[str, str]) -> str:
+    def get_version(pck_name: str, versions: Dict[str, str]) -> str:
+        vers = versions.get(normalize_name(pck_name))
         if vers is None:
-            vers = f"{pck_name} Unknown version"
+            return f"{pck_name} Unknown version"
 
-        return vers
+        return f"{normalize_name(pck_name)}=={vers}"
 
-    rc, stdout, stderr = shell_run("uv pip freeze", cwd=venv.venv_path)
-    stdout_line = stdout.split("\n")
-    main_vers = get_version(uvpipx.main_package.package_name, stdout_line)
+    main_vers = get_version(uvpipx.main_package.package_name, versions)
 
     injected_vers = []
     for pkg_injected in list(uvpipx.injected_packages.keys()):
-        injected_vers.append(get_version(pkg_injected, stdout_line))
+        injected_vers.append(get_version(pkg_injected, versions))
     injected_vers = sorted(injected_vers)
 
     path_links = (
@@ -143,6 +140,9 @@ def _info(uvpipx: UvPipxModel, venv: UvPipxVenv) -> str:
         bins = "   ❌ Nothing exposed"
 
     output = f""" 📦 {uvpipx.main_package.package_name} ({main_vers}) in venv {uvpipx.venv.uvpipx_dir}"""
+    if uvpipx.venv.store_entry:
+        output += f"""
+ ♻️  shared venv {uvpipx.venv.store_entry}"""
     if injected_vers:
         output_inject = "\n".join(f"""   📦 {pkg_ver}""" for pkg_ver in injected_vers)
         output += f"""
@@ -162,9 +162,9 @@ def _info_pkg(
     name_override: Union[None, str] = None,
     get_venv: bool = False,
 ) -> str:
-    uvpipx, venv = uvpipx_load_venv(package_name, name_override)
+    state, venv = uvpipx_load_venv_state(package_name, name_override)
 
-    return str(venv.venv_path / ".venv") if get_venv else _info(uvpipx, venv)
+    return str(venv.venv_path / ".venv") if get_venv else _info(state.model, state.versions)
 
 
 def info(
@@ -179,28 +179,70 @@ def info(
     logger.log_info(info)
 
 
-def uvpipx_list() -> None:
-    infos = f"""📍 uvpipx venvs are in {config.uvpipx_venvs}
-💻 apps are exposed at {config.uvpipx_local_bin} 
+def which(bin_name: str, *, get_venv: bool = False) -> bool:
+    """
+    Shows the uvpipx venv exposing a program, from the exposed apps of the state index.
+
+    Args:
+        bin_name (str): The name of the program in the bin dir (for example "jc").
+        get_venv (bool): Show only the path of the .venv of the venv.
+
+    Returns:
+        bool: True if the program is exposed by a uvpipx venv.
+    """
+    logger = get_logger("which")
+
+    owners = StateIndex().exposed_apps(exposed_names=[bin_name])
+    if not owners:
+        logger.log_info(f"⭕ {bin_name} is not exposed by uvpipx")
+        return False
+
+    for owner in owners:
+        if get_venv:
+            logger.log_info(str(config.uvpipx_venvs / owner.venv_name / ".venv"))
+            continue
+        renamed = f" (program {owner.bin_app_name})" if owner.bin_app_name != bin_name else ""
+        logger.log_info(f" 🎯 {owner.exposed_app_path} exposed by venv {owner.venv_name}{renamed}")
 
-"""
+    return True
+
+
+def uvpipx_list() -> None:
+    """Shows the uvpipx venvs one by one as they are read (and emits a venv.listed event for each one)."""
     logger = get_logger("uvpipx_list")
 
     show_version()
 
+    logger.log_info(f"""📍 uvpipx venvs are in {config.uvpipx_venvs}
+💻 apps are exposed at {config.uvpipx_local_bin} 
+""")
+
     nb = 0
-    if config.uvpipx_venvs.exists():
-        for pck_venv in config.uvpipx_venvs.iterdir():
-            if pck_venv.name.startswith("."):
-                continue
-            infos += _info_pkg(pck_venv.name)  # this is a tricky way to get the name
-            infos += "\n\n"
-            nb += 1
+    for state in StateIndex().iter_refresh():
+        if state.model is None:
+            logger.log_info(f" ⚠️  {state.name} is not a valid uvpipx venv ({state.error})\n")
+            logger.log_event(events.VENV_LISTED, venv=state.name, valid=False, error=state.error)
+            continue
+        logger.log_info(_info(state.model, state.versions) + "\n")
+        logger.log_event(events.VENV_LISTED, **_listed_event(state.name, state.model, state.versions))
+        nb += 1
 
     if nb == 0:
-        infos += "⭕ No uvpipx package installed!"
+        logger.log_info("⭕ No uvpipx package installed!")
+
 
-    logger.log_info(infos)
+def _listed_event(venv_name: str, uvpipx: UvPipxModel, versions: Dict[str, str]) -> Dict[str, Any]:
+    return {
+        "venv": venv_name,
+        "valid": True,
+        "main_package": uvpipx.main_package.package_name,
+        "version": versions.get(normalize_name(uvpipx.main_package.package_name)),
+        "injected_packages": {name: versions.get(normalize_name(name)) for name in sorted(uvpipx.injected_packages)},
+        "exposed_apps": {name: app.exposed_app_path for name, app in sorted(uvpipx.exposed.apps.items())}
+        if uvpipx.exposed
+        else {},
+        "store_entry": uvpipx.venv.store_entry,
+    }
 
 
 def uvpipx_show_config() -> None:
@@ -235,6 +277,27 @@ def uvpipx_show_config() -> None:
         "    🎚️  Defined by the UVPIPX_LOCAL_VENVS environment variable or defaults to $UVPIPX_HOME/venvs",
     )
 
+    logger.log_info(f"\n🗃️  uvpipx state index = {config.uvpipx_state_db}")
+    logger.log_info("    SQLite index of the uvpipx venvs (a cache of their uvpipx.json, can be deleted).")
+    logger.log_info(
+        "    🎚️  Defined by the UVPIPX_STATE_DB environment variable or defaults to $UVPIPX_HOME/uvpipx_state.sqlite",
+    )
+
+    logger.log_info(f"\n♻️  uvpipx venv store = {config.uvpipx_store or 'disabled'}")
+    logger.log_info("    Content-addressed store of venvs, shared by the uvpipx venvs with the same packages.")
+    logger.log_info("    🎚️  Enabled by the UVPIPX_STORE environment variable (the path of the store)")
+
+    logger.log_info(f"\n📇 package index = {config.uvpipx_index_url}")
+    logger.log_info("    The index queried by outdated (PEP 691 json api, or the html api of PEP 503).")
+    logger.log_info(
+        "    🎚️  Defined by the UVPIPX_INDEX_URL, UV_DEFAULT_INDEX or UV_INDEX_URL environment variable"
+        " or defaults to https://pypi.org/simple",
+    )
+
+    logger.log_info(f"\n🗄️  uvpipx cache = {config.uvpipx_cache}")
+    logger.log_info("    Cache of the responses of the package index, revalidated with their ETag (can be deleted).")
+    logger.log_info("    🎚️  Defined by the UVPIPX_CACHE_DIR environment variable or defaults to $UVPIPX_HOME/cache")
+
     logger.log_info(f"\n📁 exposing bin directory = {config.uvpipx_local_bin}")
     logger.log_info("    Default path for exposed executables.")
     if uvpipx.platform.sys_platform == "win":
@@ -250,6 +313,23 @@ def uvpipx_show_config() -> None:
     logger.log_info(
         "    🎚️  Can be defined by the UVPIPX_BIN_DIR environment variable",
     )
+
+    logger.log_info(f"\n🔗 expose mode = {'copy' if expose_copy_mode() else 'symlink'}")
+    logger.log_info("    How the programs are exposed in the bin directory: symlink or copy (always copy on windows).")
+    logger.log_info("    🎚️  Defined by the UVPIPX_EXPOSE_MODE environment variable or defaults to symlink")
+
+    logger.log_info(f"\n📊 profile = {config.uvpipx_profile or 'none'}")
+    logger.log_info(
+        f"    cProfile (cpu) and tracemalloc (memory) profiles of each command, in {config.uvpipx_profiles}"
+    )
+    logger.log_info("    🎚️  Defined by the UVPIPX_PROFILE environment variable (cpu, memory or cpu,memory)")
+
+    logger.log_info(f"\n📜 uvpipx history = {config.uvpipx_history or 'disabled'}")
+    logger.log_info("    The install, upgrade, inject, uninject and uninstall done, one json line each (see stats).")
+    logger.log_info(
+        "    🎚️  Defined by the UVPIPX_HISTORY environment variable (empty to disable)"
+        " or defaults to $UVPIPX_HOME/history.jsonl",
+    )
     # logger.log_info(
     #     "    Note: The value for Windows is not defined in the provided code.",
     # )
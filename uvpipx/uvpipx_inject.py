@@ -2,8 +2,14 @@
 
 from __future__ import annotations
 
+from uvpipx import uvpipx_events as events
 from uvpipx.internal_libs.Logger import get_logger
 from uvpipx.req_spec import Requirement
+from uvpipx.uvpipx_core import log_uv_output
+from uvpipx.uvpipx_expose import reexpose_changed
+from uvpipx.uvpipx_state import save_venv_model
+from uvpipx.uvpipx_store import VenvStore
+from uvpipx.uvpipx_uv import uv_operation
 from uvpipx.uvpipx_venv_load import uvpipx_load_venv
 from uvpipx.UvPipxModels import UvPipxExposeInstallSets, UvPipxPackageModel
 
@@ -34,47 +40,59 @@ def inject(
 
     uvpipx_cfg, venv = uvpipx_load_venv(package_main_name, name_override)
 
-    injecting_package = {r.name: r for rl in lst_package_name_spec for r in [Requirement.from_str(rl)]}
-
-    for pck_name in injecting_package:  # TODO allow upgrade
-        if pck_name in uvpipx_cfg.injected_packages:
-            msg = f"🔴 {pck_name} already injected"
-            raise RuntimeError(msg)
-
-    pip_packages_spec = " ".join(lst_package_name_spec)
-
-    with Elapser() as ela:
-        venv.install(lst_package_name_spec, allow_upgrade=False)
-    logger.log_info(
-        ela.ela_str(
-            f" 📥 uv pip install {pip_packages_spec} in uvpipx venv {uvpipx_cfg.venv.name()}",
-        ),
-    )
-
-    logger.log_info(f" 🟢 injected {lst_package_name_spec}")
-    (venv.venv_path / "requirements.txt").write_text(venv.freeze())
-    logger.log_info("")
-
-    injected_package = {
-        k: UvPipxPackageModel(
-            injecting_package[k].to_str(),
-            k,
+    with uv_operation(logger, events.INJECT, venv=venv.venv_path.name, packages=lst_package_name_spec):
+        injecting_package = {r.name: r for rl in lst_package_name_spec for r in [Requirement.from_str(rl)]}
+
+        for pck_name in injecting_package:  # TODO allow upgrade
+            if pck_name in uvpipx_cfg.injected_packages:
+                msg = f"🔴 {pck_name} already injected"
+                raise RuntimeError(msg)
+
+        pip_packages_spec = " ".join(lst_package_name_spec)
+
+        store = VenvStore.of_venv(venv.venv_path)
+        with Elapser() as ela:
+            if store is None:
+                venv.install(lst_package_name_spec, allow_upgrade=False, on_output=log_uv_output(logger))
+            else:  # a store entry is shared, the venv is linked to the entry with the injected packages instead
+                store.link_venv(
+                    uvpipx_cfg.venv,
+                    [
+                        uvpipx_cfg.main_package.package_name_spec,
+                        *[inj.package_name_spec for inj in uvpipx_cfg.injected_packages.values()],
+                        *lst_package_name_spec,
+                    ],
+                    on_output=log_uv_output(logger),
+                )
+        logger.log_info(
+            ela.ela_str(
+                f" 📥 uv pip install {pip_packages_spec} in uvpipx venv {uvpipx_cfg.venv.name()}",
+            ),
         )
-        for k in injecting_package
-    }
-    tmp_dict = {**uvpipx_cfg.injected_packages, **injected_package}
-    uvpipx_cfg.injected_packages = {k: tmp_dict[k] for k in sorted(tmp_dict)}
-    if uvpipx_cfg.exposed:
-        uvpipx_cfg.exposed.install_sets.append(
-            UvPipxExposeInstallSets(list(injected_package.keys()), []),
-        )
-    else:
-        msg = "Cannot inject on empty venv"
-        raise RuntimeError(msg)
 
-    uvpipx_cfg.save_json("uvpipx.json")
+        logger.log_info(f" 🟢 injected {lst_package_name_spec}")
+        (venv.venv_path / "requirements.txt").write_text(venv.freeze())
+        logger.log_info("")
+
+        injected_package = {
+            k: UvPipxPackageModel(
+                injecting_package[k].to_str(),
+                k,
+            )
+            for k in injecting_package
+        }
+        tmp_dict = {**uvpipx_cfg.injected_packages, **injected_package}
+        uvpipx_cfg.injected_packages = {k: tmp_dict[k] for k in sorted(tmp_dict)}
+        if uvpipx_cfg.exposed:
+            uvpipx_cfg.exposed.install_sets.append(
+                UvPipxExposeInstallSets(list(injected_package.keys()), []),
+            )
+        else:
+            msg = "Cannot inject on empty venv"
+            raise RuntimeError(msg)
 
-    # TODO add exposing
+        reexpose_changed(uvpipx_cfg, venv, logger)
+        save_venv_model(uvpipx_cfg)
 
 
 def uninject(
@@ -87,34 +105,56 @@ def uninject(
 
     uvpipx_cfg, venv = uvpipx_load_venv(package_main_name, name_override)
 
-    uninjected_package = {r.name: r for rl in lst_package_name_spec for r in [Requirement.from_str(rl)]}
-
-    for pck_name in uninjected_package:
-        if pck_name not in uvpipx_cfg.injected_packages:
-            msg = f"🔴 {pck_name} is not injected"
-            raise RuntimeError(msg)
-
-    pip_packages_spec = " ".join(uninjected_package.keys())
-    with Elapser() as ela:
-        venv.uninstall(pip_packages_spec)
-    logger.log_info(
-        ela.ela_str(
-            f" 🗑️  uv pip uninstall {pip_packages_spec} in uvpipx venv {uvpipx_cfg.venv.name()}",
-        ),
-    )
-
-    logger.log_info(f" 🗑️  uninjected {lst_package_name_spec}")
-    (venv.venv_path / "requirements.txt").write_text(venv.freeze())
-    logger.log_info("")
-
-    stay_injected_package = {
-        pck_name: pck_ref
-        for pck_name, pck_ref in uvpipx_cfg.injected_packages.items()
-        if pck_name not in uninjected_package
-    }
-
-    uvpipx_cfg.injected_packages = {k: stay_injected_package[k] for k in sorted(stay_injected_package)}
-
-    uvpipx_cfg.save_json("uvpipx.json")
+    with uv_operation(logger, events.UNINJECT, venv=venv.venv_path.name, packages=lst_package_name_spec):
+        uninjected_package = {r.name: r for rl in lst_package_name_spec for r in [Requirement.from_str(rl)]}
+
+        for pck_name in uninjected_package:
+            if pck_name not in uvpipx_cfg.injected_packages:
+                msg = f"🔴 {pck_name} is not injected"
+                raise RuntimeError(msg)
+
+        pip_packages_spec = " ".join(uninjected_package.keys())
+        store = VenvStore.of_venv(venv.venv_path)
+        with Elapser() as ela:
+            if store is None:
+                venv.uninstall(list(uninjected_package.keys()), on_output=log_uv_output(logger))
+            else:  # a store entry is shared, the venv is linked to the entry without the uninjected packages instead
+                store.link_venv(
+                    uvpipx_cfg.venv,
+                    [
+                        uvpipx_cfg.main_package.package_name_spec,
+                        *[
+                            inj.package_name_spec
+                            for name, inj in uvpipx_cfg.injected_packages.items()
+                            if name not in uninjected_package
+                        ],
+                    ],
+                    on_output=log_uv_output(logger),
+                )
+        logger.log_info(
+            ela.ela_str(
+                f" 🗑️  uv pip uninstall {pip_packages_spec} in uvpipx venv {uvpipx_cfg.venv.name()}",
+            ),
+        )
 
-    # TODO change exposing
+        logger.log_info(f" 🗑️  uninjected {lst_package_name_spec}")
+        (venv.venv_path / "requirements.txt").write_text(venv.freeze())
+        logger.log_info("")
+
+        stay_injected_package = {
+            pck_name: pck_ref
+            for pck_name, pck_ref in uvpipx_cfg.injected_packages.items()
+            if pck_name not in uninjected_package
+        }
+
+        uvpipx_cfg.injected_packages = {k: stay_injected_package[k] for k in sorted(stay_injected_package)}
+
+        if uvpipx_cfg.exposed:
+            # the install sets of the packages uninjected are dropped, their apps are not exposed anymore
+            for install_set in uvpipx_cfg.exposed.install_sets:
+                install_set.package_name_sets = [
+                    p for p in install_set.package_name_sets if p not in uninjected_package
+                ]
+            uvpipx_cfg.exposed.install_sets = [s for s in uvpipx_cfg.exposed.install_sets if s.package_name_sets]
+        reexpose_changed(uvpipx_cfg, venv, logger)
+        save_venv_model(uvpipx_cfg)
@@ -2,9 +2,6 @@
 
 from __future__ import annotations
 
-import uvpipx
-from uvpipx import config
-
 __author__ = "Gaëtan Montury"
 __copyright__ = "Copyright (c) 2024-2025 Gaëtan Montury"
 __license__ = "GNU GENERAL PUBLIC LICENSE refer to file LICENSE in repo"
@@ -13,15 +10,26 @@ __maintainer__ = "Gaëtan Montury"
 __email__ = "#"
 __status__ = "Development"
 
+import os
 import shutil
 from dataclasses import dataclass
-from typing import List, Tuple, Union
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
 
-import uvpipx.platform
+from uvpipx import config
+from uvpipx import uvpipx_events as events
 from uvpipx.internal_libs.Logger import get_logger
 from uvpipx.internal_libs.misc import Elapser
+from uvpipx.internal_libs.parallel import JobResult, log_jobs_summary, run_jobs
+from uvpipx.internal_libs.tracing import span
 from uvpipx.req_spec import Requirement
+from uvpipx.uvpipx_core import log_uv_output
 from uvpipx.uvpipx_expose import ExposeApps
+from uvpipx.uvpipx_state import save_venv_model
+from uvpipx.uvpipx_store import VenvStore
+from uvpipx.uvpipx_trash import move_to_trash, spawn_reaper
+from uvpipx.uvpipx_uv import uv_operation
 from uvpipx.uvpipx_venv_factory import path_link_from_model, uvpipx_venv_factory
 from uvpipx.uvpipx_venv_load import uvpipx_load_venv
 from uvpipx.UvPipxModels import (
@@ -40,6 +48,7 @@ class Installer:
     inject_pkgs_name_spec: Union[None, List[str]] = None
     name_override: Union[None, str] = None
     force_reinstall: bool = False
+    wheelhouse: Union[None, Path] = None
 
     def __post_init__(self):
         self.logger = get_logger("install")
@@ -79,6 +88,15 @@ class Installer:
 
         return uvpipx_prev, venv_prev, True
 
+    @span("check conflicts")
+    def warn_conflicts(self) -> None:
+        """Reports the programs that will not be exposed, known before uv installs anything."""
+        expo_app = ExposeApps(self.venv, self.logger)
+        planned_apps, renamed_apps = expo_app.planned_apps(self.expose_rule_names_def, self.package_name)
+        for app_name, reason in expo_app.find_conflicts(planned_apps, renamed_apps).items():
+            self.logger.log_warn(f" ⚠️  Program {app_name} would not be exposed; {reason}!")
+
+    @span("create venv")
     def create_virtual_env_if_needed(self) -> bool:
         created = False
         with Elapser() as ela:
@@ -91,22 +109,36 @@ class Installer:
 
     def install_all_packages(self) -> None:
         with Elapser() as ela:
-            self.venv.install(self.all_pkgs_name_spec)
+            self.venv.install(
+                self.all_pkgs_name_spec,
+                on_output=log_uv_output(self.logger),
+                wheelhouse=self.wheelhouse,
+            )
         self.logger.log_info(
             ela.ela_str(
                 f" 📥 uv pip install {self.all_pkgs_name_spec} in uvpipx venv {self.venv_model.name()}",
             ),
         )
 
+    def install_in_store(self, store: VenvStore) -> None:
+        with Elapser() as ela:
+            store.link_venv(
+                self.venv_model,
+                self.all_pkgs_name_spec,
+                on_output=log_uv_output(self.logger),
+                wheelhouse=self.wheelhouse,
+            )
+        self.logger.log_info(
+            ela.ela_str(
+                f" 📥 {self.all_pkgs_name_spec} in store for uvpipx venv {self.venv_model.name()}",
+            ),
+        )
+
     def save_pip_infos(self) -> None:
         (self.venv.venv_path / "requirements.txt").write_text(self.venv.freeze())
-        pip_metadata = self.venv.venv_path / "pip_metadata.json"
-        uvpipx_console_scripts = config.uvpipx_self_dir / "uvpipx/uvpipx_console_scripts.py"
-        python_venv_bin = self.venv.venv_bin_dir() / ("python" + uvpipx.platform.bin_ext)
-        self.venv.run_in_venv(
-            f"{python_venv_bin} {uvpipx_console_scripts} {self.venv.venv_path} {pip_metadata}",
-        )
+        self.venv.update_metadata(force=True)
 
+    @span("expose")
     def expose_binaries(
         self,
         prev_exposed: Union[None, UvPipxExposedModel] = None,
@@ -129,11 +161,11 @@ class Installer:
             exposed_bins,
         )
 
-    def install(self) -> None:
+    def install(self) -> bool:
         uvpipx_prev, _, can_install = self.check_existing_installation()
 
         if not can_install:
-            return
+            return False
 
         uvpipx_injected_package = {
             k.name: UvPipxPackageModel(
@@ -154,25 +186,35 @@ class Installer:
             exposed=UvPipxExposedModel(str(self.venv.venv_bin_dir())),
         )
 
-        created = self.create_virtual_env_if_needed()
+        self.warn_conflicts()
+
+        store = VenvStore.for_install(self.venv.venv_path)
+        created = self.create_virtual_env_if_needed() if store is None else not self.venv.venv_path.exists()
         try:
-            self.install_all_packages()
+            if store is None:
+                self.install_all_packages()
+            else:
+                self.install_in_store(store)
 
             self.save_pip_infos()
             self.logger.log_info("")
             self.expose_binaries(prev_exposed=uvpipx_prev.exposed if uvpipx_prev else None)
-            self.uvpipx_cfg.save_json("uvpipx.json")
+            save_venv_model(self.uvpipx_cfg)
 
             self.logger.log_info(
                 f" 🟢 uvpipx venv {self.venv_model.name()} with {self.package_name} ready",
             )
         except Exception as e:
             if created:
-                shutil.rmtree(self.venv.venv_path)
+                if store is not None:
+                    spawn_reaper(store.release(self.venv.venv_path))
+                shutil.rmtree(self.venv.venv_path, ignore_errors=store is not None)
                 raise RuntimeError("❌ Failed to install, clean virtual env") from e
 
             raise e
 
+        return True
+
 
 def install(
     package_name_spec: str,
@@ -181,6 +223,7 @@ def install(
     inject_pkgs: Union[None, List[str]] = None,
     name_override: Union[None, str] = None,
     force_reinstall: bool = False,
+    wheelhouse: Union[None, Path] = None,
 ) -> None:
     config = Installer(
         package_name_spec,
@@ -188,20 +231,165 @@ def install(
         inject_pkgs_name_spec=inject_pkgs,
         name_override=name_override,
         force_reinstall=force_reinstall,
+        wheelhouse=wheelhouse,
     )
-    config.install()
+    with uv_operation(config.logger, events.INSTALL, package=package_name_spec) as result:
+        if config.install():
+            result["venv"] = config.venv_model.name()
+        else:
+            result["status"] = "skipped"
+
+
+def install_many(
+    packages_name_spec: List[str],
+    *,
+    expose_rule_names: Union[None, List[str]] = None,
+    inject_pkgs: Union[None, List[str]] = None,
+    force_reinstall: bool = False,
+    wheelhouse: Union[None, Path] = None,
+    jobs: Union[None, int] = None,
+) -> List[JobResult]:
+    """Install many packages, each one in its own venv and Installer pipeline, concurrently"""
+    logger = get_logger("install_many")
+
+    specs_by_venv: Dict[str, List[str]] = {}
+    for package_name_spec in dict.fromkeys(packages_name_spec):
+        specs_by_venv.setdefault(Requirement.from_str(package_name_spec).name, []).append(package_name_spec)
+    same_venv = {name: specs for name, specs in specs_by_venv.items() if len(specs) > 1}
+    if same_venv:
+        # two jobs would install concurrently in the same venv directory
+        conflicts = ", ".join(f"{' and '.join(specs)} in {name}" for name, specs in same_venv.items())
+        msg = f"🔴 Packages installed in the same venv: {conflicts}, give only one spec by package"
+        raise RuntimeError(msg)
 
+    def show_job(result: JobResult) -> None:
+        logger.replay(result.logs)
+        if not result.ok:
+            logger.log_error(f" 🔴 Install of {result.name} failed: {result.error}")
+        logger.log_info(" ----------------\n")
 
-def uninstall(package_name: str, *, name_override: Union[None, str] = None) -> None:
+    with Elapser() as ela:
+        results = run_jobs(
+            {
+                package_name_spec: partial(
+                    install,
+                    package_name_spec,
+                    expose_rule_names=expose_rule_names,
+                    inject_pkgs=inject_pkgs,
+                    force_reinstall=force_reinstall,
+                    wheelhouse=wheelhouse,
+                )
+                for (package_name_spec,) in specs_by_venv.values()
+            },
+            max_workers=jobs,
+            on_done=show_job,
+        )
+
+    log_jobs_summary(logger, "install", results, ela)
+
+    return results
+
+
+def bin_links_by_venv() -> Dict[Path, List[Path]]:
+    """
+    Scans once the uvpipx bin directory for the links targeting a uvpipx venv, without resolving them.
+
+    Returns:
+        Dict[Path, List[Path]]: The links by the path of the venv they target.
+    """
+    if not config.uvpipx_local_bin.is_dir():
+        return {}
+
+    venvs_prefix = str(config.uvpipx_venvs) + os.sep
+    links: Dict[Path, List[Path]] = {}
+    with os.scandir(config.uvpipx_local_bin) as it:
+        for entry in it:
+            if not entry.is_symlink():
+                continue
+            target = os.path.join(config.uvpipx_local_bin, os.readlink(entry.path))  # noqa: PTH115, PTH118
+            if target.startswith(venvs_prefix):
+                venv_name = target[len(venvs_prefix) :].split(os.sep, 1)[0]
+                links.setdefault(config.uvpipx_venvs / venv_name, []).append(Path(entry.path))
+
+    return links
+
+
+def unlink_stale_links(venv_path: Path, bin_links: Union[None, Dict[Path, List[Path]]] = None) -> List[Path]:
+    """
+    Removes the links of the uvpipx bin directory that still target the venv (apps not in the model, like injected ones).
+
+    Args:
+        venv_path (Path): The path of the uvpipx venv.
+        bin_links (Union[None, Dict[Path, List[Path]]]): The links by venv of bin_links_by_venv, scanned now if None.
+
+    Returns:
+        List[Path]: The links removed.
+    """
+    if bin_links is None:
+        bin_links = bin_links_by_venv()
+
+    removed: List[Path] = []
+    for link in bin_links.get(venv_path, []):
+        try:
+            link.unlink()
+        except FileNotFoundError:
+            continue  # an app of the model, already removed
+        removed.append(link)
+
+    return removed
+
+
+def uninstall(
+    package_name: str,
+    *,
+    name_override: Union[None, str] = None,
+    reap: bool = True,
+    bin_links: Union[None, Dict[Path, List[Path]]] = None,
+) -> List[Path]:
+    """
+    Uninstalls a package: its exposed programs are removed and its venv is moved to the trash.
+
+    Explanation:
+    The venv is renamed (atomic and immediate whatever its size), the trash is emptied by a background reaper.
+    A venv in the store only releases its store entry, which is freed when no other venv uses it.
+
+    Args:
+        package_name (str): The package name.
+        name_override (Union[None, str]): The venv name if not the package name.
+        reap (bool): Start the background reaper. uninstall_all starts only one reaper for all the venvs.
+        bin_links (Union[None, Dict[Path, List[Path]]]): The links of the bin directory by venv, see bin_links_by_venv.
+            uninstall_all scans the bin directory only once for all the venvs.
+
+    Returns:
+        List[Path]: The trash directories where the venv (and its store entry if freed) have been moved.
+    """
     logger = get_logger("uninstall")
     uvpipx, venv = uvpipx_load_venv(package_name, name_override)
-    logger.log_info(f"🪓 Uninstalling {package_name}\n")
-    logger.log_info("🗑️  Remove exposed program")
-    if uvpipx.exposed:
-        for mpl in uvpipx.exposed.apps.values():
-            pl = path_link_from_model(uvpipx.exposed, mpl)
-            pl.unlink()
-            logger.log_info(f" ❌ Remove Exposed program {pl.show_name_with_link()}")
-    # TODO also delete injected exposed bin
-    logger.log_info(f"\n🗑️  Remove uvpipx venv {venv.venv_path.name}")
-    shutil.rmtree(venv.venv_path)
+    venv_name = venv.venv_path.name
+    with uv_operation(logger, events.UNINSTALL, venv=venv_name):
+        logger.log_info(f"🪓 Uninstalling {package_name}\n")
+        logger.log_info("🗑️  Remove exposed program")
+        with span("unexpose"):
+            if uvpipx.exposed:
+                for mpl in uvpipx.exposed.apps.values():
+                    pl = path_link_from_model(uvpipx.exposed, mpl)
+                    pl.unlink()
+                    logger.log_info(f" ❌ Remove Exposed program {pl.show_name_with_link()}")
+                    logger.log_event(
+                        events.APP_UNEXPOSED,
+                        venv=venv_name,
+                        app=pl.link_path.name,
+                        path=str(pl.link_path),
+                    )
+            for link in unlink_stale_links(venv.venv_path, bin_links):
+                logger.log_info(f" ❌ Remove Exposed program {link.name}")
+                logger.log_event(events.APP_UNEXPOSED, venv=venv_name, app=link.name, path=str(link))
+        logger.log_info(f"\n🗑️  Remove uvpipx venv {venv_name}")
+        with span("trash"):
+            store = VenvStore.of_venv(venv.venv_path)
+            trash_dirs = store.release(venv.venv_path) if store else []
+            trash_dirs.append(move_to_trash(venv.venv_path))
+    if reap:
+        spawn_reaper(trash_dirs)
+
+    return trash_dirs
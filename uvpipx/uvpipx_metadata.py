@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+__author__ = "Gaëtan Montury"
+__copyright__ = "Copyright (c) 2024-2025 Gaëtan Montury"
+__license__ = """GNU GENERAL PUBLIC LICENSE refer to file LICENSE in repo"""
+__version__ = "0.8.1"  # to bump
+__maintainer__ = "Gaëtan Montury"
+__email__ = "#"
+__status__ = "Development"
+
+
+import json
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+
+RE_NORMALIZE_NAME = re.compile(r"[-_.]+")
+
+
+def normalize_name(name: str) -> str:
+    """
+    Normalizes a package name like PEP 503 (and like uv pip freeze shows it).
+
+    Args:
+        name (str): The package name.
+
+    Returns:
+        str: The normalized package name.
+    """
+    return RE_NORMALIZE_NAME.sub("-", name).lower()
+
+
+@dataclass
+class InstalledDist:
+    name: str
+    version: str
+    dist_info_path: Path
+    direct_url: Union[None, str] = None
+    editable: bool = False
+
+    def to_freeze_line(self) -> str:
+        if self.editable and self.direct_url:
+            return f"-e {self.direct_url}"
+        if self.direct_url:
+            return f"{self.name} @ {self.direct_url}"
+        return f"{self.name}=={self.version}"
+
+
+def site_packages_dirs(venv_path: Path) -> List[Path]:
+    """
+    Finds the site-packages directories of the .venv of a uvpipx venv without running its python.
+
+    Args:
+        venv_path (Path): The path of the uvpipx venv (the parent of .venv).
+
+    Returns:
+        List[Path]: The site-packages directories found (empty if the layout is unknown).
+    """
+    dot_venv = venv_path / ".venv"
+    site_packages = sorted(dot_venv.glob("lib/python*/site-packages"))  # unix layout
+    win_site_packages = dot_venv / "Lib" / "site-packages"  # windows layout
+    if not site_packages and win_site_packages.is_dir():
+        site_packages = [win_site_packages]
+
+    return site_packages
+
+
+def read_metadata_name_version(metadata_file: Path) -> Tuple[str, str]:
+    """
+    Reads Name and Version in the headers of a METADATA file (stop at the first blank line).
+
+    Args:
+        metadata_file (Path): The path to the METADATA file.
+
+    Returns:
+        Tuple[str, str]: The name and the version ("" when not found).
+    """
+    name, version = "", ""
+    with metadata_file.open(encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if not line.strip():
+                break
+            if line.startswith("Name:"):
+                name = line.split(":", 1)[1].strip()
+            elif line.startswith("Version:"):
+                version = line.split(":", 1)[1].strip()
+            if name and version:
+                break
+
+    return name, version
+
+
+def read_direct_url(dist_info_dir: Path) -> Tuple[Union[None, str], bool]:
+    direct_url_file = dist_info_dir / "direct_url.json"
+    if not direct_url_file.exists():
+        return None, False
+
+    direct_url = json.loads(direct_url_file.read_text(encoding="utf-8"))
+    url = direct_url.get("url")
+    if url is None:
+        return None, False
+
+    if "vcs_info" in direct_url:
+        vcs_info = direct_url["vcs_info"]
+        url = f"{vcs_info.get('vcs', 'git')}+{url}"
+        if "commit_id" in vcs_info:
+            url += f"@{vcs_info['commit_id']}"
+
+    return url, direct_url.get("dir_info", {}).get("editable", False)
+
+
+def read_dist_info(dist_info_dir: Path) -> Union[None, InstalledDist]:
+    metadata_file = dist_info_dir / "METADATA"
+    if not metadata_file.exists():
+        return None
+
+    name, version = read_metadata_name_version(metadata_file)
+    if not name:
+        name = dist_info_dir.name[: -len(".dist-info")].rsplit("-", 1)[0]
+    direct_url, editable = read_direct_url(dist_info_dir)
+
+    return InstalledDist(normalize_name(name), version, dist_info_dir, direct_url, editable)
+
+
+def installed_dists(venv_path: Path) -> Union[None, List[InstalledDist]]:
+    """
+    Lists the packages installed in a uvpipx venv by scanning the *.dist-info directories.
+
+    Args:
+        venv_path (Path): The path of the uvpipx venv.
+
+    Returns:
+        Union[None, List[InstalledDist]]: The installed packages sorted by name, None if the layout is unknown.
+    """
+    site_packages = site_packages_dirs(venv_path)
+    if not site_packages:
+        return None
+
+    dists: Dict[str, InstalledDist] = {}
+    for site_package in site_packages:
+        for dist_info_dir in site_package.glob("*.dist-info"):
+            dist = read_dist_info(dist_info_dir)
+            if dist is not None:
+                dists.setdefault(dist.name, dist)
+
+    return [dists[name] for name in sorted(dists)]
+
+
+def installed_versions(venv_path: Path) -> Union[None, Dict[str, str]]:
+    dists = installed_dists(venv_path)
+    if dists is None:
+        return None
+
+    return {dist.name: dist.version for dist in dists}
@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+__author__ = "Gaëtan Montury"
+__copyright__ = "Copyright (c) 2024-2025 Gaëtan Montury"
+__license__ = """GNU GENERAL PUBLIC LICENSE refer to file LICENSE in repo"""
+__version__ = "0.8.1"  # to bump
+__maintainer__ = "Gaëtan Montury"
+__email__ = "#"
+__status__ = "Development"
+
+
+from dataclasses import dataclass, field
+from functools import partial
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Tuple, Union
+
+from uvpipx import config
+from uvpipx import uvpipx_events as events
+from uvpipx.internal_libs.http_utils import ConnectionPool, HttpCache, HttpClient, HttpResponse
+from uvpipx.internal_libs.Logger import get_logger
+from uvpipx.internal_libs.misc import Elapser
+from uvpipx.internal_libs.parallel import default_jobs, run_jobs
+from uvpipx.internal_libs.pep440 import is_prerelease, version_key
+from uvpipx.internal_libs.tracing import span
+from uvpipx.req_spec import Requirement
+from uvpipx.uvpipx_metadata import normalize_name
+from uvpipx.uvpipx_state import StateIndex
+
+PEP691_JSON = "application/vnd.pypi.simple.v1+json"
+# the json api is preferred, but indexes and mirrors with only the html api of PEP 503 are still common
+PEP691_ACCEPT = f"{PEP691_JSON}, application/vnd.pypi.simple.v1+html;q=0.2, text/html;q=0.01"
+SDIST_EXTENSIONS = (".tar.gz", ".tar.bz2", ".tar.xz", ".tgz", ".zip")
+
+
+def version_of_filename(filename: str) -> Union[None, str]:
+    """Returns the version of a wheel or sdist file name, None for other files."""
+    if filename.endswith(".whl"):
+        parts = filename[: -len(".whl")].split("-")
+        return parts[1] if len(parts) >= 5 else None  # noqa: PLR2004
+
+    for extension in SDIST_EXTENSIONS:
+        if filename.endswith(extension):
+            _, sep, version = filename[: -len(extension)].rpartition("-")
+            return version if sep else None
+
+    return None
+
+
+def project_versions(project: Dict[str, Any]) -> List[str]:
+    """
+    Returns the versions of a PEP 691 project page, without the versions with only yanked files.
+
+    Args:
+        project (Dict[str, Any]): The json of the project page.
+
+    Returns:
+        List[str]: The versions, not sorted.
+    """
+    versions = {
+        version
+        for file in project.get("files", [])
+        if not file.get("yanked")
+        for version in [version_of_filename(file.get("filename", ""))]
+        if version
+    }
+    if not versions:  # no file with a known name, the versions of PEP 700
+        versions = set(project.get("versions", []))
+
+    return list(versions)
+
+
+class SimpleHtmlParser(HTMLParser):
+    """Collects the files of a PEP 503 html project page: the text of each anchor, and if it is yanked."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.files: List[Dict[str, Any]] = []
+        self._current: Union[None, Dict[str, Any]] = None
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Union[None, str]]]) -> None:
+        if tag == "a":
+            self._current = {"filename": "", "yanked": any(name == "data-yanked" for name, _ in attrs)}
+
+    def handle_data(self, data: str) -> None:
+        if self._current is not None:
+            self._current["filename"] += data
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "a" and self._current is not None:
+            self._current["filename"] = self._current["filename"].strip()
+            self.files.append(self._current)
+            self._current = None
+
+
+def project_page(response: HttpResponse) -> Dict[str, Any]:
+    """Returns the project page of an index response as PEP 691 json, the html pages of PEP 503 are converted."""
+    if response.headers.get("content-type", "").split(";")[0].strip() == PEP691_JSON:
+        return response.json()
+
+    parser = SimpleHtmlParser()
+    parser.feed(response.body.decode("utf-8", errors="replace"))
+    return {"files": parser.files}
+
+
+def latest_version(versions: List[str], allow_prerelease: bool = False) -> Union[None, str]:
+    candidates = [v for v in versions if allow_prerelease or not is_prerelease(v)] or versions
+    return max(candidates, key=version_key, default=None)
+
+
+@dataclass
+class OutdatedPackage:
+    venv_name: str
+    package_name: str
+    installed: Union[None, str]
+    latest: Union[None, str] = None
+    error: Union[None, str] = None
+
+    @property
+    def outdated(self) -> bool:
+        if self.installed is None or self.latest is None:
+            return False
+
+        return version_key(self.latest) > version_key(self.installed)
+
+    def show(self) -> str:
+        if self.error:
+            return f" 🔴 {self.package_name} (venv {self.venv_name}): {self.error}"
+        if self.outdated:
+            return f" 🔺 {self.package_name} {self.installed} -> {self.latest} (venv {self.venv_name})"
+
+        return f" 🟢 {self.package_name} {self.installed} (venv {self.venv_name})"
+
+
+@dataclass
+class OutdatedReport:
+    nb_venvs: int = 0
+    packages: List[OutdatedPackage] = field(default_factory=list)
+    nb_from_cache: int = 0
+
+
+@dataclass
+class Outdated:
+    """
+    Compares the main and injected packages of the uvpipx venvs to the latest versions of the package index.
+
+    Explanation:
+    Each package is queried once on the PEP 691 json api of the index, the queries run concurrently on a small
+    pool of keep-alive connections. The responses are cached on disk and revalidated with their ETag
+    or Last-Modified, so a project page is only downloaded again when it changed.
+    """
+
+    index_url: Union[None, str] = None
+    jobs: Union[None, int] = None
+    state_index: Union[None, StateIndex] = None
+    client: Union[None, HttpClient] = None
+
+    def __post_init__(self) -> None:
+        self.logger = get_logger("outdated")
+        self.index_url_ = (self.index_url or config.uvpipx_index_url).rstrip("/")
+        self.jobs_ = self.jobs or default_jobs()
+        self.state_index_ = self.state_index or StateIndex()
+        self.client_ = self.client or HttpClient(
+            ConnectionPool(max_size=self.jobs_),
+            HttpCache(config.uvpipx_cache / "http"),
+        )
+        self.report = OutdatedReport()
+
+    def close(self) -> None:
+        """Closes the connections of the http client, only if it was created here (not given)."""
+        if self.client is None:
+            self.client_.close()
+
+    def __enter__(self) -> Outdated:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def installed_packages(self, venv_names: Union[None, List[str]] = None) -> List[OutdatedPackage]:
+        packages = []
+        for state in self.state_index_.refresh():
+            if state.model is None or (venv_names and state.name not in venv_names):
+                continue
+            self.report.nb_venvs += 1
+
+            model = state.model
+            for spec in [model.main_package.package_name_spec] + [
+                inj.package_name_spec for inj in model.injected_packages.values()
+            ]:
+                try:
+                    name = Requirement.from_str(spec).name
+                except RuntimeError:  # a path or an url
+                    self.logger.log_debug(f"{spec} of {state.name} is not from an index, skipped")
+                    continue
+                if spec.startswith("git+"):
+                    self.logger.log_debug(f"{spec} of {state.name} is not from an index, skipped")
+                    continue
+                packages.append(OutdatedPackage(state.name, name, state.versions.get(normalize_name(name))))
+
+        return packages
+
+    def fetch_versions(self, name: str) -> Tuple[List[str], bool]:
+        """The versions of a project on the index, and whether the page came from the cache (not modified)."""
+        with span(f"GET {name}", cat="http"):
+            response = self.client_.get(f"{self.index_url_}/{name}/", headers={"Accept": PEP691_ACCEPT})
+
+        return project_versions(project_page(response)), response.from_cache
+
+    def run(self, venv_names: Union[None, List[str]] = None) -> OutdatedReport:
+        packages = self.installed_packages(venv_names)
+        names = sorted({normalize_name(package.package_name) for package in packages})
+
+        results = run_jobs({name: partial(self.fetch_versions, name) for name in names}, max_workers=self.jobs_)
+        versions = {result.name: result for result in results}
+        # counted here, in the main thread, from the results of the jobs
+        self.report.nb_from_cache = sum(result.ok and result.value[1] for result in results)
+        for package in packages:
+            result = versions[normalize_name(package.package_name)]
+            if not result.ok:
+                package.error = str(result.error)
+            else:
+                allow_prerelease = package.installed is not None and is_prerelease(package.installed)
+                package.latest = latest_version(result.value[0], allow_prerelease)
+        self.report.packages = packages
+
+        return self.report
+
+
+def outdated(venv_names: Union[None, List[str]] = None, jobs: Union[None, int] = None) -> OutdatedReport:
+    """
+    Shows the packages of the uvpipx venvs with a newer version on the package index.
+
+    Args:
+        venv_names (Union[None, List[str]]): Only check these venvs, all the venvs if None.
+        jobs (Union[None, int]): The number of concurrent queries (and of pooled connections).
+
+    Returns:
+        OutdatedReport: The report, with the installed and latest version of each package.
+    """
+    logger = get_logger("outdated")
+
+    with Outdated(jobs=jobs) as checker, Elapser() as ela:
+        logger.log_info(f"🔎 Checking the packages on {checker.index_url_}\n")
+        report = checker.run(venv_names)
+
+    for package in report.packages:
+        if package.outdated or package.error:
+            logger.log_info(package.show())
+        else:
+            logger.log_debug(package.show())
+        logger.log_event(
+            events.PACKAGE_CHECKED,
+            venv=package.venv_name,
+            package=package.package_name,
+            installed=package.installed,
+            latest=package.latest,
+            outdated=package.outdated,
+            error=package.error,
+        )
+
+    nb_outdated = sum(package.outdated for package in report.packages)
+    nb_errors = sum(package.error is not None for package in report.packages)
+    if report.packages:
+        logger.log_info("")
+    logger.log_info(
+        ela.ela_str(
+            f" 📦 {len(report.packages)} packages of {report.nb_venvs} venvs checked ({report.nb_from_cache} not modified),"
+            f" {nb_outdated} outdated, {nb_errors} error(s)",
+        ),
+    )
+    if nb_outdated:
+        logger.log_info(" 💡 run uvpipx upgrade <package> or uvpipx upgrade-all to upgrade them")
+
+    return report
@@ -30,6 +30,7 @@ def run_venv_bin(
         Path.cwd(),
         cmdline,
         env=env,
+        raise_on_error=False,
         raw_pipe=True,
     )
 
@@ -0,0 +1,471 @@
+from __future__ import annotations
+
+__author__ = "Gaëtan Montury"
+__copyright__ = "Copyright (c) 2024-2025 Gaëtan Montury"
+__license__ = """GNU GENERAL PUBLIC LICENSE refer to file LICENSE in repo"""
+__version__ = "0.8.1"  # to bump
+__maintainer__ = "Gaëtan Montury"
+__email__ = "#"
+__status__ = "Development"
+
+
+import hashlib
+import json
+import os
+import sqlite3
+from contextlib import closing, contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple, Union
+
+from uvpipx import config
+from uvpipx.internal_libs.Logger import get_logger
+from uvpipx.internal_libs.tracing import span
+from uvpipx.uvpipx_metadata import installed_versions, site_packages_dirs
+from uvpipx.UvPipxModels import UvPipVenvNotReady, UvPipxModel, to_dict
+from uvpipx.UvPipxModelsUpgrader import check_and_upgrade
+
+# The index is only a cache of the uvpipx.json of each venv (the source of truth).
+# When the schema change, the index is dropped and rebuilt.
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS venv (
+    venv_path TEXT PRIMARY KEY,
+    venvs_dir TEXT NOT NULL,
+    name TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    site_packages TEXT,
+    model_json TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS venv_venvs_dir ON venv (venvs_dir);
+CREATE TABLE IF NOT EXISTS installed_package (
+    venv_path TEXT NOT NULL,
+    name TEXT NOT NULL,
+    version TEXT NOT NULL,
+    PRIMARY KEY (venv_path, name)
+);
+CREATE TABLE IF NOT EXISTS exposed_app (
+    venv_path TEXT NOT NULL,
+    app_key TEXT NOT NULL,
+    bin_app_name TEXT NOT NULL,
+    exposed_app_path TEXT NOT NULL,
+    exposed_name TEXT NOT NULL,
+    PRIMARY KEY (venv_path, app_key)
+);
+CREATE INDEX IF NOT EXISTS exposed_app_exposed_name ON exposed_app (exposed_name);
+CREATE TABLE IF NOT EXISTS dedup_venv (
+    venv_path TEXT PRIMARY KEY,
+    root TEXT NOT NULL,
+    fingerprint TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dedup_file (
+    root TEXT NOT NULL,
+    rel_path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    ino INTEGER NOT NULL,
+    dev INTEGER NOT NULL,
+    mode INTEGER NOT NULL,
+    nlink INTEGER NOT NULL,
+    digest TEXT,
+    PRIMARY KEY (root, rel_path)
+);
+"""
+
+
+def read_venv_model(venv_path: Path, package_name: str) -> UvPipxModel:
+    """
+    Reads (and upgrades if needed) the uvpipx.json of a venv.
+
+    Args:
+        venv_path (Path): The path of the uvpipx venv.
+        package_name (str): The package name, used in error messages.
+
+    Returns:
+        UvPipxModel: The model of the venv.
+
+    Raises:
+        UvPipVenvNotReady: If the venv or its uvpipx.json does not exist or is not valid.
+    """
+    if not (venv_path / ".venv").exists():
+        msg = f"🔴 {package_name} not exist (path {venv_path})"
+        raise UvPipVenvNotReady(msg)
+
+    if not (venv_path / "uvpipx.json").exists():
+        msg = f"🔴 {package_name} not exist (path {venv_path})"
+        raise UvPipVenvNotReady(msg)
+
+    with (venv_path / "uvpipx.json").open("r") as infile:
+        file_dict = json.load(
+            infile,
+        )
+
+    current_vers_dict, upgraded = check_and_upgrade(file_dict)
+    if current_vers_dict is None:
+        msg = "Bad venv, please unistall and install again"
+        raise UvPipVenvNotReady(msg)
+
+    uvpipx_cfg = UvPipxModel.from_dict(current_vers_dict)
+
+    if upgraded:
+        uvpipx_cfg.save_json("uvpipx.json")
+
+    return uvpipx_cfg
+
+
+def _stat_token(path: Union[None, str, Path]) -> str:
+    if path is None:
+        return "-"
+    try:
+        st = os.stat(path)  # noqa: PTH116  # faster than building a Path
+    except OSError:
+        return "-"
+    return f"{st.st_mtime_ns}/{st.st_size}/{st.st_ino}"
+
+
+def _content_token(path: Path) -> str:
+    try:
+        with path.open("rb") as infile:
+            return hashlib.blake2b(infile.read(), digest_size=16).hexdigest()
+    except OSError:
+        return "-"
+
+
+def venv_fingerprint(venv_path: Path, site_packages: Union[None, str]) -> str:
+    """
+    Computes a fingerprint of a venv from the content of its uvpipx.json and the stat of its site-packages.
+
+    Explanation:
+    uvpipx.json is small and saved by every install, upgrade, inject and expose, so its content is hashed:
+    unlike its stat, a rewrite of the same size within one mtime tick (coarse-mtime filesystems) is seen.
+    A package installed or uninstalled outside of uvpipx (a dist-info directory created or removed)
+    changes the stat of site-packages.
+
+    Args:
+        venv_path (Path): The path of the uvpipx venv.
+        site_packages (Union[None, str]): The site-packages directory of the venv, if known.
+
+    Returns:
+        str: The fingerprint.
+    """
+    return f"{_content_token(venv_path / 'uvpipx.json')}|{_stat_token(site_packages)}"
+
+
+@dataclass
+class VenvState:
+    venv_path: Path
+    fingerprint: str
+    site_packages: Union[None, str] = None
+    model: Union[None, UvPipxModel] = None
+    versions: Dict[str, str] = field(default_factory=dict)
+    error: Union[None, str] = None
+
+    @property
+    def name(self) -> str:
+        return self.venv_path.name
+
+
+@dataclass
+class ExposedApp:
+    venv_name: str
+    bin_app_name: str
+    exposed_app_path: str
+
+
+@dataclass
+class StateIndex:
+    """
+    SQLite index of all the uvpipx venvs: model, exposed apps, installed versions and fingerprint.
+
+    Explanation:
+    Each access checks the fingerprint of the venv (a hash of its small uvpipx.json and a stat of its site-packages)
+    and only parses again the model and the installed versions of the venv when it changed.
+    The per-venv uvpipx.json stays the source of truth, so the database can be deleted at any time.
+    """
+
+    db_path: Union[None, Path] = None
+    venvs_dir: Union[None, Path] = None
+
+    def __post_init__(self) -> None:
+        self.db_path_ = self.db_path or config.uvpipx_state_db
+        self.venvs_dir_ = self.venvs_dir or config.uvpipx_venvs
+
+    @contextmanager
+    def connect(self) -> Iterator[sqlite3.Connection]:
+        self.db_path_.parent.mkdir(parents=True, exist_ok=True)
+        with closing(sqlite3.connect(str(self.db_path_), timeout=30)) as con:
+            if con.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                for (table,) in con.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall():
+                    con.execute(f"DROP TABLE IF EXISTS {table}")  # nosec: B608 # noqa: S608
+                con.executescript(SCHEMA)
+                con.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            with con:
+                yield con
+
+    def _get(self, con: sqlite3.Connection, venv_path: Path) -> Union[None, VenvState]:
+        row = con.execute(
+            "SELECT fingerprint, site_packages, model_json, error FROM venv WHERE venv_path = ?",
+            (str(venv_path),),
+        ).fetchone()
+        if row is None:
+            return None
+
+        return self._state_from_row(con, venv_path, row)
+
+    def _state_from_row(self, con: sqlite3.Connection, venv_path: Path, row: Tuple[Any, ...]) -> VenvState:
+        fingerprint, site_packages, model_json, error = row
+        model = UvPipxModel.from_dict(json.loads(model_json)) if model_json else None
+        versions = dict(
+            con.execute(
+                "SELECT name, version FROM installed_package WHERE venv_path = ?",
+                (str(venv_path),),
+            ).fetchall(),
+        )
+        return VenvState(venv_path, fingerprint, site_packages, model, versions, error)
+
+    def _read(self, venv_path: Path, package_name: str) -> VenvState:
+        site_packages_l = site_packages_dirs(venv_path)
+        site_packages = str(site_packages_l[0]) if site_packages_l else None
+        state = VenvState(venv_path, "", site_packages)
+        try:
+            state.model = read_venv_model(venv_path, package_name)
+            state.versions = installed_versions(venv_path) or {}
+        except (UvPipVenvNotReady, ValueError, KeyError) as e:
+            state.error = str(e)
+        # computed after the read, because read_venv_model can upgrade uvpipx.json
+        state.fingerprint = venv_fingerprint(venv_path, site_packages)
+
+        return state
+
+    def _store(self, con: sqlite3.Connection, state: VenvState) -> None:
+        venv_path = str(state.venv_path)
+        self._delete(con, venv_path)
+        con.execute(
+            "INSERT INTO venv VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                venv_path,
+                str(state.venv_path.parent),
+                state.name,
+                state.fingerprint,
+                state.site_packages,
+                json.dumps(to_dict(state.model), default=str) if state.model else None,
+                state.error,
+            ),
+        )
+        con.executemany(
+            "INSERT INTO installed_package VALUES (?, ?, ?)",
+            [(venv_path, name, version) for name, version in state.versions.items()],
+        )
+        if state.model and state.model.exposed:
+            con.executemany(
+                "INSERT INTO exposed_app VALUES (?, ?, ?, ?, ?)",
+                [
+                    (venv_path, key, app.bin_app_name, app.exposed_app_path, Path(app.exposed_app_path).name)
+                    for key, app in state.model.exposed.apps.items()
+                ],
+            )
+
+    def _delete(self, con: sqlite3.Connection, venv_path: str) -> None:
+        for table in ["venv", "installed_package", "exposed_app"]:
+            con.execute(f"DELETE FROM {table} WHERE venv_path = ?", (venv_path,))  # nosec: B608 # noqa: S608
+
+    def _fresh_state(self, con: sqlite3.Connection, venv_path: Path, package_name: str) -> VenvState:
+        state = self._get(con, venv_path)
+        if state is None or state.fingerprint != venv_fingerprint(venv_path, state.site_packages):
+            state = self._read(venv_path, package_name)
+            self._store(con, state)
+
+        return state
+
+    def load(self, venv_path: Path, package_name: str) -> VenvState:
+        """
+        Returns the state of one venv, read again only if its fingerprint changed.
+
+        Args:
+            venv_path (Path): The path of the uvpipx venv.
+            package_name (str): The package name, used in error messages.
+
+        Returns:
+            VenvState: The state of the venv.
+
+        Raises:
+            UvPipVenvNotReady: If the venv is not a valid uvpipx venv.
+        """
+        try:
+            with self.connect() as con:
+                state = self._fresh_state(con, venv_path, package_name)
+        except sqlite3.Error as e:
+            get_logger().log_debug(f"uvpipx state index not usable ({e}), read {venv_path} directly")
+            state = self._read(venv_path, package_name)
+
+        if state.model is None:
+            # the cached error message is specific to the package name asked, so read again to raise the right one
+            state.model = read_venv_model(venv_path, package_name)
+
+        return state
+
+    def _venv_dirs(self) -> List[Path]:
+        if not self.venvs_dir_.exists():
+            return []
+
+        with os.scandir(self.venvs_dir_) as it:
+            return sorted(Path(entry.path) for entry in it if not entry.name.startswith(".") and entry.is_dir())
+
+    def refresh(self) -> List[VenvState]:
+        """
+        Synchronizes the index with the venvs directory and returns the state of every venv (valid or not).
+
+        Returns:
+            List[VenvState]: The states sorted by venv name.
+        """
+        return list(self.iter_refresh())
+
+    def iter_refresh(self) -> Iterator[VenvState]:
+        """
+        Like refresh, but yields the state of each venv as soon as it is known, so a caller can stream them.
+
+        Returns:
+            Iterator[VenvState]: The states sorted by venv name.
+        """
+        venv_dirs = self._venv_dirs()
+        nb_done = 0
+        try:
+            with self.connect() as con:
+                for venv_dir in venv_dirs:
+                    state = self._fresh_state(con, venv_dir, venv_dir.name)
+                    nb_done += 1
+                    con.commit()  # no write lock on the index kept while the caller handles the state
+                    yield state
+
+                known = {str(venv_dir) for venv_dir in venv_dirs}
+                for (venv_path,) in con.execute(
+                    "SELECT venv_path FROM venv WHERE venvs_dir = ?",
+                    (str(self.venvs_dir_),),
+                ).fetchall():
+                    if venv_path not in known:
+                        self._delete(con, venv_path)
+        except sqlite3.Error as e:
+            get_logger().log_debug(f"uvpipx state index not usable ({e}), read venvs directly")
+            for venv_dir in venv_dirs[nb_done:]:  # the states already yielded are not read again
+                yield self._read(venv_dir, venv_dir.name)
+
+    def update(self, venv_path: Path, package_name: str) -> None:
+        """
+        Reads again one venv in the index, after uvpipx changed it (see save_venv_model).
+
+        Args:
+            venv_path (Path): The path of the uvpipx venv.
+            package_name (str): The package name, used in error messages.
+
+        Returns:
+            None
+        """
+        try:
+            with self.connect() as con:
+                self._store(con, self._read(venv_path, package_name))
+        except sqlite3.Error as e:
+            get_logger().log_debug(f"uvpipx state index not usable ({e}), {venv_path} not updated")
+
+    def _sync_venv_dirs(self, con: sqlite3.Connection) -> None:
+        # only the venvs added or removed: one scandir of the venvs directory, no fingerprint computed
+        known = {
+            venv_path
+            for (venv_path,) in con.execute(
+                "SELECT venv_path FROM venv WHERE venvs_dir = ?",
+                (str(self.venvs_dir_),),
+            ).fetchall()
+        }
+        for venv_dir in self._venv_dirs():
+            if str(venv_dir) in known:
+                known.discard(str(venv_dir))
+            else:
+                self._store(con, self._read(venv_dir, venv_dir.name))
+        for venv_path in known:
+            self._delete(con, venv_path)
+
+    def _is_fresh(self, con: sqlite3.Connection, venv_path: str) -> bool:
+        row = con.execute("SELECT fingerprint, site_packages FROM venv WHERE venv_path = ?", (venv_path,)).fetchone()
+        return row is not None and row[0] == venv_fingerprint(Path(venv_path), row[1])
+
+    def exposed_apps(
+        self,
+        *,
+        exposed_names: Union[None, List[str]] = None,
+        exposed_paths: Union[None, List[str]] = None,
+    ) -> List[ExposedApp]:
+        """
+        Returns the apps exposed by the valid uvpipx venvs with the given names or paths, from the index.
+
+        Explanation:
+        The owners are found with one query of the stored exposed apps, then only the fingerprints of the matched
+        venvs are checked (they are read again and queried again if they changed). The venvs added or removed are
+        found with one scandir of the venvs directory, and uvpipx updates the index of every venv it changes
+        (see save_venv_model): a lookup does not depend on the number of venvs.
+
+        Args:
+            exposed_names (Union[None, List[str]]): The names of the exposed apps (in the bin dir).
+            exposed_paths (Union[None, List[str]]): The paths of the exposed apps.
+
+        Returns:
+            List[ExposedApp]: The exposed apps found, sorted by venv name.
+        """
+        by_name = exposed_names is not None
+        values = (exposed_names if by_name else exposed_paths) or []
+        if not values:
+            return []
+        column = "exposed_name" if by_name else "exposed_app_path"
+
+        try:
+            with self.connect() as con:
+                self._sync_venv_dirs(con)
+                query = (
+                    f"SELECT venv_path, bin_app_name, exposed_app_path FROM exposed_app WHERE {column} IN "  # nosec: B608 # noqa: S608
+                    f"({', '.join('?' * len(values))})"
+                )
+                rows = con.execute(query, values).fetchall()
+                changed = [venv_path for venv_path in {row[0] for row in rows} if not self._is_fresh(con, venv_path)]
+                for venv_path in changed:
+                    self._store(con, self._read(Path(venv_path), Path(venv_path).name))
+                if changed:
+                    rows = con.execute(query, values).fetchall()
+        except sqlite3.Error as e:
+            get_logger().log_debug(f"uvpipx state index not usable ({e}), read venvs directly")
+            rows = [
+                (str(state.venv_path), app.bin_app_name, app.exposed_app_path)
+                for state in self.refresh()
+                if state.model and state.model.exposed
+                for app in state.model.exposed.apps.values()
+                if (Path(app.exposed_app_path).name if by_name else app.exposed_app_path) in values
+            ]
+
+        return sorted(
+            (ExposedApp(Path(venv_path).name, bin_app_name, path) for venv_path, bin_app_name, path in rows),
+            key=lambda app: (app.venv_name, app.exposed_app_path),
+        )
+
+    def venv_names(self) -> List[str]:
+        """
+        Returns the names of the valid uvpipx venvs.
+
+        Returns:
+            List[str]: The sorted venv names.
+        """
+        return [state.name for state in self.refresh() if state.model is not None]
+
+
+def save_venv_model(model: UvPipxModel, state_index: Union[None, StateIndex] = None) -> None:
+    """
+    Saves the uvpipx.json of a venv changed by uvpipx, and its entry of the state index.
+
+    Args:
+        model (UvPipxModel): The model of the venv.
+        state_index (Union[None, StateIndex]): The state index, the default one if None.
+
+    Returns:
+        None
+    """
+    with span("save json"):
+        model.save_json("uvpipx.json")
+    (state_index or StateIndex()).update(model.venv.uvpipx_path(), model.main_package.package_name)
@@ -0,0 +1,333 @@
+from __future__ import annotations
+
+__author__ = "Gaëtan Montury"
+__copyright__ = "Copyright (c) 2024-2025 Gaëtan Montury"
+__license__ = """GNU GENERAL PUBLIC LICENSE refer to file LICENSE in repo"""
+__version__ = "0.8.1"  # to bump
+__maintainer__ = "Gaëtan Montury"
+__email__ = "#"
+__status__ = "Development"
+
+
+import hashlib
+import os
+import shutil
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterator, List, Tuple, Union
+
+import uvpipx.platform
+from uvpipx import config
+from uvpipx.internal_libs.Logger import get_logger
+from uvpipx.internal_libs.misc import Elapser, exec_run
+from uvpipx.internal_libs.tracing import span
+from uvpipx.uvpipx_core import UvPipxVenv
+from uvpipx.uvpipx_trash import move_to_trash, spawn_reaper
+from uvpipx.uvpipx_uv import UvSummary, record_uv_summary, run_uv
+from uvpipx.UvPipxModels import UvPipxVenvModel
+
+# An entry of the store is <store>/<key>/ with:
+#   .venv/             the venv shared by all the uvpipx venvs with the same lock and interpreter
+#   requirements.lock  the resolved requirements installed in .venv
+#   interpreter.txt    the identity of the interpreter of .venv
+#   refs/              one file per uvpipx venv using the entry (reference counting)
+#   complete           written when .venv is fully installed
+# and the .venv of each uvpipx venv using it is a symlink to <store>/<key>/.venv
+LOCK_FILE = "requirements.lock"
+INTERPRETER_FILE = "interpreter.txt"
+REFS_DIR = "refs"
+COMPLETE_FILE = "complete"
+
+INTERPRETER_ID_CODE = (
+    "import sys, sysconfig; print(sys.implementation.cache_tag, sysconfig.get_platform(), sys.version.split()[0], "
+    "sys.base_prefix)"
+)
+
+
+def store_enabled() -> bool:
+    if config.uvpipx_store is None:
+        return False
+
+    if uvpipx.platform.sys_platform == "win":
+        get_logger().log_warn(" ⚠️  UVPIPX_STORE is ignored on windows (a venv is linked with a directory symlink)")
+        return False
+
+    return True
+
+
+def store_entry_of(venv_path: Path) -> Union[None, Path]:
+    """
+    Returns the store entry used by a uvpipx venv, None when its .venv is not a symlink to a store entry.
+
+    Args:
+        venv_path (Path): The path of the uvpipx venv.
+
+    Returns:
+        Union[None, Path]: The store entry directory.
+    """
+    dot_venv = venv_path / ".venv"
+    if not dot_venv.is_symlink():
+        return None
+
+    entry = Path(os.readlink(dot_venv)).parent  # noqa: PTH115
+    if not (entry / COMPLETE_FILE).exists():
+        return None
+
+    return entry
+
+
+def _ref_name(venv_path: Path) -> str:
+    return hashlib.sha256(str(venv_path).encode("utf-8")).hexdigest()[:16]
+
+
+@contextmanager
+def _locked(lock_path: Path) -> Iterator[None]:
+    """
+    Holds an exclusive lock on lock_path, the holder may remove lock_path (see VenvStore.release).
+
+    Explanation:
+    A process waiting on a lock file removed meanwhile would lock a file no one else sees,
+    so the lock is taken again until the locked file is still the one at lock_path.
+    """
+    import fcntl  # noqa: PLC0415  # unix only, the store is not used on windows
+
+    while True:
+        with lock_path.open("a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                try:
+                    locked_current = os.stat(lock_path).st_ino == os.fstat(lock_file.fileno()).st_ino  # noqa: PTH116
+                except FileNotFoundError:
+                    locked_current = False
+                if locked_current:
+                    yield
+                    return
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+@dataclass
+class VenvStore:
+    """
+    Content-addressed store of venvs: uvpipx venvs resolving to the same lock with the same interpreter share one venv.
+
+    Explanation:
+    The key of an entry is a hash of the resolved requirements (uv pip compile) and of the interpreter identity.
+    A uvpipx venv uses an entry through its .venv symlink and a reference file, an entry is freed (moved to the trash)
+    when its last reference is released. A change of the packages (upgrade, inject, uninject) never modifies an entry,
+    the uvpipx venv is linked to the entry of its new lock instead.
+    """
+
+    store_dir: Path
+
+    def __post_init__(self) -> None:
+        self.store_dir = self.store_dir.absolute()  # the .venv symlinks must be absolute
+        self.logger = get_logger("store")
+
+    @classmethod
+    def of_venv(cls, venv_path: Path) -> Union[None, VenvStore]:
+        """Returns the store of a uvpipx venv, None if the venv is not in a store."""
+        entry = store_entry_of(venv_path)
+        return None if entry is None else cls(entry.parent)
+
+    @classmethod
+    def for_install(cls, venv_path: Path) -> Union[None, VenvStore]:
+        """Returns the store to use to (re)install a uvpipx venv: its current store or the configured one."""
+        store = cls.of_venv(venv_path)
+        if store is None and store_enabled() and config.uvpipx_store:
+            store = cls(config.uvpipx_store)
+        return store
+
+    def find_python(self) -> Tuple[str, str]:
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        # run outside of any venv, to find the interpreter uv would use to create one
+        _, python, _ = exec_run(["uv", "python", "find", "--system"], cwd=self.store_dir, raise_on_error=True)
+        _, interpreter_id, _ = exec_run([python.strip(), "-c", INTERPRETER_ID_CODE], raise_on_error=True)
+
+        return python.strip(), interpreter_id.strip()
+
+    def resolve(
+        self,
+        venv_path: Path,
+        packages_name_spec: List[str],
+        python: str,
+        wheelhouse: Union[None, Path] = None,
+    ) -> str:
+        requirements_in = venv_path / "requirements.in"
+        requirements_in.write_text("".join(f"{spec}\n" for spec in packages_name_spec))
+        opt = ["--no-index", "--find-links", str(wheelhouse)] if wheelhouse else []
+        lock_lines: List[str] = []
+
+        def on_output(stream_name: str, line: str) -> None:
+            if stream_name == "stdout":
+                lock_lines.append(line)
+
+        with Elapser() as ela:
+            run_uv(
+                [
+                    "uv",
+                    "pip",
+                    "compile",
+                    str(requirements_in),
+                    "--python",
+                    python,
+                    "--no-header",
+                    "--no-annotate",
+                    "--quiet",
+                    *opt,
+                ],
+                cwd=self.store_dir,
+                on_output=on_output,
+            )
+        # quiet, so the resolve phase is timed here, by the number of pinned packages
+        summary = UvSummary()
+        summary.add("resolve", sum(1 for line in lock_lines if "==" in line), ela.interval_seconds)
+        record_uv_summary(summary)
+
+        return "".join(f"{line}\n" for line in lock_lines)
+
+    def entry_key(self, lock: str, interpreter_id: str) -> str:
+        return hashlib.sha256(f"{interpreter_id}\n{lock}".encode()).hexdigest()[:32]
+
+    def refs(self, entry: Path) -> List[str]:
+        refs_dir = entry / REFS_DIR
+        if not refs_dir.is_dir():
+            return []
+
+        return sorted(ref.name for ref in refs_dir.iterdir())
+
+    def _build_entry(
+        self,
+        entry: Path,
+        lock: str,
+        python: str,
+        interpreter_id: str,
+        on_output: Union[None, Callable[[str, str], None]],
+        wheelhouse: Union[None, Path],
+    ) -> None:
+        if entry.exists():  # an interrupted build
+            shutil.rmtree(entry)
+        entry.mkdir(parents=True)
+        (entry / LOCK_FILE).write_text(lock)
+        (entry / INTERPRETER_FILE).write_text(f"{interpreter_id}\n")
+
+        entry_venv = UvPipxVenv(entry)
+        entry_venv.create_venv_if_need(python=python)
+        entry_venv.install(["-r", str(entry / LOCK_FILE)], on_output=on_output, wheelhouse=wheelhouse)
+        (entry / COMPLETE_FILE).touch()
+
+    def materialize(
+        self,
+        venv_path: Path,
+        packages_name_spec: List[str],
+        *,
+        on_output: Union[None, Callable[[str, str], None]] = None,
+        wheelhouse: Union[None, Path] = None,
+    ) -> Tuple[Path, List[Path]]:
+        """
+        Links the uvpipx venv to the store entry of the packages, the entry is built only if it does not exist yet.
+
+        Args:
+            venv_path (Path): The path of the uvpipx venv.
+            packages_name_spec (List[str]): All the packages of the venv (main and injected).
+            on_output (Union[None, Callable[[str, str], None]]): Called with each output line of uv.
+            wheelhouse (Union[None, Path]): Resolve and install only from this wheelhouse.
+
+        Returns:
+            Tuple[Path, List[Path]]: The store entry, and the trash directories to empty (previous entry freed).
+        """
+        venv_path.mkdir(parents=True, exist_ok=True)
+        python, interpreter_id = self.find_python()
+        with Elapser() as ela:
+            lock = self.resolve(venv_path, packages_name_spec, python, wheelhouse)
+        entry = self.store_dir / self.entry_key(lock, interpreter_id)
+        self.logger.log_info(ela.ela_str(f" 🔒 resolved {len(lock.splitlines())} packages, store entry {entry.name}"))
+
+        with _locked(self.store_dir / f"{entry.name}.lock"):
+            if (entry / COMPLETE_FILE).exists():
+                self.logger.log_info(f" ♻️  reuse store entry {entry.name} ({len(self.refs(entry))} reference(s))")
+            else:
+                self._build_entry(entry, lock, python, interpreter_id, on_output, wheelhouse)
+            (entry / REFS_DIR).mkdir(exist_ok=True)
+            (entry / REFS_DIR / _ref_name(venv_path)).write_text(str(venv_path))
+
+        trash_dirs = []
+        previous_entry = store_entry_of(venv_path)
+        if previous_entry != entry:
+            trash_dirs = self._link(venv_path, entry)
+            if previous_entry is not None:
+                trash_dirs += VenvStore(previous_entry.parent).release(venv_path, previous_entry)
+
+        return entry, trash_dirs
+
+    @span("store link")
+    def link_venv(
+        self,
+        venv_model: UvPipxVenvModel,
+        packages_name_spec: List[str],
+        *,
+        on_output: Union[None, Callable[[str, str], None]] = None,
+        wheelhouse: Union[None, Path] = None,
+    ) -> Path:
+        """
+        Materializes the packages in the store for a uvpipx venv, and records the store entry in its model.
+
+        Args:
+            venv_model (UvPipxVenvModel): The model of the uvpipx venv (its store_entry is updated).
+            packages_name_spec (List[str]): All the packages of the venv (main and injected).
+            on_output (Union[None, Callable[[str, str], None]]): Called with each output line of uv.
+            wheelhouse (Union[None, Path]): Resolve and install only from this wheelhouse.
+
+        Returns:
+            Path: The store entry.
+        """
+        entry, trash_dirs = self.materialize(
+            venv_model.uvpipx_path(),
+            packages_name_spec,
+            on_output=on_output,
+            wheelhouse=wheelhouse,
+        )
+        venv_model.store_entry = str(entry)
+        if trash_dirs:
+            spawn_reaper(trash_dirs)
+
+        return entry
+
+    def _link(self, venv_path: Path, entry: Path) -> List[Path]:
+        dot_venv = venv_path / ".venv"
+        trash_dirs = []
+        if dot_venv.exists() and not dot_venv.is_symlink():  # a venv not in the store yet
+            trash_dirs.append(move_to_trash(dot_venv))
+
+        tmp_link = venv_path / f".venv.tmp-{os.getpid()}"
+        tmp_link.symlink_to(entry / ".venv", target_is_directory=True)
+        tmp_link.replace(dot_venv)
+
+        return trash_dirs
+
+    def release(self, venv_path: Path, entry: Union[None, Path] = None) -> List[Path]:
+        """
+        Releases the reference of a uvpipx venv to its store entry, the entry is moved to the trash if not used anymore.
+
+        Args:
+            venv_path (Path): The path of the uvpipx venv.
+            entry (Union[None, Path]): The store entry. Default is the entry the .venv of the venv links to.
+
+        Returns:
+            List[Path]: The trash directories to empty.
+        """
+        entry_ = entry or store_entry_of(venv_path)
+        if entry_ is None:
+            return []
+
+        lock_path = self.store_dir / f"{entry_.name}.lock"
+        with _locked(lock_path):
+            (entry_ / REFS_DIR / _ref_name(venv_path)).unlink(missing_ok=True)
+            if self.refs(entry_):
+                return []
+
+            self.logger.log_info(f" 🗑️  free store entry {entry_.name}")
+            trash_dir = move_to_trash(entry_)
+            lock_path.unlink(missing_ok=True)  # still locked, see _locked
+            return [trash_dir]
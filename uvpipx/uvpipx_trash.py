@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+__author__ = "Gaëtan Montury"
+__copyright__ = "Copyright (c) 2024-2025 Gaëtan Montury"
+__license__ = """GNU GENERAL PUBLIC LICENSE refer to file LICENSE in repo"""
+__version__ = "0.8.1"  # to bump
+__maintainer__ = "Gaëtan Montury"
+__email__ = "#"
+__status__ = "Development"
+
+
+import errno
+import os
+import shutil
+import subprocess  # nosec: B404  # noqa: S404
+import sys
+import time
+from pathlib import Path
+from typing import List, Union
+
+import uvpipx.platform
+from uvpipx import config
+from uvpipx.internal_libs.Logger import get_logger
+from uvpipx.internal_libs.parallel import JobResult, run_jobs
+
+# Used when the venv is not on the same filesystem than uvpipx_home (a rename is only atomic on one filesystem)
+SIBLING_TRASH_NAME = ".uvpipx-trash"
+
+
+def move_to_trash(path: Path, trash_dir: Union[None, Path] = None) -> Path:
+    """
+    Moves a directory into the trash with an atomic rename, so it disappears at once whatever its size.
+
+    Explanation:
+    The trash is uvpipx_trash (under uvpipx_home). When the directory is on another filesystem,
+    a sibling .uvpipx-trash directory is used instead, to keep the rename atomic and cheap.
+
+    Args:
+        path (Path): The directory to remove.
+        trash_dir (Union[None, Path]): The trash directory. Default is config.uvpipx_trash.
+
+    Returns:
+        Path: The trash directory used (to give to the reaper).
+    """
+    trash_dir_ = trash_dir or config.uvpipx_trash
+    trash_name = f"{path.name}-{time.time_ns()}-{os.getpid()}"
+
+    trash_dir_.mkdir(parents=True, exist_ok=True)
+    try:
+        path.rename(trash_dir_ / trash_name)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        trash_dir_ = path.parent / SIBLING_TRASH_NAME
+        trash_dir_.mkdir(exist_ok=True)
+        path.rename(trash_dir_ / trash_name)
+
+    return trash_dir_
+
+
+def _remove_tree(path: Path) -> None:
+    # another reaper can delete the same entry at the same time, what is left is removed by the next one
+    shutil.rmtree(path, ignore_errors=True)
+
+
+def empty_trash(trash_dirs: List[Path], jobs: Union[None, int] = None) -> List[JobResult]:
+    """
+    Deletes in parallel all the entries of the trash directories.
+
+    Args:
+        trash_dirs (List[Path]): The trash directories.
+        jobs (Union[None, int]): The number of parallel deletions. Default is based on the CPU count.
+
+    Returns:
+        List[JobResult]: The result of the deletion of each entry.
+    """
+    entries: List[Path] = []
+    for trash_dir in dict.fromkeys(trash_dirs):
+        if trash_dir.is_dir():
+            with os.scandir(trash_dir) as it:
+                entries.extend(Path(entry.path) for entry in it)
+
+    return run_jobs(
+        {str(entry): lambda entry=entry: _remove_tree(entry) for entry in entries},
+        max_workers=jobs,
+    )
+
+
+def spawn_reaper(trash_dirs: List[Path]) -> None:
+    """
+    Starts a detached process that empties the trash directories, the current command does not wait for it.
+
+    Args:
+        trash_dirs (List[Path]): The trash directories.
+
+    Returns:
+        None
+    """
+    kwargs = {}
+    if uvpipx.platform.sys_platform == "win":
+        kwargs["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP  # type: ignore[attr-defined]
+    else:
+        kwargs["start_new_session"] = True
+
+    try:
+        subprocess.Popen(  # nosec: B603  # noqa: S603
+            [sys.executable, "-m", "uvpipx.uvpipx_trash", *[str(d) for d in dict.fromkeys(trash_dirs)]],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            close_fds=True,
+            **kwargs,
+        )
+    except OSError as e:
+        get_logger().log_warn(f" ⚠️  Unable to start the trash reaper ({e}), empty it now")
+        empty_trash(trash_dirs)
+
+
+if __name__ == "__main__":
+    empty_trash([Path(arg) for arg in sys.argv[1:]])
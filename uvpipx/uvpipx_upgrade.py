@@ -2,10 +2,21 @@
 
 from __future__ import annotations
 
-import difflib
-
-from uvpipx.internal_libs.Logger import get_logger
+import json
+import time
+
+from uvpipx import uvpipx_events as events
+from uvpipx.internal_libs.Logger import Logger, get_logger
+from uvpipx.internal_libs.pep440 import VersionsDiff, diff_versions, parse_version
+from uvpipx.req_spec import Requirement
+from uvpipx.uvpipx_core import UvPipxVenv, log_uv_output
+from uvpipx.uvpipx_expose import reexpose_changed
+from uvpipx.uvpipx_metadata import normalize_name
+from uvpipx.uvpipx_state import save_venv_model
+from uvpipx.uvpipx_store import VenvStore
+from uvpipx.uvpipx_uv import uv_operation
 from uvpipx.uvpipx_venv_load import uvpipx_load_venv
+from uvpipx.UvPipxModels import UvPipxModel
 
 __author__ = "Gaëtan Montury"
 __copyright__ = "Copyright (c) 2024-2025 Gaëtan Montury"
@@ -16,32 +27,158 @@ __email__ = "#"
 __status__ = "Development"
 
 
-from typing import Union
+from pathlib import Path
+from typing import Dict, List, Union
 
 from uvpipx.internal_libs.misc import (
     Elapser,
+    human_duration,
 )
 
 # TODO review code at this point
 
 
+def exact_pins(packages_name_spec: List[str]) -> Union[None, Dict[str, str]]:
+    """
+    Returns the pinned version of each package spec, if all of them are exact pins.
+
+    Explanation:
+    Only a single "==" (or "===") specifier without wildcard is an exact pin. A range, a marker,
+    a git or a path spec can not be checked without uv, so None is returned.
+
+    Args:
+        packages_name_spec (List[str]): The package specs (for example ["jc==1.25.2", "art==6.2"]).
+
+    Returns:
+        Union[None, Dict[str, str]]: The pinned version by normalized package name, None if a spec is not an exact pin.
+    """
+    pins = {}
+    for package_name_spec in packages_name_spec:
+        try:
+            req = Requirement.from_str(package_name_spec)
+        except RuntimeError:  # a path or an url
+            return None
+
+        specifiers = req.version_specifiers or []
+        if len(specifiers) != 1 or not specifiers[0].startswith("==") or "*" in specifiers[0]:
+            return None
+        if req.environment_marker or package_name_spec.startswith("git+"):
+            return None
+        pins[normalize_name(req.name)] = specifiers[0].lstrip("=").strip()
+
+    return pins
+
+
+def pin_satisfied(pin: str, installed: Union[None, str]) -> bool:
+    """Tells if an installed version matches an exact pin, like ==1.0 matches 1.0.0 and 1.0+local."""
+    if installed is None:
+        return False
+
+    pin_version, installed_version = parse_version(pin), parse_version(installed)
+    if pin_version is None or installed_version is None:
+        return pin == installed
+    if pin_version.local is None:
+        installed_version = installed_version.public
+
+    return installed_version == pin_version
+
+
+def pins_satisfied(venv: UvPipxVenv, packages_name_spec: List[str]) -> bool:
+    """Tells if all the package specs are exact pins of the installed versions, so uv has nothing to upgrade."""
+    pins = exact_pins(packages_name_spec)
+    if pins is None:
+        return False
+
+    installed = venv.installed_versions()
+    return all(pin_satisfied(version, installed.get(name)) for name, version in pins.items())
+
+
+def write_diffs_json(json_path: Path, diffs: Dict[str, VersionsDiff]) -> None:
+    """Writes the changes of the upgraded venvs as json, by venv name."""
+    with json_path.open("w") as outfile:
+        json.dump({name: diff.to_dict() for name, diff in sorted(diffs.items())}, outfile, indent=4)
+
+
 def upgrade(
     package_name: str,
     *,
     name_override: Union[None, str] = None,
-) -> None:
+    wheelhouse: Union[None, Path] = None,
+    min_interval: Union[None, float] = None,
+) -> VersionsDiff:
     logger = get_logger("upgrade")
 
     venv_model, venv = uvpipx_load_venv(package_name, name_override)
     logger.log_info(f"⬆️  Upgrade {package_name}\n")
 
-    old_vers = sorted(venv.installed_package())
+    with uv_operation(logger, events.UPGRADE, venv=venv.venv_path.name) as result:
+        diff = upgrade_venv(venv_model, venv, logger, wheelhouse=wheelhouse, min_interval=min_interval)
+        if diff is None:
+            result["status"] = "skipped"
+            return VersionsDiff()
+        result["diff"] = diff.to_dict()
+
+    return diff
+
+
+def upgrade_venv(
+    venv_model: UvPipxModel,
+    venv: UvPipxVenv,
+    logger: Logger,
+    *,
+    wheelhouse: Union[None, Path] = None,
+    min_interval: Union[None, float] = None,
+) -> Union[None, VersionsDiff]:
+    """
+    Upgrades the packages of a loaded uvpipx venv.
+
+    Args:
+        venv_model (UvPipxModel): The model of the venv, saved with the upgrade time.
+        venv (UvPipxVenv): The venv.
+        logger (Logger): The logger of the upgrade.
+        wheelhouse (Union[None, Path]): The directory of wheels to install from.
+        min_interval (Union[None, float]): Skip the upgrade if the last one is more recent, in seconds.
+
+    Returns:
+        Union[None, VersionsDiff]: The changes of the installed packages, None if the upgrade is skipped.
+    """
+    now = time.time()
+    if min_interval is not None and venv_model.last_upgrade is not None:
+        age = now - venv_model.last_upgrade
+        if 0 <= age < min_interval:
+            logger.log_info(
+                f" ⏭️  upgraded {human_duration(age)} ago, less than --min-interval {human_duration(min_interval)}: skipped\n",
+            )
+            return None
+
     package_name_spec = [venv_model.main_package.package_name_spec]
     inject_name_spec = [inj.package_name_spec for inj in venv_model.injected_packages.values()]
+    if pins_satisfied(venv, package_name_spec + inject_name_spec):
+        logger.log_info(" ⭕ all packages are pinned to their installed version, nothing to upgrade\n")
+        venv_model.last_upgrade = now
+        save_venv_model(venv_model)
+        return None
+
+    old_versions = venv.installed_versions()
     upd_name_spec = " ".join(package_name_spec + inject_name_spec)
 
+    store = VenvStore.of_venv(venv.venv_path)
     with Elapser() as ela:
-        venv.install(package_name_spec + inject_name_spec, allow_upgrade=True)
+        if store is None:
+            venv.install(
+                package_name_spec + inject_name_spec,
+                allow_upgrade=True,
+                on_output=log_uv_output(logger),
+                wheelhouse=wheelhouse,
+            )
+        else:  # a new resolution, so the newest versions, linked to their store entry
+            store.link_venv(
+                venv_model.venv,
+                package_name_spec + inject_name_spec,
+                on_output=log_uv_output(logger),
+                wheelhouse=wheelhouse,
+            )
+            save_venv_model(venv_model)
     logger.log_info(
         ela.ela_str(
             f" 📥 uv pip install {upd_name_spec} in uvpipx venv {venv_model.venv.name()}",
@@ -52,22 +189,17 @@ def upgrade(
         f" 🟢 uvpipx venv {venv.venv_path.name} with {venv_model.main_package.package_name} ready",
     )
 
-    new_vers = sorted(venv.installed_package())
-
-    diff_vers = [
-        n for n in difflib.ndiff([str(s) for s in old_vers], [str(s) for s in new_vers]) if n[:2] in ["+ ", "- "]
-    ]
-
-    if diff_vers:
+    diff = diff_versions(old_versions, venv.installed_versions())
+    if diff:
         logger.log_info("\n 🏗️  changes")
-        logger.log_info("\n".join(f"   {n}" for n in diff_vers))
+        logger.log_info("\n".join(f"   {line}" for line in diff.lines()))
     else:
         logger.log_info("\n ⭕ no change")
 
     logger.log_info("")
 
-    # with (pck_venv / "uvpipx.json").open("w") as outfile:
-    #     json.dump(uvpipx_dict, outfile, indent=4, default=str)
+    reexpose_changed(venv_model, venv, logger)
+    venv_model.last_upgrade = now
+    save_venv_model(venv_model)
 
-    # logger.log_info(" 🎯 Re-Exposing program change")
-    # relink_bins(package_name, expose_bin_names=expose_bin_names_, venv_name=venv_name)
+    return diff
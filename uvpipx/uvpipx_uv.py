@@ -1,8 +1,256 @@
 from __future__ import annotations
 
-from uvpipx.internal_libs.misc import shell_run
+import re
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Union
+
+from uvpipx import uvpipx_events as events
+from uvpipx.internal_libs.Logger import Logger, get_logger
+from uvpipx.internal_libs.misc import ChildUsage, Elapser, StreamRunner, exec_run, stream_run
+from uvpipx.internal_libs.tracing import span
+from uvpipx.uvpipx_history import record_operation
+
+# the summary lines of uv, like "Resolved 12 packages in 340ms" or "Bytecode compiled 812 files in 1.02s"
+RE_UV_SUMMARY = re.compile(
+    r"^(?P<verb>Resolved|Prepared|Installed|Uninstalled|Checked|Audited|Bytecode compiled)"
+    r" (?P<count>\d+) (?:packages?|files?) in (?P<duration>.+?)\s*$",
+)
+RE_UV_DURATION = re.compile(r"(?P<value>\d+(?:\.\d+)?)\s*(?P<unit>ms|s|m|h)\b")
+RE_ANSI = re.compile(r"\x1b\[[0-9;]*m")
+UV_PHASES = {
+    "Resolved": "resolve",
+    "Prepared": "prepare",
+    "Installed": "install",
+    "Uninstalled": "uninstall",
+    "Checked": "check",
+    "Audited": "check",
+    "Bytecode compiled": "compile",
+}
+UV_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
 
 
 def uv_get_version() -> str:
-    rc, stdout, stderr = shell_run("uv --version")
+    rc, stdout, stderr = exec_run(["uv", "--version"])
     return stdout.strip().removeprefix("uv").strip()
+
+
+def parse_uv_duration(duration: str) -> Union[None, float]:
+    """Parses a duration printed by uv ("340ms", "1.20s", "2m 3s") in seconds, None if not a duration."""
+    parts = RE_UV_DURATION.findall(duration)
+    if not parts:
+        return None
+
+    return sum(float(value) * UV_DURATION_UNITS[unit] for value, unit in parts)
+
+
+@dataclass
+class UvPhase:
+    count: int = 0
+    seconds: float = 0
+
+
+@dataclass
+class UvSummary:
+    """
+    The phases of one or many uv commands (resolve, prepare, install...), from the summary lines of uv.
+
+    Explanation:
+    prepare is the download and the build of the packages not in the uv cache, so the packages installed
+    but not prepared came from the cache: a cold cache shows in prepare, a slow index in resolve.
+    """
+
+    phases: Dict[str, UvPhase] = field(default_factory=dict)
+    nb_commands: int = 0
+    usage: Union[None, ChildUsage] = None
+
+    def add(self, phase: str, count: int, seconds: float) -> None:
+        uv_phase = self.phases.setdefault(phase, UvPhase())
+        uv_phase.count += count
+        uv_phase.seconds += seconds
+
+    def feed(self, line: str) -> bool:
+        """Adds the phase of an output line of uv, returns False if the line is not a summary."""
+        match = RE_UV_SUMMARY.match(RE_ANSI.sub("", line).strip())
+        if not match:
+            return False
+        seconds = parse_uv_duration(match["duration"])
+        if seconds is None:
+            return False
+
+        self.add(UV_PHASES[match["verb"]], int(match["count"]), seconds)
+        return True
+
+    def merge(self, other: UvSummary) -> None:
+        for phase, uv_phase in other.phases.items():
+            self.add(phase, uv_phase.count, uv_phase.seconds)
+        self.nb_commands += other.nb_commands
+        if other.usage is not None:
+            self.usage = self.usage or ChildUsage()
+            self.usage.merge(other.usage)
+
+    @property
+    def cache_hits(self) -> int:
+        installed = self.phases.get("install", UvPhase()).count
+        prepared = self.phases.get("prepare", UvPhase()).count
+        return max(0, installed - prepared)
+
+    def to_dict(self) -> Dict[str, Any]:
+        summary: Dict[str, Any] = {
+            "phases": {
+                phase: {"count": uv_phase.count, "seconds": round(uv_phase.seconds, 6)}
+                for phase, uv_phase in self.phases.items()
+            },
+            "cache_hits": self.cache_hits,
+        }
+        if self.usage is not None:
+            summary["usage"] = self.usage.to_dict()
+        return summary
+
+    def show(self) -> str:
+        phases = [f"{phase} {p.count} in {p.seconds:.3f}s" for phase, p in self.phases.items()]
+        if "install" in self.phases:
+            phases.append(f"{self.cache_hits} from cache")
+
+        return ", ".join(phases) if phases else "no summary"
+
+    def parse_output(
+        self,
+        on_output: Union[None, Callable[[str, str], None]] = None,
+    ) -> Callable[[str, str], None]:
+        """Returns an on_output callback feeding the summary, then calling on_output."""
+        self.nb_commands += 1
+
+        def on_line(stream_name: str, line: str) -> None:
+            self.feed(line)
+            if on_output:
+                on_output(stream_name, line)
+
+        return on_line
+
+
+def run_uv(
+    argv: List[str],
+    *,
+    cwd: Union[None, Path] = None,
+    venv: Union[None, str] = None,
+    name: Union[None, str] = None,
+    on_output: Union[None, Callable[[str, str], None]] = None,
+) -> StreamRunner:
+    """
+    Runs a uv command, streaming its output to on_output and parsing its summary lines.
+
+    Explanation:
+    The phases of uv (resolve, prepare, install...) and the resources used by uv (cpu, max rss, block I/O)
+    are recorded for the operation running in this thread (see collect_uv_phases) and added to the span of
+    the command (see --trace). Each command is also shown with --verbose and emitted as a uv.finished event.
+
+    Args:
+        argv (List[str]): The uv command.
+        cwd (Union[None, Path]): The directory where uv runs (the venv for uv pip).
+        venv (Union[None, str]): The name of the venv, for the span and the event.
+        name (Union[None, str]): The name of the command, the first 3 elements of argv by default.
+        on_output (Union[None, Callable[[str, str], None]]): Called with each output line of uv.
+
+    Returns:
+        StreamRunner: The finished runner.
+    """
+    logger = get_logger("uv")
+    name_ = name or " ".join(argv[:3])
+    venv_data = {"venv": venv} if venv else {}
+    summary = UvSummary()
+    with span(name_, cat="uv", **venv_data, args=argv[3:]) as trace_span:
+        with Elapser() as ela:
+            runner = stream_run(argv, cwd=cwd, on_line=summary.parse_output(on_output), raise_on_error=False)
+
+        summary.usage = runner.usage
+        record_uv_summary(summary)
+        if trace_span is not None:
+            trace_span.args["uv"] = summary.to_dict()
+        usage_data = {"usage": runner.usage.to_dict()} if runner.usage else {}
+        if runner.usage:
+            logger.log_debug(f" 🧮 {name_}: {runner.usage.show()}   ⏱️  {ela.elapsed_second}")
+        logger.log_event(
+            events.UV_FINISHED,
+            command=name_,
+            **venv_data,
+            returncode=runner.returncode,
+            duration_s=round(ela.interval_seconds, 6),
+            **usage_data,
+        )
+        runner.check()
+
+    return runner
+
+
+_COLLECTORS = threading.local()
+
+
+def _collectors() -> List[UvSummary]:
+    collectors = getattr(_COLLECTORS, "summaries", None)
+    if collectors is None:
+        collectors = _COLLECTORS.summaries = []
+    return collectors
+
+
+def record_uv_summary(summary: UvSummary) -> None:
+    """Adds the summary of a uv command to the summaries collected in this thread (see collect_uv_phases)."""
+    for collector in _collectors():
+        collector.merge(summary)
+
+
+@contextmanager
+def collect_uv_phases(logger: Logger, result: Union[None, Dict[str, Any]] = None) -> Iterator[UvSummary]:
+    """
+    Collects the phases of the uv commands run by the block in this thread, like capture_log_entries.
+
+    Explanation:
+    Once the block is done, the phases are shown with --verbose and added to result (the data of the
+    <operation>.finished event) as "uv".
+
+    Args:
+        logger (Logger): The logger of the operation.
+        result (Union[None, Dict[str, Any]]): The data of the operation to add the phases to.
+
+    Returns:
+        Iterator[UvSummary]: The phases collected.
+    """
+    summary = UvSummary()
+    _collectors().append(summary)
+    try:
+        yield summary
+    finally:
+        _collectors().pop()  # the collectors are nested
+        if summary.nb_commands:
+            logger.log_debug(f" ⏱️  uv phases: {summary.show()}")
+            if summary.usage is not None:
+                logger.log_debug(f" 🧮 uv usage: {summary.usage.show()}")
+            if result is not None:
+                result["uv"] = summary.to_dict()
+
+
+@contextmanager
+def uv_operation(logger: Logger, operation: str, **data: Any) -> Iterator[Dict[str, Any]]:  # noqa: ANN401
+    """
+    Like Logger.operation_events, with the phases of the uv commands of the operation in its finished event.
+
+    Explanation:
+    Once done, the operation is also recorded in the history (see uvpipx stats), even if it failed.
+
+    Args:
+        logger (Logger): The logger of the operation.
+        operation (str): The operation (for example "install").
+        **data (Any): The data of the operation events (for example the venv name).
+
+    Returns:
+        Iterator[Dict[str, Any]]: A dict to add data to the finished event.
+    """
+    result: Dict[str, Any] = {}
+    try:
+        with logger.operation_events(operation, **data) as result, collect_uv_phases(logger, result):
+            yield result
+    finally:
+        if result:
+            record_operation(operation, data, result)
@@ -1,10 +1,10 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Union
+from typing import List, Union
 
 from uvpipx import config
-from uvpipx.uvpipx_core import PathLink, UvPipxVenv
+from uvpipx.uvpipx_core import CopyStamp, PathLink, UvPipxVenv
 from uvpipx.UvPipxModels import (
     UvPipxExposedModel,
     UvPipxVenvExposeAppModel,
@@ -35,6 +35,13 @@ def path_link_factory(
     return p_link
 
 
+def copy_stamp_from_model(app_bin_model: UvPipxVenvExposeAppModel) -> Union[None, CopyStamp]:
+    if app_bin_model.md5 is None or app_bin_model.size is None or app_bin_model.mtime_ns is None:
+        return None
+
+    return CopyStamp(app_bin_model.md5, app_bin_model.size, app_bin_model.mtime_ns)
+
+
 def path_link_from_model(
     exposed: UvPipxExposedModel,
     app_bin_model: UvPipxVenvExposeAppModel,
@@ -42,6 +49,19 @@ def path_link_from_model(
     p_link = PathLink(
         Path(exposed.venv_bin_dir) / app_bin_model.bin_app_name,
         Path(app_bin_model.exposed_app_path),
+        stamp=copy_stamp_from_model(app_bin_model),
     )
 
     return p_link
+
+
+def expose_app_model(bin_app_name: str, p_link: PathLink, packages_name_sets: List[str]) -> UvPipxVenvExposeAppModel:
+    stamp = p_link.stamp
+    return UvPipxVenvExposeAppModel(
+        bin_app_name,
+        str(p_link.link_path),
+        packages_name_sets,
+        md5=stamp.md5 if stamp else None,
+        size=stamp.size if stamp else None,
+        mtime_ns=stamp.mtime_ns if stamp else None,
+    )
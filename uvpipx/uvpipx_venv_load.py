@@ -1,41 +1,43 @@
 from __future__ import annotations
 
-import json
-from typing import Tuple, Union
+from typing import List, Tuple, Union
 
+from uvpipx.internal_libs.misc import check_type
 from uvpipx.uvpipx_core import UvPipxVenv
+from uvpipx.uvpipx_state import StateIndex, VenvState
 from uvpipx.uvpipx_venv_factory import uvpipx_venv_factory
-from uvpipx.UvPipxModels import UvPipVenvNotReady, UvPipxModel
-from uvpipx.UvPipxModelsUpgrader import check_and_upgrade
+from uvpipx.UvPipxModels import UvPipxModel
 
 
-def uvpipx_load_venv(
+def uvpipx_load_venv_state(
     package_name: str,
     name_override: Union[str, None] = None,
-) -> Tuple[UvPipxModel, UvPipxVenv]:
-    venv_m, venv = uvpipx_venv_factory(package_name, name_override)
+) -> Tuple[VenvState, UvPipxVenv]:
+    _, venv = uvpipx_venv_factory(package_name, name_override)
 
-    if not venv.exists():
-        msg = f"🔴 {package_name} not exist (path {venv.venv_path})"
-        raise UvPipVenvNotReady(msg)
+    return StateIndex().load(venv.venv_path, package_name), venv
 
-    if not (venv.venv_path / "uvpipx.json").exists():
-        msg = f"🔴 {package_name} not exist (path {venv.venv_path})"
-        raise UvPipVenvNotReady(msg)
 
-    with (venv.venv_path / "uvpipx.json").open("r") as infile:
-        file_dict = json.load(
-            infile,
-        )
+def uvpipx_load_venv(
+    package_name: str,
+    name_override: Union[str, None] = None,
+) -> Tuple[UvPipxModel, UvPipxVenv]:
+    """
+    Returns the model of a venv, from the state index (its uvpipx.json is read again only if it changed).
+
+    Returns:
+        Tuple[UvPipxModel, UvPipxVenv]: The model and the venv.
+    """
+    state, venv = uvpipx_load_venv_state(package_name, name_override)
 
-    current_vers_dict, upgraded = check_and_upgrade(file_dict)
-    if current_vers_dict is None:
-        msg = "Bad venv, please unistall and install again"
-        raise UvPipVenvNotReady(msg)
+    return check_type(state.model, UvPipxModel), venv
 
-    uvpipx_cfg = UvPipxModel.from_dict(current_vers_dict)
 
-    if upgraded:
-        uvpipx_cfg.save_json("uvpipx.json")
+def uvpipx_venv_names() -> List[str]:
+    """
+    Returns the names of the valid uvpipx venvs, from the state index.
 
-    return uvpipx_cfg, venv
+    Returns:
+        List[str]: The sorted venv names.
+    """
+    return StateIndex().venv_names()
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+__author__ = "Gaëtan Montury"
+__copyright__ = "Copyright (c) 2024-2025 Gaëtan Montury"
+__license__ = """GNU GENERAL PUBLIC LICENSE refer to file LICENSE in repo"""
+__version__ = "0.8.1"  # to bump
+__maintainer__ = "Gaëtan Montury"
+__email__ = "#"
+__status__ = "Development"
+
+
+from functools import partial
+from pathlib import Path
+from typing import List, Union
+
+import uvpipx.platform
+from uvpipx.internal_libs.Logger import Logger, get_logger
+from uvpipx.internal_libs.misc import Elapser
+from uvpipx.internal_libs.parallel import JobResult, log_jobs_summary, run_jobs
+from uvpipx.uvpipx_core import UvPipxVenv, log_uv_output
+from uvpipx.uvpipx_uv import run_uv
+from uvpipx.uvpipx_venv_load import uvpipx_load_venv, uvpipx_venv_names
+
+
+def freeze_requirements(freeze: str, logger: Logger) -> List[str]:
+    """
+    Returns the exact requirements of a freeze, one per package.
+
+    Explanation:
+    The editable requirements are skipped (with a warning), there is no wheel to collect for them.
+
+    Args:
+        freeze (str): The freeze of a venv.
+        logger (Logger): The logger to use.
+
+    Returns:
+        List[str]: The requirements, one per package.
+    """
+    requirements = []
+    for line in freeze.splitlines():
+        requirement = line.strip()
+        if not requirement or requirement.startswith("#"):
+            continue
+        if requirement.startswith("-e "):
+            logger.log_warn(f" ⚠️  editable requirement {requirement[3:]} not exported")
+            continue
+        requirements.append(requirement)
+
+    return requirements
+
+
+def venv_requirements(venv: UvPipxVenv, logger: Logger) -> List[str]:
+    """
+    Returns the exact requirements of a venv, from a fresh freeze of its installed packages.
+
+    Explanation:
+    The requirements.txt saved at install is not used: it is not rewritten by upgrade or inject.
+
+    Args:
+        venv (UvPipxVenv): The uvpipx venv.
+        logger (Logger): The logger to use.
+
+    Returns:
+        List[str]: The requirements, one per package.
+    """
+    return freeze_requirements(venv.freeze(), logger)
+
+
+def export_venv(venv_name: str, wheelhouse_dir: Path) -> int:
+    """
+    Collects in the wheelhouse the wheels of the exact requirements of a venv.
+
+    Explanation:
+    pip wheel is run by uv tool run with the python of the venv, so the wheels match its python version.
+    A requirement only published as a source distribution is built into a wheel: the wheelhouse only holds
+    wheels, which uv installs offline without any build backend. The wheels already in the wheelhouse
+    (shared by many venvs) are found there and not downloaded again.
+
+    Args:
+        venv_name (str): The name of the uvpipx venv.
+        wheelhouse_dir (Path): The wheelhouse directory.
+
+    Returns:
+        int: The number of requirements exported.
+    """
+    logger = get_logger("wheelhouse")
+    logger.log_info(f"📦 Export {venv_name}\n")
+
+    _, venv = uvpipx_load_venv(venv_name)
+    requirements = venv_requirements(venv, logger)
+    if not requirements:
+        logger.log_info(" ⭕ nothing to export")
+        return 0
+
+    python_venv_bin = venv.venv_bin_dir() / ("python" + uvpipx.platform.bin_ext)
+    with Elapser() as ela:
+        run_uv(
+            [
+                "uv",
+                "tool",
+                "run",
+                "--python",
+                str(python_venv_bin),
+                "--from",
+                "pip",
+                "pip",
+                "wheel",
+                "--no-deps",
+                "--prefer-binary",
+                "--find-links",
+                str(wheelhouse_dir),
+                "--wheel-dir",
+                str(wheelhouse_dir),
+                *requirements,
+            ],
+            venv=venv_name,
+            on_output=log_uv_output(logger),
+        )
+    logger.log_info(ela.ela_str(f" 🟢 {len(requirements)} requirements of {venv_name} exported"))
+
+    return len(requirements)
+
+
+def export(wheelhouse_dir: Path, venv_names: Union[None, List[str]] = None) -> List[JobResult]:
+    """
+    Exports in a wheelhouse directory the wheels of the packages installed in the uvpipx venvs.
+
+    Explanation:
+    The wheelhouse is used with install/upgrade --wheelhouse to install without any index (air-gapped nodes).
+    The venvs are exported one by one because they share the wheelhouse directory.
+
+    Args:
+        wheelhouse_dir (Path): The wheelhouse directory (created if needed).
+        venv_names (Union[None, List[str]]): The venvs to export. Default is all the venvs.
+
+    Returns:
+        List[JobResult]: The result of the export of each venv.
+    """
+    logger = get_logger("wheelhouse")
+
+    venv_names_ = venv_names or uvpipx_venv_names()
+    if not venv_names_:
+        logger.log_info("⭕ No uvpipx package installed!")
+        return []
+
+    wheelhouse_dir.mkdir(parents=True, exist_ok=True)
+    wheelhouse_dir_ = wheelhouse_dir.resolve()
+
+    def show_job(result: JobResult) -> None:
+        if not result.ok:
+            logger.log_error(f" 🔴 Export of {result.name} failed: {result.error}")
+        logger.log_info(" ----------------\n")
+
+    with Elapser() as ela:
+        results = run_jobs(
+            {name: partial(export_venv, name, wheelhouse_dir_) for name in venv_names_},
+            max_workers=1,
+            on_done=show_job,
+        )
+
+    log_jobs_summary(logger, "export", results, ela)
+    logger.log_info(f" 🛞 wheelhouse {wheelhouse_dir_}")
+
+    return results
@@ -1,3 +1,6 @@
+import sys
+
+from uvpipx.internal_libs.Logger import get_event_sink
 from uvpipx.internal_libs.stylist import Painter
 
 __author__ = "Gaëtan Montury"
@@ -14,4 +17,5 @@ def show_version() -> None:
         Painter.parse_color_tags(
             f"<BRIGHT_WHITE>uvpipx</BRIGHT_WHITE> version <CYAN>{__version__}</CYAN>\n",
         ),
+        file=sys.stderr if get_event_sink() else None,  # with a structured output, stdout only has the events
     )